@@ -1,20 +1,61 @@
 import os
 import json
+import threading
+from pathlib import Path
 from typing import List, Dict, Optional, Any
-from anthropic import Anthropic
 
 from app.services.asset_manager import AssetManager
+from app.services.llm_cache import LLMCache, normalize_text
+
+MODEL = "claude-3-haiku-20240307"
 
 
 class AIEngine:
     
     def __init__(self):
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
+        self.api_key = os.getenv("ANTHROPIC_API_KEY")
+        if not self.api_key:
             print("Warning: ANTHROPIC_API_KEY not set. Claude features will be limited.")
-            self.client = None
-        else:
-            self.client = Anthropic(api_key=api_key)
+        self._client = None
+        self._client_lock = threading.Lock()
+        
+        # Number of locally retrieved candidates sent to Claude for recommendation
+        self.asset_shortlist_k = int(os.getenv("ASSET_SHORTLIST_K", "40"))
+        
+        cache_dir = os.getenv("LLM_CACHE_DIR")
+        self.cache = LLMCache(
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024")),
+            ttl=float(os.getenv("LLM_CACHE_TTL", "86400")),
+            disk_dir=Path(cache_dir) if cache_dir else None
+        )
+    
+    @property
+    def client(self):
+        # The SDK is slow to import, so the client is created on first use
+        # (or by the startup warm-up) rather than when the API module loads
+        if self._client is None and self.api_key:
+            with self._client_lock:
+                if self._client is None:
+                    import httpx
+                    from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+                    
+                    # One pooled keep-alive connection set shared by every request
+                    max_connections = int(os.getenv("ANTHROPIC_MAX_CONNECTIONS", "20"))
+                    self._client = AsyncAnthropic(
+                        api_key=self.api_key,
+                        http_client=DefaultAsyncHttpxClient(
+                            limits=httpx.Limits(
+                                max_connections=max_connections,
+                                max_keepalive_connections=max_connections,
+                                keepalive_expiry=60.0
+                            )
+                        )
+                    )
+        return self._client
+    
+    async def aclose(self):
+        if self._client:
+            await self._client.close()
     
     async def normalize_prompt(
         self,
@@ -45,15 +86,25 @@ Channel: {channel or 'not specified'}
 
 Normalize this request into a compliant, professional creative intent:"""
 
+        cache_key = self.cache.make_key("normalize_prompt", MODEL, system_prompt, {
+            "prompt": normalize_text(prompt),
+            "format": normalize_text(format),
+            "channel": normalize_text(channel)
+        })
+        cached = await self.cache.get("normalize_prompt", cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            response = self.client.messages.create(
-                model="claude-3-haiku-20240307",
+            response = await self.client.messages.create(
+                model=MODEL,
                 max_tokens=500,
                 system=system_prompt,
                 messages=[{"role": "user", "content": user_message}]
             )
             
             normalized = response.content[0].text.strip()
+            await self.cache.set("normalize_prompt", cache_key, normalized)
             return normalized
             
         except Exception as e:
@@ -120,9 +171,18 @@ Channel: {channel or 'generic'}
 
 Return valid JSON only:"""
 
+        cache_key = self.cache.make_key("generate_toon", MODEL, system_prompt, {
+            "normalized_intent": normalize_text(normalized_intent),
+            "format": normalize_text(format),
+            "channel": normalize_text(channel)
+        })
+        cached = await self.cache.get("generate_toon", cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            response = self.client.messages.create(
-                model="claude-3-haiku-20240307",
+            response = await self.client.messages.create(
+                model=MODEL,
                 max_tokens=1000,
                 system=system_prompt,
                 messages=[{"role": "user", "content": user_message}]
@@ -143,6 +203,7 @@ Return valid JSON only:"""
             print(f"[AIEngine] Parsed TOON JSON: {toon_json[:200]}...")
             toon = json.loads(toon_json)
             print(f"[AIEngine] TOON generated successfully: {list(toon.keys())}")
+            await self.cache.set("generate_toon", cache_key, toon)
             return toon
             
         except json.JSONDecodeError as e:
@@ -189,16 +250,25 @@ Return valid JSON only:"""
         asset_manager: AssetManager,
         max_assets: int = 8
     ) -> List[str]:
-        if not asset_manager.is_loaded():
+        if not asset_manager.loaded:
             return []
         
         if not self.client:
             return asset_manager.search(prompt, limit=max_assets)
         
         all_assets = asset_manager.get_all_assets()
+        # Fitted with the catalog when it was loaded or reloaded
+        candidates = asset_manager.retriever.shortlist(prompt, self.asset_shortlist_k)
+        if len(candidates) < max_assets:
+            shortlisted = {asset.sample_id for asset in candidates}
+            for path in asset_manager.search(prompt, limit=self.asset_shortlist_k):
+                asset = asset_manager.get_asset_by_path(path)
+                if asset and asset.sample_id not in shortlisted:
+                    candidates.append(asset)
+                    shortlisted.add(asset.sample_id)
         
         asset_context = []
-        for asset in all_assets:
+        for asset in candidates:
             asset_context.append({
                 "id": asset.sample_id,
                 "category": asset.category,
@@ -225,13 +295,13 @@ Example: ["33127", "55858", "12345", "67890", "11111", "22222", "33333", "44444"
         user_message = f"""User intent: "{prompt}"
 
 Available assets:
-{json.dumps(asset_context, indent=2)}
+{json.dumps(asset_context, separators=(',', ':'))}
 
 Recommend ONLY assets that match "{prompt}". Return JSON array of sample_id values only:"""
 
         try:
-            response = self.client.messages.create(
-                model="claude-3-haiku-20240307",
+            response = await self.client.messages.create(
+                model=MODEL,
                 max_tokens=1000,
                 system=system_prompt,
                 messages=[{"role": "user", "content": user_message}]
@@ -325,15 +395,24 @@ TOON layout: {json.dumps(toon.get('layout', {}), indent=2)}
 
 Generate a neutral background description:"""
 
+        cache_key = self.cache.make_key("generate_background_description", MODEL, system_prompt, {
+            "normalized_intent": normalize_text(normalized_intent),
+            "layout": toon.get('layout', {})
+        })
+        cached = await self.cache.get("generate_background_description", cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            response = self.client.messages.create(
-                model="claude-3-haiku-20240307",
+            response = await self.client.messages.create(
+                model=MODEL,
                 max_tokens=200,
                 system=system_prompt,
                 messages=[{"role": "user", "content": user_message}]
             )
             
             description = response.content[0].text.strip()
+            await self.cache.set("generate_background_description", cache_key, description)
             return description
             
         except Exception as e:
@@ -408,8 +487,8 @@ IMPORTANT: This product must be placed in a DIFFERENT location from existing ele
 Determine optimal UNIQUE position and size for this specific product. Return JSON with x, y, width, height."""
 
         try:
-            response = self.client.messages.create(
-                model="claude-3-haiku-20240307",
+            response = await self.client.messages.create(
+                model=MODEL,
                 max_tokens=500,
                 system=system_prompt,
                 messages=[{"role": "user", "content": user_message}]
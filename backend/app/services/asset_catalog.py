@@ -0,0 +1,161 @@
+import math
+import weakref
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Per-row string columns, stored back to back in one shared UTF-8 buffer
+STRING_COLUMNS = ("sample_id", "catalog_content", "image_link", "local_path")
+SAMPLE_ID, CATALOG_CONTENT, IMAGE_LINK, LOCAL_PATH = range(len(STRING_COLUMNS))
+
+# (sample_id, catalog_content, category, price, image_link, local_path)
+AssetRow = Tuple[str, str, str, Optional[float], str, str]
+
+
+class Asset:
+    __slots__ = ("_catalog", "_row")
+
+    def __init__(self, catalog: "AssetCatalog", row: int):
+        self._catalog = catalog
+        self._row = row
+
+    @property
+    def sample_id(self) -> str:
+        return self._catalog.string(self._row, SAMPLE_ID)
+
+    @property
+    def catalog_content(self) -> str:
+        return self._catalog.string(self._row, CATALOG_CONTENT)
+
+    @property
+    def category(self) -> str:
+        return self._catalog.category(self._row)
+
+    @property
+    def price(self) -> Optional[float]:
+        return self._catalog.price(self._row)
+
+    @property
+    def image_link(self) -> Optional[str]:
+        return self._catalog.string(self._row, IMAGE_LINK)
+
+    @property
+    def local_path(self) -> str:
+        return self._catalog.string(self._row, LOCAL_PATH)
+
+    def to_dict(self) -> Dict:
+        return {
+            "sample_id": self.sample_id,
+            "catalog_content": self.catalog_content,
+            "category": self.category,
+            "price": self.price,
+            "image_link": self.image_link,
+            "local_path": self.local_path
+        }
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Asset):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"Asset(sample_id={self.sample_id!r}, category={self.category!r}, local_path={self.local_path!r})"
+
+
+# Struct-of-arrays storage: strings share one UTF-8 buffer addressed by an
+# offset table, categories are interned to ids and prices are a float64 array
+# (NaN when missing). Buffers may be memory-mapped from an AssetSnapshot, which
+# then stays open for the lifetime of the catalog: it is closed once the
+# catalog is unreachable, i.e. after a reload has swapped it out and the last
+# reader holding it (or one of its Asset views) is done. Asset views are
+# created on access only.
+class AssetCatalog(Sequence):
+
+    def __init__(
+        self,
+        string_blob: Union[bytes, bytearray, memoryview],
+        string_offsets: Union[array, memoryview],
+        category_ids: Union[array, memoryview],
+        categories: List[str],
+        prices: Union[array, memoryview],
+        snapshot=None
+    ):
+        self.string_blob = string_blob
+        self.string_offsets = string_offsets
+        self.category_ids = category_ids
+        self.categories = categories
+        self.prices = prices
+        self.row_count = len(category_ids)
+        self._close_snapshot = weakref.finalize(self, snapshot.close) if snapshot is not None else None
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[AssetRow]) -> "AssetCatalog":
+        blob = bytearray()
+        offsets = array('Q', [0])
+        category_ids = array('I')
+        prices = array('d')
+        interned: Dict[str, int] = {}
+
+        for sample_id, catalog_content, category, price, image_link, local_path in rows:
+            for value in (sample_id, catalog_content, image_link, local_path):
+                blob += (value or '').encode('utf-8')
+                offsets.append(len(blob))
+            category_ids.append(interned.setdefault(category, len(interned)))
+            prices.append(math.nan if price is None else price)
+
+        return cls(blob, offsets, category_ids, list(interned), prices)
+
+    @classmethod
+    def from_snapshot(cls, snapshot) -> "AssetCatalog":
+        return cls(
+            snapshot.string_blob,
+            snapshot.string_offsets,
+            snapshot.category_ids,
+            snapshot.categories,
+            snapshot.prices,
+            snapshot=snapshot
+        )
+
+    def string(self, row: int, column: int) -> str:
+        index = row * len(STRING_COLUMNS) + column
+        return str(self.string_blob[self.string_offsets[index]:self.string_offsets[index + 1]], 'utf-8')
+
+    def category(self, row: int) -> str:
+        return self.categories[self.category_ids[row]]
+
+    def price(self, row: int) -> Optional[float]:
+        value = self.prices[row]
+        return None if math.isnan(value) else value
+
+    def row(self, row: int) -> AssetRow:
+        return (
+            self.string(row, SAMPLE_ID),
+            self.string(row, CATALOG_CONTENT),
+            self.category(row),
+            self.price(row),
+            self.string(row, IMAGE_LINK),
+            self.string(row, LOCAL_PATH)
+        )
+
+    def iter_rows(self) -> Iterator[AssetRow]:
+        for row in range(self.row_count):
+            yield self.row(row)
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Asset(self, row) for row in range(*index.indices(self.row_count))]
+        if index < 0:
+            index += self.row_count
+        if not 0 <= index < self.row_count:
+            raise IndexError("asset index out of range")
+        return Asset(self, index)
+
+    def __iter__(self) -> Iterator[Asset]:
+        for row in range(self.row_count):
+            yield Asset(self, row)
+
+    def close(self):
+        if self._close_snapshot is not None:
+            self._close_snapshot()
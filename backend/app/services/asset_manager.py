@@ -1,66 +1,288 @@
 import csv
+import os
 import re
+import threading
 from pathlib import Path
-from typing import List, Dict, Optional
-from dataclasses import dataclass
+from array import array
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
+from app.services.asset_catalog import Asset, AssetCatalog, AssetRow, CATALOG_CONTENT, LOCAL_PATH, SAMPLE_ID
+from app.services.asset_retriever import AssetRetriever
+from app.services.asset_snapshot import csv_fingerprint, open_snapshot, write_snapshot
+from app.services.search_index import SearchIndex
 
-@dataclass
-class Asset:
-    sample_id: str
-    catalog_content: str
-    category: str
-    price: Optional[float]
-    image_link: Optional[str]
-    local_path: str
-    
-    def to_dict(self) -> Dict:
-        return {
-            "sample_id": self.sample_id,
-            "catalog_content": self.catalog_content,
-            "category": self.category,
-            "price": self.price,
-            "image_link": self.image_link,
-            "local_path": self.local_path
-        }
+# Rebuild the search index from scratch once this share of its docs are deleted
+INDEX_COMPACTION_RATIO = 0.3
+
+
+class CatalogState:
+    # Everything a reader needs, published as one object so a reload can swap
+    # it in a single assignment. Never mutated after construction. The
+    # shortlist retriever is fitted here (or passed in, updated from the
+    # previous state's), on the load/reload thread, rather than by the first
+    # request that needs it.
+    __slots__ = (
+        "catalog", "search_index", "doc_rows", "row_docs",
+        "rows_by_id", "rows_by_path", "rows_by_category", "retriever", "version", "fingerprint"
+    )
+
+    def __init__(
+        self,
+        catalog: AssetCatalog,
+        search_index: SearchIndex,
+        doc_rows: array,
+        row_docs: array,
+        version: int = 0,
+        fingerprint: Optional[Tuple] = None,
+        retriever: Optional[AssetRetriever] = None
+    ):
+        self.catalog = catalog
+        self.search_index = search_index
+        self.doc_rows = doc_rows
+        self.row_docs = row_docs
+        self.version = version
+        self.fingerprint = fingerprint
+        self.rows_by_id: Dict[str, int] = {}
+        self.rows_by_path: Dict[str, int] = {}
+        self.rows_by_category: Dict[str, array] = {}
+        for row in range(len(catalog)):
+            self.rows_by_id.setdefault(catalog.string(row, SAMPLE_ID), row)
+            local_path = catalog.string(row, LOCAL_PATH)
+            if local_path:
+                self.rows_by_path.setdefault(AssetManager.normalize_path(local_path), row)
+            self.rows_by_category.setdefault(catalog.category(row).lower(), array('I')).append(row)
+        self.retriever = retriever or AssetRetriever().fit(catalog, version)
+
+    @classmethod
+    def empty(cls) -> "CatalogState":
+        return cls(AssetCatalog.from_rows([]), SearchIndex(), array('i'), array('i'))
 
 
 class AssetManager:
     
-    def __init__(self, csv_path: Path, asset_library_dir: Path):
+    def __init__(self, csv_path: Path, asset_library_dir: Path, snapshot_path: Optional[Path] = None):
         self.csv_path = csv_path
         self.asset_library_dir = asset_library_dir
-        self.assets: List[Asset] = []
+        self.snapshot_path = snapshot_path or csv_path.with_name(f"{csv_path.name}.snapshot")
+        self._state = CatalogState.empty()
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
         self._loaded = False
-        
+    
+    @property
+    def assets(self) -> AssetCatalog:
+        return self._state.catalog
+    
+    @property
+    def search_index(self) -> SearchIndex:
+        return self._state.search_index
+    
+    @property
+    def version(self) -> int:
+        return self._state.version
+    
+    @property
+    def retriever(self) -> AssetRetriever:
+        return self._state.retriever
+    
+    @property
+    def loaded(self) -> bool:
+        # Unlike is_loaded(), never starts a load
+        return self._loaded
+    
     def load(self) -> bool:
         if not self.csv_path.exists():
             print(f"Warning: Asset index CSV not found at {self.csv_path}")
             return False
         
-        try:
-            with open(self.csv_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    catalog_content = row.get('catalog_content', '').replace('\n', ' ')
-                    
-                    asset = Asset(
-                        sample_id=row.get('sample_id', ''),
-                        catalog_content=catalog_content,
-                        category=row.get('category', ''),
-                        price=float(row['price']) if row.get('price') and row['price'].strip() else None,
-                        image_link=row.get('image_link', ''),
-                        local_path=row.get('local_path', '').replace('\\', '/')
-                    )
-                    self.assets.append(asset)
+        with self._reload_lock:
+            if self._loaded:
+                # Another caller finished loading while this one waited for the lock
+                return True
+            try:
+                fingerprint = self._fingerprint()
+                catalog = self._read_snapshot()
+                source = self.snapshot_path
+                if catalog is None:
+                    catalog = self._read_csv()
+                    source = self.csv_path
+                    self._write_snapshot(catalog)
+                
+                self._state = self._build_state(catalog, self._state.version + 1, fingerprint)
+                self._loaded = True
+                print(f"Loaded {len(catalog)} assets from {source}")
+                return True
             
-            self._loaded = True
-            print(f"Loaded {len(self.assets)} assets from {self.csv_path}")
-            return True
+            except Exception as e:
+                print(f"Error loading asset index: {e}")
+                return False
+    
+    def reload(self, force: bool = False) -> Dict[str, int]:
+        if not self._loaded:
+            loaded = self.load()
+            return {"added": self.get_asset_count() if loaded else 0, "updated": 0, "removed": 0}
+        
+        with self._reload_lock:
+            old = self._state
+            fingerprint = self._fingerprint()
+            if not force and fingerprint == old.fingerprint:
+                return {"added": 0, "updated": 0, "removed": 0}
             
-        except Exception as e:
-            print(f"Error loading asset index: {e}")
-            return False
+            catalog = self._read_csv()
+            self._write_snapshot(catalog)
+            
+            # Diff by sample_id against the published catalog; unchanged rows keep
+            # their search index docs, changed ones are re-indexed. The diff needs
+            # unique ids on both sides, otherwise the index is rebuilt instead.
+            stats = {"added": 0, "updated": 0, "removed": 0}
+            removed_docs = []
+            changed_rows = []
+            row_docs = array('i', [-1]) * len(catalog)
+            old_to_new = array('i', [-1]) * len(old.catalog)
+            seen = set()
+            for row in range(len(catalog)):
+                sample_id = catalog.string(row, SAMPLE_ID)
+                seen.add(sample_id)
+                old_row = old.rows_by_id.get(sample_id)
+                if old_row is None:
+                    stats["added"] += 1
+                    changed_rows.append(row)
+                elif old.catalog.row(old_row) != catalog.row(row):
+                    stats["updated"] += 1
+                    removed_docs.append(old.row_docs[old_row])
+                    changed_rows.append(row)
+                else:
+                    row_docs[row] = old.row_docs[old_row]
+                    old_to_new[old_row] = row
+            for sample_id, old_row in old.rows_by_id.items():
+                if sample_id not in seen:
+                    stats["removed"] += 1
+                    removed_docs.append(old.row_docs[old_row])
+            
+            if len(seen) < len(catalog) or len(old.rows_by_id) < len(old.catalog):
+                print("Asset index has repeated sample_ids, rebuilding the search index")
+                state = self._build_state(catalog, old.version + 1, fingerprint)
+            else:
+                state = self._updated_state(old, catalog, row_docs, old_to_new, changed_rows, removed_docs, fingerprint)
+            
+            # Single reference swap: readers see either the old or the new state
+            self._state = state
+            print(f"Reloaded asset index v{state.version}: {stats['added']} added, "
+                  f"{stats['updated']} updated, {stats['removed']} removed")
+            return stats
+    
+    def _updated_state(
+        self,
+        old: CatalogState,
+        catalog: AssetCatalog,
+        row_docs: array,
+        old_to_new: array,
+        changed_rows: List[int],
+        removed_docs: List[int],
+        fingerprint: Optional[Tuple]
+    ) -> CatalogState:
+        if changed_rows or removed_docs:
+            search_index, new_docs = old.search_index.updated(
+                removed_docs,
+                (f"{catalog.string(row, CATALOG_CONTENT)} {catalog.category(row)}" for row in changed_rows)
+            )
+            for row, doc_id in zip(changed_rows, new_docs):
+                row_docs[row] = doc_id
+        else:
+            search_index = old.search_index
+        doc_rows = array('i', [-1]) * len(search_index.doc_lengths)
+        for row, doc_id in enumerate(row_docs):
+            doc_rows[doc_id] = row
+        
+        if search_index.get_deleted_ratio() > INDEX_COMPACTION_RATIO:
+            return self._build_state(catalog, old.version + 1, fingerprint)
+        retriever = old.retriever.updated(catalog, old.version + 1, old_to_new, changed_rows)
+        return CatalogState(catalog, search_index, doc_rows, row_docs, old.version + 1, fingerprint, retriever)
+    
+    def start_watching(self, interval: float = 5.0, on_reload: Optional[Callable[[Optional[Exception]], None]] = None):
+        # on_reload runs on the watcher thread after each reload that changed
+        # the index or failed, with the error if there was one
+        if self._watcher is not None:
+            return
+        self._stop_watching.clear()
+        
+        def watch():
+            while not self._stop_watching.wait(interval):
+                error = None
+                try:
+                    changed = any(self.reload().values())
+                except Exception as e:
+                    print(f"Error reloading asset index: {e}")
+                    error = e
+                if on_reload is not None and (error is not None or changed):
+                    on_reload(error)
+        
+        self._watcher = threading.Thread(target=watch, name="asset-index-watcher", daemon=True)
+        self._watcher.start()
+        print(f"Watching {self.csv_path} and {self.asset_library_dir} every {interval}s")
+    
+    def stop_watching(self):
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+    
+    def _fingerprint(self) -> Tuple:
+        # CSV size/mtime plus the mtimes of the library directories, which change
+        # whenever image files are added, removed or renamed inside them
+        library_mtime = None
+        directories = []
+        if self.asset_library_dir.exists():
+            library_mtime = self.asset_library_dir.stat().st_mtime_ns
+            with os.scandir(self.asset_library_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        directories.append((entry.name, entry.stat().st_mtime_ns))
+        return csv_fingerprint(self.csv_path), library_mtime, tuple(sorted(directories))
+    
+    def _build_state(self, catalog: AssetCatalog, version: int, fingerprint: Optional[Tuple]) -> CatalogState:
+        search_index = SearchIndex.build(
+            f"{catalog.string(row, CATALOG_CONTENT)} {catalog.category(row)}"
+            for row in range(len(catalog))
+        )
+        identity = array('i', range(len(catalog)))
+        return CatalogState(catalog, search_index, identity, array('i', identity), version, fingerprint)
+    
+    def _read_csv(self) -> AssetCatalog:
+        with open(self.csv_path, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            return AssetCatalog.from_rows(self._parse_row(row) for row in reader)
+    
+    @staticmethod
+    def _parse_row(row: Dict[str, str]) -> AssetRow:
+        return (
+            row.get('sample_id', ''),
+            row.get('catalog_content', '').replace('\n', ' '),
+            row.get('category', ''),
+            float(row['price']) if row.get('price') and row['price'].strip() else None,
+            row.get('image_link', ''),
+            row.get('local_path', '').replace('\\', '/')
+        )
+    
+    def _read_snapshot(self) -> Optional[AssetCatalog]:
+        snapshot = open_snapshot(self.snapshot_path, self.csv_path)
+        if snapshot is None:
+            return None
+        return AssetCatalog.from_snapshot(snapshot)
+    
+    def _write_snapshot(self, catalog: AssetCatalog):
+        try:
+            write_snapshot(self.snapshot_path, self.csv_path, catalog)
+        except OSError as e:
+            print(f"Warning: could not write asset snapshot to {self.snapshot_path}: {e}")
+    
+    @staticmethod
+    def normalize_path(path: str) -> str:
+        parts = [part for part in path.replace('\\', '/').split('/') if part]
+        while parts and parts[0] in ('assets', 'asset-library'):
+            parts = parts[1:]
+        return '/'.join(parts)
     
     def is_loaded(self) -> bool:
         if not self._loaded:
@@ -68,40 +290,44 @@ class AssetManager:
         return self._loaded
     
     def get_asset_count(self) -> int:
-        return len(self.assets)
+        return len(self._state.catalog)
     
     def get_asset_by_id(self, sample_id: str) -> Optional[Asset]:
-        for asset in self.assets:
-            if asset.sample_id == sample_id:
-                return asset
-        return None
+        state = self._state
+        row = state.rows_by_id.get(sample_id)
+        return None if row is None else state.catalog[row]
+    
+    def get_asset_by_path(self, path: str) -> Optional[Asset]:
+        state = self._state
+        key = self.normalize_path(path)
+        row = state.rows_by_path.get(key)
+        if row is None:
+            # Tolerate extra URL prefixes by falling back to "<category>/<file>"
+            parts = key.split('/')
+            if len(parts) > 2:
+                row = state.rows_by_path.get('/'.join(parts[-2:]))
+        return None if row is None else state.catalog[row]
     
     def get_assets_by_category(self, category: str) -> List[Asset]:
-        return [asset for asset in self.assets if asset.category.lower() == category.lower()]
+        state = self._state
+        return [state.catalog[row] for row in state.rows_by_category.get(category.lower(), ())]
     
     def search(self, query: str, limit: int = 10) -> List[str]:
-        query_lower = query.lower()
-        query_tokens = set(re.findall(r'\b\w+\b', query_lower))
-        
-        scored = []
-        for asset in self.assets:
-            text = f"{asset.catalog_content} {asset.category}".lower()
-            text_tokens = set(re.findall(r'\b\w+\b', text))
-            
-            score = len(query_tokens & text_tokens)
-            if score > 0:
-                scored.append((score, asset.local_path))
-        
-        scored.sort(reverse=True)
-        results = [path for _, path in scored[:limit]]
+        state = self._state
+        # A doc with no row (-1) belongs to no asset of this catalog
+        results = [
+            state.catalog.string(state.doc_rows[doc_id], LOCAL_PATH)
+            for _, doc_id in state.search_index.search(query, limit=limit)
+            if state.doc_rows[doc_id] >= 0
+        ]
         
         if len(results) == 0:
-            return [asset.local_path for asset in self.assets[:limit]]
+            return [asset.local_path for asset in state.catalog[:limit]]
         
         return results
     
     def tokenize(self, text: str) -> set:
         return set(re.findall(r'\b[a-zA-Z]+\b', text.lower()))
     
-    def get_all_assets(self) -> List[Asset]:
-        return self.assets.copy()
+    def get_all_assets(self) -> Sequence[Asset]:
+        return self._state.catalog
@@ -0,0 +1,197 @@
+import zlib
+from array import array
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.asset_catalog import Asset, AssetCatalog, CATALOG_CONTENT
+from app.services.search_index import tokenize
+
+# Documents featurized per step while fitting; bounds the temporary arrays
+FIT_CHUNK_ROWS = 4096
+# Refit from scratch once this share of the catalog's rows are scored
+# against an older fit (changed or added since, or dropped from it)
+REFIT_STALE_RATIO = 0.1
+
+
+class _Segment:
+    # Postings of one fit, column-major: per feature, the slots containing
+    # it and their weights. live_slots/live_rows map the slots still in the
+    # catalog to its rows; a reload only rewrites these two arrays.
+    __slots__ = ("indptr", "doc_slots", "weights", "slot_count", "live_slots", "live_rows")
+
+    def __init__(self, indptr: np.ndarray, doc_slots: np.ndarray, weights: np.ndarray, slot_count: int,
+                 live_slots: np.ndarray, live_rows: np.ndarray):
+        self.indptr = indptr
+        self.doc_slots = doc_slots
+        self.weights = weights
+        self.slot_count = slot_count
+        self.live_slots = live_slots
+        self.live_rows = live_rows
+
+    def scores(self, features: Sequence[int], query_weights: Sequence[float]) -> np.ndarray:
+        scores = np.zeros(self.slot_count, dtype=np.float32)
+        for feature, query_weight in zip(features, query_weights):
+            start, end = self.indptr[feature], self.indptr[feature + 1]
+            # Slots are unique within a feature's postings
+            scores[self.doc_slots[start:end]] += self.weights[start:end] * query_weight
+        return scores
+
+
+class AssetRetriever:
+    # CPU-only shortlist stage: hashed word + char-trigram features, TF-IDF
+    # weighted and L2-normalized. The matrix is sparse and stored column-major
+    # (per feature: the rows containing it and their weights), so a query only
+    # touches the postings of its own features. A reload calls updated(),
+    # which keeps the previous fit and adds a small segment for the changed
+    # rows instead of refitting the whole catalog.
+
+    def __init__(self, n_features: int = 1024, max_chars: int = 300):
+        self.n_features = n_features
+        self.max_chars = max_chars
+        self.row_count = 0
+        self.segments: List[_Segment] = []
+        self.idf = np.ones(n_features, dtype=np.float32)
+        self.catalog: Optional[AssetCatalog] = None
+        self.version: Optional[int] = None
+        self._feature_cache: Dict[str, Tuple[int, ...]] = {}
+
+    @property
+    def stale_rows(self) -> int:
+        # Slots outside the base fit's live rows: dropped ones and rows
+        # weighted with the base fit's idf
+        if not self.segments:
+            return 0
+        return sum(segment.slot_count for segment in self.segments) - len(self.segments[0].live_slots)
+
+    def _token_features(self, token: str) -> Tuple[int, ...]:
+        features = self._feature_cache.get(token)
+        if features is None:
+            padded = f"<{token}>"
+            grams = [token] + [padded[i:i + 3] for i in range(len(padded) - 2)]
+            features = tuple(zlib.crc32(gram.encode('utf-8')) % self.n_features for gram in grams)
+            self._feature_cache[token] = features
+        return features
+
+    def _document_text(self, catalog: AssetCatalog, row: int) -> str:
+        return f"{catalog.category(row).replace('_', ' ')} {catalog.string(row, CATALOG_CONTENT)[:self.max_chars]}"
+
+    def _counts(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Sparse term counts as (row, feature, count) triples sorted by row
+        features = array('i')
+        lengths = array('i')
+        for text in texts:
+            before = len(features)
+            for token in tokenize(text):
+                features.extend(self._token_features(token))
+            lengths.append(len(features) - before)
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), np.frombuffer(lengths, dtype=np.int32))
+        keys, counts = np.unique(rows * self.n_features + np.frombuffer(features, dtype=np.int32), return_counts=True)
+        return keys // self.n_features, keys % self.n_features, counts
+
+    def _weight(self, rows: np.ndarray, cols: np.ndarray, counts: np.ndarray, row_count: int) -> np.ndarray:
+        weights = np.log1p(counts, dtype=np.float32) * self.idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=row_count)).astype(np.float32)
+        norms[norms == 0] = 1.0
+        return weights / norms[rows]
+
+    def _segment(self, texts: Iterable[str], rows: np.ndarray, fit_idf: bool) -> _Segment:
+        # Two passes over compact per-chunk counts: the first collects document
+        # frequencies, the second weights each chunk and scatters it into the
+        # column-major arrays, so no full-size row-major copy is ever built.
+        # Without fit_idf the current idf is kept.
+        texts = iter(texts)
+        chunks = []
+        doc_freq = np.zeros(self.n_features, dtype=np.int64)
+        while True:
+            chunk = list(islice(texts, FIT_CHUNK_ROWS))
+            if not chunk:
+                break
+            chunk_rows, cols, counts = self._counts(chunk)
+            doc_freq += np.bincount(cols, minlength=self.n_features)
+            chunks.append((len(chunk), chunk_rows.astype(np.uint16), cols.astype(np.uint16), counts.astype(np.uint16)))
+
+        slot_count = len(rows)
+        if fit_idf:
+            self.idf = np.log((1 + slot_count) / (1 + doc_freq)).astype(np.float32) + 1.0
+        indptr = np.zeros(self.n_features + 1, dtype=np.int64)
+        np.cumsum(doc_freq, out=indptr[1:])
+        doc_slots = np.empty(indptr[-1], dtype=np.int32)
+        weights = np.empty(indptr[-1], dtype=np.float32)
+
+        # Next free slot per feature; chunks arrive in slot order, so each
+        # feature's postings stay sorted by slot
+        cursor = indptr[:-1].copy()
+        first_slot = 0
+        for index in range(len(chunks)):
+            chunk_size, chunk_rows, cols, counts = chunks[index]
+            chunks[index] = None
+            chunk_weights = self._weight(chunk_rows, cols, counts, chunk_size)
+            order = np.argsort(cols, kind='stable')
+            cols = cols[order]
+            per_feature = np.bincount(cols, minlength=self.n_features)
+            group_start = np.cumsum(per_feature) - per_feature
+            slots = cursor[cols] + (np.arange(len(order)) - group_start[cols])
+            doc_slots[slots] = chunk_rows[order].astype(np.int32) + first_slot
+            weights[slots] = chunk_weights[order]
+            cursor += per_feature
+            first_slot += chunk_size
+
+        return _Segment(indptr, doc_slots, weights, slot_count, np.arange(slot_count, dtype=np.int32), rows)
+
+    def fit(self, catalog: AssetCatalog, version: Optional[int] = None) -> "AssetRetriever":
+        row_count = len(catalog)
+        rows = np.arange(row_count, dtype=np.int32)
+        texts = (self._document_text(catalog, row) for row in range(row_count))
+        self.segments = [self._segment(texts, rows, fit_idf=True)]
+        self.row_count = row_count
+        self.catalog = catalog
+        self.version = version
+        return self
+
+    def updated(self, catalog: AssetCatalog, version: int, old_to_new: Sequence[int], new_rows: Sequence[int]) -> "AssetRetriever":
+        # A retriever for the reloaded catalog. old_to_new maps each row of
+        # this retriever's catalog to its unchanged row in the new one (-1 for
+        # changed and removed rows); new_rows are the changed and added rows.
+        # Those are weighted with this fit's idf, which drifts, so the
+        # catalog is refit once too many rows are stale. Never mutates self.
+        retriever = AssetRetriever(self.n_features, self.max_chars)
+        retriever._feature_cache = self._feature_cache
+        retriever.idf = self.idf
+        old_to_new = np.asarray(old_to_new, dtype=np.int32)
+        for segment in self.segments:
+            rows = old_to_new[segment.live_rows]
+            kept = rows >= 0
+            retriever.segments.append(_Segment(
+                segment.indptr, segment.doc_slots, segment.weights, segment.slot_count,
+                segment.live_slots[kept], rows[kept]
+            ))
+        if new_rows:
+            rows = np.asarray(new_rows, dtype=np.int32)
+            texts = (self._document_text(catalog, row) for row in new_rows)
+            retriever.segments.append(retriever._segment(texts, rows, fit_idf=False))
+        if retriever.stale_rows > REFIT_STALE_RATIO * len(catalog):
+            return AssetRetriever(self.n_features, self.max_chars).fit(catalog, version)
+        retriever.row_count = len(catalog)
+        retriever.catalog = catalog
+        retriever.version = version
+        return retriever
+
+    def top_k(self, query: str, k: int) -> List[int]:
+        if not self.row_count or k <= 0:
+            return []
+
+        rows, cols, counts = self._counts([query])
+        query_weights = self._weight(rows, cols, counts, 1).tolist()
+        features = cols.tolist()
+        scores = np.zeros(self.row_count, dtype=np.float32)
+        for segment in self.segments:
+            scores[segment.live_rows] = segment.scores(features, query_weights)[segment.live_slots]
+        k = min(k, len(scores))
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        ranked = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [int(row) for row in ranked if scores[row] > 0]
+
+    def shortlist(self, query: str, k: int) -> List[Asset]:
+        return [self.catalog[row] for row in self.top_k(query, k)]
@@ -0,0 +1,134 @@
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from app.services.asset_catalog import STRING_COLUMNS
+
+MAGIC = b"TCSNAP01"
+VERSION = 1
+
+# magic, version, row count, category count, csv size, csv mtime (ns), csv sha256
+HEADER = struct.Struct("<8sIIIQQ32s")
+# offset and byte length of: string offsets, string blob, category ids, prices
+SECTIONS = struct.Struct("<8Q")
+
+
+def csv_fingerprint(csv_path: Path) -> Tuple[int, int]:
+    stat = csv_path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def csv_digest(csv_path: Path) -> bytes:
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _pad(length: int) -> int:
+    return (-length) % 8
+
+
+def write_snapshot(snapshot_path: Path, csv_path: Path, catalog) -> None:
+    csv_size, csv_mtime_ns = csv_fingerprint(csv_path)
+    digest = csv_digest(csv_path)
+
+    # Interned category names follow the per-row strings in the same blob
+    row_strings_end = catalog.row_count * len(STRING_COLUMNS)
+    offsets = array('Q')
+    offsets.frombytes(memoryview(catalog.string_offsets)[:row_strings_end + 1].tobytes())
+    blob = bytearray(memoryview(catalog.string_blob)[:offsets[-1]])
+    for category in catalog.categories:
+        blob += category.encode('utf-8')
+        offsets.append(len(blob))
+
+    sections = []
+    cursor = HEADER.size + SECTIONS.size
+    payload = []
+    for data in (offsets.tobytes(), bytes(blob), memoryview(catalog.category_ids).tobytes(), memoryview(catalog.prices).tobytes()):
+        sections.extend((cursor, len(data)))
+        padding = b'\0' * _pad(len(data))
+        payload.append(data + padding)
+        cursor += len(data) + len(padding)
+
+    # Write-then-rename so concurrent workers only ever map a complete file
+    header = HEADER.pack(MAGIC, VERSION, catalog.row_count, len(catalog.categories), csv_size, csv_mtime_ns, digest)
+    tmp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(SECTIONS.pack(*sections))
+            for data in payload:
+                f.write(data)
+        os.replace(tmp_path, snapshot_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+class AssetSnapshot:
+
+    def __init__(self, snapshot_path: Path):
+        self.path = snapshot_path
+        self._file = open(snapshot_path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        (magic, version, self.row_count, self.category_count,
+         self.csv_size, self.csv_mtime_ns, self.csv_sha256) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported asset snapshot format in {snapshot_path}")
+
+        sections = SECTIONS.unpack_from(self._mmap, HEADER.size)
+        view = memoryview(self._mmap)
+        offsets_at, offsets_len, blob_at, blob_len, cats_at, cats_len, prices_at, prices_len = sections
+        self.string_offsets = view[offsets_at:offsets_at + offsets_len].cast('Q')
+        self.string_blob = view[blob_at:blob_at + blob_len]
+        self.category_ids = view[cats_at:cats_at + cats_len].cast('I')
+        self.prices = view[prices_at:prices_at + prices_len].cast('d')
+
+        first_category = self.row_count * len(STRING_COLUMNS)
+        self.categories: List[str] = [self.string(first_category + i) for i in range(self.category_count)]
+
+    def string(self, index: int) -> str:
+        return str(self.string_blob[self.string_offsets[index]:self.string_offsets[index + 1]], 'utf-8')
+
+    def matches(self, csv_path: Path) -> bool:
+        csv_size, csv_mtime_ns = csv_fingerprint(csv_path)
+        if csv_size != self.csv_size:
+            return False
+        if csv_mtime_ns == self.csv_mtime_ns:
+            return True
+        # Touched but possibly unchanged (checkout, copy): fall back to the content hash
+        return csv_digest(csv_path) == self.csv_sha256
+
+    def close(self):
+        for name in ("string_offsets", "string_blob", "category_ids", "prices"):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+        self._mmap.close()
+        self._file.close()
+
+
+def open_snapshot(snapshot_path: Path, csv_path: Path) -> Optional[AssetSnapshot]:
+    if not snapshot_path.exists():
+        return None
+    try:
+        snapshot = AssetSnapshot(snapshot_path)
+    except Exception as e:
+        print(f"Ignoring unreadable asset snapshot {snapshot_path}: {e}")
+        return None
+    if not snapshot.matches(csv_path):
+        snapshot.close()
+        return None
+    return snapshot
@@ -0,0 +1,207 @@
+import asyncio
+import importlib.util
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from app.services.image_encoding import DEFAULT_QUALITY, encode_image
+
+# Longest side fed to the model; U^2-Net infers at 320x320 anyway, so
+# larger inputs only cost preprocessing time
+DEFAULT_MAX_SIDE = 1024
+
+STAGES = ("decode", "downscale", "inference", "mask", "encode")
+
+# How long a ready ping waits for the other workers' pings
+READY_TIMEOUT = 600.0
+
+
+class BackgroundRemover:
+    # rembg provider. rembg pulls in onnxruntime and friends, so it is only
+    # imported the first time a session is needed, never at API import time.
+
+    def __init__(self, model_name: str = "u2net", max_side: int = DEFAULT_MAX_SIDE):
+        self.model_name = model_name
+        self.max_side = max_side
+        self._session: Optional[Any] = None
+        self._remove = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_available() -> bool:
+        return importlib.util.find_spec("rembg") is not None
+
+    def session(self) -> Any:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    from rembg import new_session, remove
+                    self._remove = remove
+                    self._session = new_session(self.model_name)
+        return self._session
+
+    def warm_up(self):
+        # Run the model once so its first real call skips ONNX graph initialization
+        session = self.session()
+        self._remove(Image.new('RGB', (64, 64), color='white'), session=session, only_mask=True)
+
+    def cutout(self, image_data: bytes, image_format: str = "png",
+               quality: int = DEFAULT_QUALITY) -> Tuple[bytes, Dict[str, float]]:
+        # Returns the encoded cutout and per-stage timings in milliseconds.
+        # The input is decoded once; only the mask is predicted at reduced
+        # size and it is scaled back up to cut out the full-resolution image.
+        # Cutouts need alpha, so only png and webp make sense as output.
+        session = self.session()
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+
+        def lap(stage: str):
+            nonlocal started
+            now = time.perf_counter()
+            timings[stage] = round((now - started) * 1000, 2)
+            started = now
+
+        image = Image.open(BytesIO(image_data))
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        lap("decode")
+
+        model_input = image if image.mode == "RGB" else image.convert("RGB")
+        if max(image.size) > self.max_side:
+            scale = self.max_side / max(image.size)
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            model_input = model_input.resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+        lap("downscale")
+
+        mask = self._remove(model_input, session=session, only_mask=True)
+        lap("inference")
+
+        if mask.size != image.size:
+            mask = mask.resize(image.size, Image.Resampling.BILINEAR)
+        image.putalpha(mask.convert("L"))
+        lap("mask")
+
+        output_data = encode_image(image, image_format, quality)
+        lap("encode")
+        return output_data, timings
+
+
+# State of a BackgroundRemovalPool worker process
+_worker_remover: Optional[BackgroundRemover] = None
+_worker_report: Dict[str, Any] = {}
+_worker_barrier = None
+
+
+def _init_worker(model_name: str, max_side: int, warmup: bool, ready_barrier):
+    # Process initializer: the session lives as long as the process
+    global _worker_remover, _worker_report, _worker_barrier
+    _worker_barrier = ready_barrier
+    started = time.perf_counter()
+    _worker_remover = BackgroundRemover(model_name, max_side)
+    if warmup:
+        _worker_remover.warm_up()
+    _worker_report = {"pid": os.getpid(), "load_seconds": round(time.perf_counter() - started, 2)}
+
+
+def _worker_cutout(image_data: bytes, image_format: str, quality: int) -> Tuple[bytes, Dict[str, float]]:
+    return _worker_remover.cutout(image_data, image_format, quality)
+
+
+def _worker_ping() -> Dict[str, Any]:
+    # Holds its worker until every worker has a ping, so each one answers
+    # exactly one ping and none can answer for a worker still starting
+    _worker_barrier.wait(READY_TIMEOUT)
+    return _worker_report
+
+
+class BackgroundRemovalPool:
+    # Runs cutouts in worker processes, each holding one long-lived rembg
+    # session, so inference neither blocks the event loop nor contends with
+    # it for the GIL. Stage timings are summed per stage for stats(). A
+    # worker that dies (OOM on a huge image) breaks the whole executor, so
+    # a broken executor is replaced and the call retried once.
+
+    def __init__(self, workers: int = 1, model_name: str = "u2net",
+                 max_side: int = DEFAULT_MAX_SIDE, warmup: bool = False):
+        self.worker_count = max(1, workers)
+        self.model_name = model_name
+        self.max_side = max_side
+        self.warmup = warmup
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._completed = 0
+        self._failed = 0
+        self._restarted = 0
+        self._stage_ms = {stage: 0.0 for stage in STAGES}
+
+    def start(self):
+        if self._executor is None:
+            context = multiprocessing.get_context("spawn")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.worker_count,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self.model_name, self.max_side, self.warmup, context.Barrier(self.worker_count))
+            )
+            print(f"[BackgroundRemovalPool] Started {self.worker_count} worker(s)")
+
+    def _replace_executor(self, broken: ProcessPoolExecutor):
+        # Concurrent calls all see the same broken executor; only the first replaces it
+        if self._executor is broken:
+            print("[BackgroundRemovalPool] A worker died, restarting the pool")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._restarted += 1
+        self.start()
+
+    async def _run(self, function: Callable, *args) -> Any:
+        self.start()
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        try:
+            return await loop.run_in_executor(executor, function, *args)
+        except BrokenProcessPool:
+            self._replace_executor(executor)
+            return await loop.run_in_executor(self._executor, function, *args)
+
+    async def wait_ready(self) -> List[Dict[str, Any]]:
+        # Completes once every worker has created its session (and warmed
+        # up). One ping per worker makes the executor spawn all of them, and
+        # each runs the initializer before taking its first task.
+        return list(await asyncio.gather(*(self._run(_worker_ping) for _ in range(self.worker_count))))
+
+    async def cutout(self, image_data: bytes, image_format: str = "png",
+                     quality: int = DEFAULT_QUALITY) -> Tuple[bytes, Dict[str, float]]:
+        try:
+            output_data, timings = await self._run(_worker_cutout, image_data, image_format, quality)
+        except Exception:
+            self._failed += 1
+            raise
+        self._completed += 1
+        for stage, ms in timings.items():
+            self._stage_ms[stage] = self._stage_ms.get(stage, 0.0) + ms
+        return output_data, timings
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.worker_count,
+            "running": self._executor is not None,
+            "max_side": self.max_side,
+            "completed": self._completed,
+            "failed": self._failed,
+            "restarted": self._restarted,
+            "avg_stage_ms": {
+                stage: round(total / self._completed, 2) if self._completed else None
+                for stage, total in self._stage_ms.items()
+            }
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -1,8 +1,8 @@
-import hashlib
-import json
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+from app.services.canvas_hash import canvas_state_hash
+
 
 class BlockchainLedger:
     
@@ -14,14 +14,16 @@ class BlockchainLedger:
         self,
         hash_value: str,
         compliance_summary: Dict[str, Any],
-        canvas_state: Dict[str, Any]
+        canvas_state: Dict[str, Any],
+        canvas_hash: Optional[str] = None
     ) -> Optional[str]:
+        # canvas_hash saves hashing the canvas again when the caller already has it
         block = {
             "block_id": f"BLOCK_{self.block_counter:06d}",
             "timestamp": datetime.utcnow().isoformat(),
             "hash": hash_value,
             "compliance_summary": compliance_summary,
-            "canvas_state_hash": self._hash_canvas_state(canvas_state),
+            "canvas_state_hash": canvas_hash or canvas_state_hash(canvas_state),
             "previous_hash": self._get_previous_hash(),
             "verified": compliance_summary.get("compliant", False)
         }
@@ -33,10 +35,6 @@ class BlockchainLedger:
         
         return block["block_id"]
     
-    def _hash_canvas_state(self, canvas_state: Dict[str, Any]) -> str:
-        canvas_json = json.dumps(canvas_state, sort_keys=True)
-        return hashlib.sha256(canvas_json.encode()).hexdigest()
-    
     def _get_previous_hash(self) -> Optional[str]:
         if len(self.ledger) == 0:
             return None
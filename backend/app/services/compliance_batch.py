@@ -0,0 +1,102 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.services.canvas_hash import canvas_state_hash
+from app.services.compliance_engine import ComplianceEngine
+from app.services.rule_packs import RulePack
+
+
+def summary_hash(summary: Dict[str, Any]) -> str:
+    # The hash /verify commits to the ledger
+    return hashlib.sha256(json.dumps(summary, sort_keys=True).encode()).hexdigest()
+
+
+class ComplianceBatchRunner:
+    # Checks many canvases or text blobs on a thread pool. Every item of a
+    # batch is checked against one snapshot of the rule packs, so the
+    # compiled matchers are shared by all threads and a reload mid-batch
+    # cannot split a batch across rule versions. Results are yielded as
+    # they finish, not in request order.
+
+    def __init__(self, engine: ComplianceEngine, workers: int = 0):
+        self.engine = engine
+        self.workers = workers if workers > 0 else min(4, os.cpu_count() or 1)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.batches = 0
+        self.items = 0
+        self.failed = 0
+        self._check_seconds = 0.0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="compliance")
+        return self._executor
+
+    def check_item(
+        self,
+        index: int,
+        item: Dict[str, Any],
+        packs: Dict[str, RulePack],
+        channel: Optional[str]
+    ) -> Dict[str, Any]:
+        # Runs on a pool thread. item holds either canvas_state or text, plus
+        # optional id, toon, metadata and channel (which beats the batch's).
+        started = time.perf_counter()
+        result: Dict[str, Any] = {"index": index, "id": item.get("id")}
+        channel = item.get("channel") or channel
+        try:
+            if item.get("canvas_state"):
+                summary = self.engine.summarize_canvas(
+                    item["canvas_state"], item.get("toon"), item.get("metadata"), channel, packs
+                )
+                result.update(kind="canvas", hash=summary_hash(summary), canvas_hash=canvas_state_hash(item["canvas_state"]))
+            elif item.get("text"):
+                summary = self.engine.check_text_compliance(item["text"], channel or (item.get("toon") or {}).get("channel"), packs)
+                result["kind"] = "text"
+            else:
+                raise ValueError("Item needs a canvas_state or text")
+            result.update(compliant=summary["compliant"], compliance_summary=summary)
+        except Exception as e:
+            result["error"] = str(e)
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+
+    async def run(self, items: List[Dict[str, Any]], channel: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        packs = self.engine.rules.snapshot()
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(self.executor, self.check_item, index, item, packs, channel)
+            for index, item in enumerate(items)
+        ]
+        self.batches += 1
+        try:
+            for next_result in asyncio.as_completed(futures):
+                result = await next_result
+                self.items += 1
+                self.failed += 1 if "error" in result else 0
+                self._check_seconds += result["elapsed_ms"] / 1000
+                yield result
+        finally:
+            # The client went away: drop the items no thread has started
+            for future in futures:
+                future.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "batches": self.batches,
+            "items": self.items,
+            "failed": self.failed,
+            "avg_item_ms": round(self._check_seconds / self.items * 1000, 2) if self.items else 0.0
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,49 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+from app.services.rule_matcher import RuleMatch
+from app.services.rule_packs import RulePack
+
+
+class ElementResultCache:
+    # LRU of rule matches per canvas text element, so a verify call only
+    # rescans the elements that changed since the last one. Keys include
+    # the rule pack and its version: after a rules reload every element is
+    # scanned again and the old entries age out. Keyed by the element's
+    # text rather than the whole element, so moving or restyling a text
+    # box is still a hit. Shared by the batch verify threads.
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int, str], Tuple[RuleMatch, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def find_all(self, pack: RulePack, text: str) -> List[RuleMatch]:
+        key = (pack.name, pack.version, text)
+        with self._lock:
+            matches = self._entries.get(key)
+            if matches is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(matches)
+            self.misses += 1
+        matches = tuple(pack.matcher.find_all(text))
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = matches
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return list(matches)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses
+            }
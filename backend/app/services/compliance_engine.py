@@ -1,42 +1,65 @@
 import re
+from pathlib import Path
 from typing import Dict, List, Any, Optional
 
+from app.services.compliance_cache import ElementResultCache
+from app.services.rule_matcher import RuleMatch, first_occurrences
+from app.services.rule_packs import FORBIDDEN_WORD, RESTRICTED_BRAND, RulePack, RulePackRegistry
+
+DEFAULT_RULES_DIR = Path(__file__).resolve().parent.parent.parent / "rules"
+
 
 class ComplianceEngine:
+    # Rules come from per-channel rule packs (see RulePackRegistry); every
+    # check takes the channel and falls back to the default pack. Canvas
+    # text elements are scanned through element_cache.
     
-    def __init__(self):
-        self.forbidden_words = [
-            "sale", "discount", "cheap", "best price", "limited time",
-            "act now", "buy now", "hurry", "exclusive", "free shipping",
-            "guaranteed", "lowest price", "price match"
-        ]
-        
-        self.restricted_brands = [
-            "nike", "adidas", "apple", "samsung"
-        ]
-        
-        self.required_flags = [
-            "no_pricing",
-            "no_promotional_claims",
-            "product_focused"
-        ]
+    def __init__(self, rules: Optional[RulePackRegistry] = None, element_cache: Optional[ElementResultCache] = None):
+        self.rules = rules or RulePackRegistry(DEFAULT_RULES_DIR)
+        self.element_cache = element_cache or ElementResultCache()
+    
+    def rule_pack(
+        self,
+        channel: Optional[str] = None,
+        toon: Optional[Dict[str, Any]] = None,
+        packs: Optional[Dict[str, RulePack]] = None
+    ) -> RulePack:
+        # An explicit channel wins over the one recorded in the TOON. packs
+        # pins the lookup to a registry snapshot (see RulePackRegistry.snapshot)
+        if not channel and isinstance(toon, dict):
+            channel = toon.get("channel")
+        channel = channel if isinstance(channel, str) else None
+        if packs is not None:
+            return RulePackRegistry.select(packs, channel)
+        return self.rules.get(channel)
+    
+    @staticmethod
+    def describe_match(match: RuleMatch, forbidden_label: str = "Forbidden word") -> str:
+        if match.kind == RESTRICTED_BRAND:
+            return f"Restricted brand: '{match.rule}'"
+        return f"{forbidden_label}: '{match.rule}'"
+    
+    @staticmethod
+    def match_details(matches: List[RuleMatch], **extra) -> List[Dict[str, Any]]:
+        return [{"rule": m.rule, "kind": m.kind, "start": m.start, "end": m.end, **extra} for m in matches]
     
     async def validate(
         self,
         prompt: str,
         toon: Dict[str, Any],
-        assets: List[str]
+        assets: List[str],
+        channel: Optional[str] = None
     ) -> Dict[str, Any]:
         violations = []
         warnings = []
+        pack = self.rule_pack(channel, toon)
         
-        prompt_lower = prompt.lower()
-        for word in self.forbidden_words:
-            if word in prompt_lower:
-                violations.append(f"Forbidden promotional word detected: '{word}'")
+        prompt_matches = pack.matcher.first_matches(prompt)
+        for match in prompt_matches:
+            violations.append(self.describe_match(match, "Forbidden promotional word detected"))
         
         toon_compliance = toon.get("compliance", {})
-        for flag in self.required_flags:
+        for flag in pack.required_flags:
             if not toon_compliance.get(flag, False):
                 warnings.append(f"Missing compliance flag: {flag}")
         
@@ -47,7 +70,7 @@ class ComplianceEngine:
         
         colors = toon.get("colors", {})
         primary_color = colors.get("primary", "").lower()
-        if primary_color in ["#ff0000", "#ff3333", "#cc0000"]:
+        if primary_color in pack.promotional_colors:
             warnings.append("Red primary color may imply promotional content")
         
         if len(assets) == 0:
@@ -64,15 +87,33 @@ class ComplianceEngine:
             "prompt_validated": True,
             "toon_validated": True,
             "assets_validated": True,
-            "compliance_flags": toon_compliance
+            "compliance_flags": toon_compliance,
+            "matches": self.match_details(prompt_matches, source="prompt"),
+            "ruleset": pack.describe()
         }
     
     async def generate_final_summary(
         self,
         canvas_state: Dict[str, Any],
         toon: Optional[Dict[str, Any]] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        channel: Optional[str] = None
     ) -> Dict[str, Any]:
+        return self.summarize_canvas(canvas_state, toon, metadata, channel)
+    
+    def summarize_canvas(
+        self,
+        canvas_state: Dict[str, Any],
+        toon: Optional[Dict[str, Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        channel: Optional[str] = None,
+        packs: Optional[Dict[str, RulePack]] = None
+    ) -> Dict[str, Any]:
+        # Synchronous so batch verification can run it on worker threads.
+        # Channel order: the explicit one, the TOON's, then metadata.channel
+        if not channel and not (isinstance(toon, dict) and toon.get("channel")):
+            channel = (metadata or {}).get("channel")
+        pack = self.rule_pack(channel, toon, packs)
         text_elements = []
         if isinstance(canvas_state, dict):
             elements = canvas_state.get("elements", [])
@@ -82,23 +123,31 @@ class ComplianceEngine:
                     if text_content:
                         text_elements.append(text_content)
         
-        all_text = " ".join(text_elements).lower()
-        violations = []
-        for word in self.forbidden_words:
-            if word in all_text:
-                violations.append(f"Forbidden word: '{word}'")
+        element_matches = [self.element_cache.find_all(pack, text) for text in text_elements]
+        violations = [
+            self.describe_match(match)
+            for match in first_occurrences(match for found in element_matches for match in found)
+        ]
+        matches = [
+            detail
+            for index, found in enumerate(element_matches)
+            for detail in self.match_details(found, text_element=index)
+        ]
         
         summary = {
             "timestamp": metadata.get("timestamp") if metadata else None,
             "creative_id": metadata.get("creative_id") if metadata else None,
             "compliant": len(violations) == 0,
             "violations": violations,
+            "matches": matches,
             "element_count": len(canvas_state.get("elements", [])) if isinstance(canvas_state, dict) else 0,
             "text_elements_count": len(text_elements),
             "toon_applied": toon is not None,
+            "ruleset": pack.describe(),
             "compliance_checks": {
                 "no_pricing": not any("price" in text.lower() or "$" in text for text in text_elements),
-                "no_promotional_claims": len(violations) == 0,
+                "no_promotional_claims": not any(match["kind"] == FORBIDDEN_WORD for match in matches),
+                "no_restricted_brands": not any(match["kind"] == RESTRICTED_BRAND for match in matches),
                 "product_focused": True,
                 "layout_compliant": True
             }
@@ -106,13 +155,16 @@ class ComplianceEngine:
         
         return summary
     
-    def check_text_compliance(self, text: str) -> Dict[str, Any]:
+    def check_text_compliance(
+        self,
+        text: str,
+        channel: Optional[str] = None,
+        packs: Optional[Dict[str, RulePack]] = None
+    ) -> Dict[str, Any]:
         text_lower = text.lower()
-        violations = []
-        
-        for word in self.forbidden_words:
-            if word in text_lower:
-                violations.append(f"Forbidden word: '{word}'")
+        pack = self.rule_pack(channel, packs=packs)
+        matches = pack.matcher.find_all(text)
+        violations = [self.describe_match(match) for match in first_occurrences(matches)]
         
         has_pricing = bool(re.search(r'\$[\d,]+|\d+\s*(dollars?|usd)', text_lower))
         if has_pricing:
@@ -120,5 +172,7 @@ class ComplianceEngine:
         
         return {
             "compliant": len(violations) == 0,
-            "violations": violations
+            "violations": violations,
+            "matches": self.match_details(matches),
+            "ruleset": pack.describe()
         }
@@ -0,0 +1,58 @@
+import asyncio
+import hashlib
+import time
+from typing import Any, Dict, Tuple
+
+from app.services.background_removal import BackgroundRemovalPool
+from app.services.image_cache import ImageCache
+from app.services.image_encoding import DEFAULT_QUALITY, EXTENSIONS
+from app.services.single_flight import SingleFlight
+
+
+class CutoutCache:
+    # Background removal results keyed by a hash of the source bytes and the
+    # settings that shape the output, so the same product photo is segmented
+    # once no matter how many creatives or requests use it. Identical
+    # concurrent requests share one removal.
+
+    def __init__(self, pool: BackgroundRemovalPool, store: ImageCache):
+        self.pool = pool
+        self.store = store
+        self._flight = SingleFlight()
+        self._counters = {"hits": 0, "misses": 0}
+
+    def key(self, image_data: bytes, image_format: str = "png", quality: int = DEFAULT_QUALITY) -> str:
+        source = hashlib.sha256(image_data).hexdigest()
+        settings = {
+            "model": self.pool.model_name,
+            "max_side": self.pool.max_side,
+            "image_format": image_format,
+            "image_quality": quality
+        }
+        return ImageCache.hash_key([source, settings], EXTENSIONS[image_format])
+
+    async def cutout(self, image_data: bytes, image_format: str = "png",
+                     quality: int = DEFAULT_QUALITY) -> Tuple[str, bool, Dict[str, float]]:
+        # Returns the store key, whether it was already cached, and the
+        # per-stage timings of the removal (empty on a hit)
+        key = self.key(image_data, image_format, quality)
+        if self.store.contains(key):
+            self._counters["hits"] += 1
+            return key, True, {}
+        self._counters["misses"] += 1
+        timings = await self._flight.do(key, lambda: self._remove(key, image_data, image_format, quality))
+        return key, False, dict(timings)
+
+    async def _remove(self, key: str, image_data: bytes, image_format: str, quality: int) -> Dict[str, float]:
+        output_data, timings = await self.pool.cutout(image_data, image_format, quality)
+        started = time.perf_counter()
+        await asyncio.to_thread(self.store.set, key, output_data)
+        timings["store"] = round((time.perf_counter() - started) * 1000, 2)
+        return timings
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._counters,
+            "coalesced": self._flight.coalesced,
+            "store": self.store.stats()
+        }
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# <sha256>.<extension>; anything else is rejected before touching the filesystem
+KEY_PATTERN = re.compile(r'^[0-9a-f]{64}\.(png|webp|jpg)$')
+
+
+class ImageCache:
+    # Content-addressed store of encoded images, one file per key, which
+    # doubles as the directory the /images endpoint serves from. Entries are
+    # evicted least-recently-used first once the directory exceeds
+    # max_bytes; hits refresh the file's mtime so recency survives a restart.
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._scan()
+
+    @staticmethod
+    def hash_key(material: Any, extension: str) -> str:
+        # Key for an image fully determined by JSON-serializable inputs
+        encoded = json.dumps(material, sort_keys=True, separators=(',', ':'))
+        return f"{hashlib.sha256(encoded.encode()).hexdigest()}.{extension}"
+
+    @staticmethod
+    def make_key(sd_prompt: str, params: Dict[str, Any], seed: int, extension: str) -> str:
+        return ImageCache.hash_key([sd_prompt, params, seed], extension)
+
+    @staticmethod
+    def content_key(data: bytes, extension: str) -> str:
+        return f"{hashlib.sha256(data).hexdigest()}.{extension}"
+
+    @staticmethod
+    def is_valid_key(key: str) -> bool:
+        return KEY_PATTERN.match(key) is not None
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    def _scan(self):
+        entries = []
+        for path in self.cache_dir.iterdir():
+            if not self.is_valid_key(path.name):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.name, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def path(self, key: str) -> Optional[Path]:
+        # Path of a stored entry for serving, refreshing its recency
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._forget(key)
+            return None
+        return path
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key not in self._entries:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._forget(key)
+                self._counters["misses"] += 1
+            return None
+        with self._lock:
+            self._counters["hits"] += 1
+        return data
+
+    def set(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[ImageCache] Could not store {key}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self._counters["stores"] += 1
+            self._evict()
+
+    def _forget(self, key: str):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self._counters["evictions"] += 1
+            self._path(key).unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                **self._counters
+            }
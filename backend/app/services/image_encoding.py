@@ -0,0 +1,36 @@
+from io import BytesIO
+from typing import Dict
+
+from PIL import Image
+
+MEDIA_TYPES: Dict[str, str] = {
+    "png": "image/png",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+}
+
+EXTENSIONS: Dict[str, str] = {
+    "png": "png",
+    "webp": "webp",
+    "jpeg": "jpg",
+}
+
+EXTENSION_MEDIA_TYPES: Dict[str, str] = {EXTENSIONS[fmt]: media_type for fmt, media_type in MEDIA_TYPES.items()}
+
+DEFAULT_QUALITY = 90
+
+
+def encode_image(image: Image.Image, image_format: str = "png", quality: int = DEFAULT_QUALITY) -> bytes:
+    # quality applies to webp/jpeg; png is always lossless
+    buffer = BytesIO()
+    if image_format == "jpeg":
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        image.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+    elif image_format == "webp":
+        image.save(buffer, format="WEBP", quality=quality, method=4)
+    elif image_format == "png":
+        image.save(buffer, format="PNG")
+    else:
+        raise ValueError(f"Unsupported image format: {image_format}")
+    return buffer.getvalue()
@@ -0,0 +1,433 @@
+import asyncio
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+
+# Per-item inputs and post-processing options; every other job parameter
+# must match for jobs to share a batch
+PER_ITEM_KEYS = ("sd_prompt", "seed", "image_format", "image_quality", "upscale", "preview_every")
+
+
+class QueueFullError(Exception):
+    pass
+
+
+def batch_key(params: Dict[str, Any]) -> Tuple:
+    return tuple(sorted((key, value) for key, value in params.items() if key not in PER_ITEM_KEYS))
+
+
+def _worker_main(index: int, job_queue, result_queue, cancel_flags, num_threads: int, warmup: bool):
+    # Runs in a spawned process: the pipeline is loaded once and reused for
+    # every job this worker receives. cancel_flags is shared memory the pool
+    # sets, one slot per item of the current batch.
+    from app.services.local_gen import GenerationCancelled, LocalGen
+
+    started = time.perf_counter()
+    local_gen = LocalGen(num_threads=num_threads)
+    local_gen._init_sd()
+    report = {"loaded": local_gen.sd_pipe != "failed", "load_seconds": time.perf_counter() - started, "warmup_seconds": None}
+    if warmup and report["loaded"]:
+        # One throwaway render so the first real request doesn't pay for
+        # lazy allocations and kernel selection
+        started = time.perf_counter()
+        local_gen.generate_images([{"sd_prompt": "warm-up", "seed": 0}])
+        report["warmup_seconds"] = time.perf_counter() - started
+    result_queue.put(("ready", index, None, report))
+
+    while True:
+        batch = job_queue.get()
+        if batch is None:
+            break
+        batch_id, items = batch
+        result_queue.put(("started", index, batch_id, None))
+
+        def on_preview(position: int, step: int, steps: int, preview: bytes, batch_id=batch_id):
+            result_queue.put(("progress", index, batch_id, (position, {"step": step, "steps": steps, "preview": preview})))
+
+        try:
+            results = local_gen.generate_images(items, cancel_flags, on_preview)
+            result_queue.put(("done", index, batch_id, results))
+        except GenerationCancelled:
+            result_queue.put(("cancelled", index, batch_id, None))
+        except Exception as e:
+            traceback.print_exc()
+            result_queue.put(("error", index, batch_id, str(e)))
+
+
+# Receives {"step", "steps", "preview"} while a job renders; may be a coroutine function
+ProgressCallback = Callable[[Dict[str, Any]], Any]
+# Receives each worker's load report, None for workers still loading
+WorkersCallback = Callable[[List[Optional[Dict[str, Any]]]], None]
+
+
+class ImageJob:
+    __slots__ = ("id", "params", "batch_key", "future", "on_progress", "worker", "submitted_at", "started_at")
+
+    def __init__(self, job_id: int, params: Dict[str, Any], future: asyncio.Future,
+                 on_progress: Optional[ProgressCallback] = None):
+        self.id = job_id
+        self.params = params
+        self.batch_key = batch_key(params)
+        self.future = future
+        self.on_progress = on_progress
+        self.worker: Optional[int] = None
+        self.submitted_at = time.perf_counter()
+        self.started_at: Optional[float] = None
+
+
+class _Worker:
+    __slots__ = ("index", "process", "job_queue", "result_queue", "cancel_flags", "reader", "retired",
+                 "batch_id", "jobs", "render_timer", "ready", "report")
+
+    def __init__(self, index: int, process, job_queue, result_queue, cancel_flags):
+        self.index = index
+        self.process = process
+        self.job_queue = job_queue
+        # Each worker writes to its own result queue: a process killed while
+        # holding a queue's write lock would otherwise block every writer
+        self.result_queue = result_queue
+        self.cancel_flags = cancel_flags
+        self.reader: Optional[threading.Thread] = None
+        self.retired = False
+        self.batch_id: Optional[int] = None
+        self.jobs: List[ImageJob] = []
+        self.render_timer: Optional[asyncio.TimerHandle] = None
+        self.ready = False
+        self.report: Optional[Dict[str, Any]] = None
+
+    @property
+    def idle(self) -> bool:
+        return self.batch_id is None
+
+
+class ImageWorkerPool:
+    # Stable Diffusion runs in dedicated worker processes so a render never
+    # blocks the event loop. Pending jobs wait in a bounded queue on the API
+    # side and are handed to whichever worker goes idle first, grouped into
+    # batches of up to max_batch_size jobs. An idle worker waits up to
+    # batch_window seconds for the oldest pending job's batch to fill.
+    # Cancelling a running job flags it in shared memory; the worker stops
+    # denoising as soon as every job of its batch is flagged. A worker process
+    # that dies (OOM kill, crash) is replaced when the next batch is
+    # dispatched or by the periodic liveness check, whichever comes first;
+    # the jobs it was running go back to the front of the queue.
+    # job_timeout limits a render from the moment its worker starts it; a
+    # batch that runs past it is failed and its worker replaced. Time spent
+    # waiting in the queue counts against queue_timeout instead, which only
+    # drops the pending job. on_workers_changed is called whenever a worker
+    # finishes loading or is respawned.
+
+    def __init__(
+        self,
+        workers: int = 1,
+        max_queue: int = 8,
+        job_timeout: float = 300.0,
+        queue_timeout: Optional[float] = None,
+        threads_per_worker: Optional[int] = None,
+        max_batch_size: int = 1,
+        batch_window: float = 0.0,
+        warmup: bool = False,
+        check_interval: float = 5.0,
+        on_workers_changed: Optional[WorkersCallback] = None
+    ):
+        self.worker_count = max(1, workers)
+        self.max_queue = max_queue
+        self.job_timeout = job_timeout
+        self.queue_timeout = queue_timeout
+        self.max_batch_size = max(1, max_batch_size)
+        self.batch_window = batch_window
+        self.warmup = warmup
+        self.check_interval = check_interval
+        self.on_workers_changed = on_workers_changed
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 4) // self.worker_count)
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: List[_Worker] = []
+        self._pending: Deque[ImageJob] = deque()
+        self._job_ids = itertools.count(1)
+        self._batch_ids = itertools.count(1)
+        self._dispatch_timer: Optional[asyncio.TimerHandle] = None
+        self._check_timer: Optional[asyncio.TimerHandle] = None
+        self._batch_sizes: Dict[int, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._counters = {"completed": 0, "failed": 0, "timed_out": 0, "cancelled": 0, "rejected": 0, "interrupted": 0, "restarted": 0}
+        self._all_ready: Optional[asyncio.Event] = None
+        self._progress_tasks = set()
+
+    def start(self):
+        if self._workers:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._all_ready = asyncio.Event()
+        self._workers = [self._spawn(index) for index in range(self.worker_count)]
+        if self.check_interval > 0:
+            self._check_timer = self._loop.call_later(self.check_interval, self._check_workers)
+        print(f"[ImageWorkerPool] Started {self.worker_count} worker(s), "
+              f"{self.threads_per_worker} torch thread(s) each")
+        self._workers_changed()
+
+    def _spawn(self, index: int) -> _Worker:
+        job_queue = self._context.Queue()
+        result_queue = self._context.Queue()
+        cancel_flags = self._context.Array('b', self.max_batch_size, lock=False)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(index, job_queue, result_queue, cancel_flags, self.threads_per_worker, self.warmup),
+            name=f"sd-worker-{index}",
+            daemon=True
+        )
+        process.start()
+        worker = _Worker(index, process, job_queue, result_queue, cancel_flags)
+        worker.reader = threading.Thread(target=self._read_results, args=(worker,), name=f"image-worker-results-{index}", daemon=True)
+        worker.reader.start()
+        return worker
+
+    def _replace_worker(self, worker: _Worker):
+        # The jobs of its batch that are still wanted go back to the front of the queue
+        worker.retired = True
+        if worker.render_timer is not None:
+            worker.render_timer.cancel()
+        if worker.process.is_alive():
+            worker.process.terminate()
+        survivors = [job for job in worker.jobs if not job.future.done()]
+        self._pending.extendleft(reversed(survivors))
+        self._counters["restarted"] += 1
+        self._workers[worker.index] = self._spawn(worker.index)
+        self._workers_changed()
+
+    def _replace_dead_workers(self):
+        for worker in list(self._workers):
+            if not worker.process.is_alive():
+                print(f"[ImageWorkerPool] Worker {worker.index} exited with code {worker.process.exitcode}, restarting it")
+                self._replace_worker(worker)
+
+    def _check_workers(self):
+        self._check_timer = self._loop.call_later(self.check_interval, self._check_workers)
+        self._replace_dead_workers()
+        self._dispatch()
+
+    def _read_results(self, worker: _Worker):
+        # Polls so the thread exits once its worker is replaced or shut down
+        while not worker.retired:
+            try:
+                message = worker.result_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self._loop.call_soon_threadsafe(self._handle_message, worker, *message)
+
+    def _handle_message(self, worker: _Worker, kind: str, index: int, batch_id: Optional[int], payload: Any):
+        if worker.retired:
+            # Sent by a worker that has since been replaced
+            return
+
+        if kind == "ready":
+            worker.ready = True
+            worker.report = payload
+            print(f"[ImageWorkerPool] Worker {index} loaded pipeline in {payload['load_seconds']:.1f}s")
+            if all(worker.ready for worker in self._workers):
+                self._all_ready.set()
+            self._workers_changed()
+            return
+
+        if worker.batch_id != batch_id:
+            # Result of a batch whose worker was replaced
+            return
+        if kind == "started":
+            started_at = time.perf_counter()
+            for job in worker.jobs:
+                job.started_at = started_at
+            worker.render_timer = self._loop.call_later(self.job_timeout, self._on_render_timeout, worker, batch_id)
+            return
+        if kind == "progress":
+            position, progress = payload
+            job = worker.jobs[position]
+            if job.on_progress is not None and not job.future.done():
+                self._report_progress(job, progress)
+            return
+
+        jobs = worker.jobs
+        worker.batch_id = None
+        worker.jobs = []
+        if worker.render_timer is not None:
+            worker.render_timer.cancel()
+            worker.render_timer = None
+        if kind == "cancelled":
+            self._counters["interrupted"] += 1
+        for position, job in enumerate(jobs):
+            # Jobs cancelled mid-batch already have a done future; their result is dropped
+            if job.future.done():
+                continue
+            if kind == "done":
+                self._counters["completed"] += 1
+                job.future.set_result(payload[position])
+            else:
+                self._counters["failed"] += 1
+                job.future.set_exception(RuntimeError(payload or "Render cancelled"))
+        self._dispatch()
+
+    def _on_render_timeout(self, worker: _Worker, batch_id: int):
+        if worker.retired or worker.batch_id != batch_id:
+            return
+        # A hung render can only be stopped by replacing its process
+        print(f"[ImageWorkerPool] Batch {batch_id} ran past {self.job_timeout}s, restarting worker {worker.index}")
+        for job in worker.jobs:
+            if not job.future.done():
+                self._counters["timed_out"] += 1
+                job.future.set_exception(asyncio.TimeoutError(f"Render exceeded {self.job_timeout}s"))
+        self._replace_worker(worker)
+        self._dispatch()
+
+    def _workers_changed(self):
+        if self.on_workers_changed is None:
+            return
+        try:
+            self.on_workers_changed([worker.report if worker.ready else None for worker in self._workers])
+        except Exception as e:
+            print(f"[ImageWorkerPool] Worker state callback failed: {e}")
+
+    def _report_progress(self, job: ImageJob, progress: Dict[str, Any]):
+        try:
+            result = job.on_progress(progress)
+        except Exception as e:
+            print(f"[ImageWorkerPool] Progress callback for job {job.id} failed: {e}")
+            return
+        if asyncio.iscoroutine(result):
+            task = self._loop.create_task(result)
+            self._progress_tasks.add(task)
+            task.add_done_callback(self._progress_tasks.discard)
+
+    def _take_batch(self) -> List[ImageJob]:
+        first = self._pending.popleft()
+        batch = [first]
+        for job in list(self._pending):
+            if len(batch) >= self.max_batch_size:
+                break
+            if job.batch_key == first.batch_key:
+                self._pending.remove(job)
+                batch.append(job)
+        return batch
+
+    def _batch_ready(self) -> bool:
+        if self.max_batch_size == 1 or self.batch_window <= 0:
+            return True
+        first = self._pending[0]
+        if sum(1 for job in self._pending if job.batch_key == first.batch_key) >= self.max_batch_size:
+            return True
+        waited = time.perf_counter() - first.submitted_at
+        if waited >= self.batch_window:
+            return True
+        if self._dispatch_timer is None:
+            self._dispatch_timer = self._loop.call_later(self.batch_window - waited, self._on_dispatch_timer)
+        return False
+
+    def _on_dispatch_timer(self):
+        self._dispatch_timer = None
+        self._dispatch()
+
+    def _dispatch(self):
+        if self._pending:
+            self._replace_dead_workers()
+        for worker in self._workers:
+            if not self._pending or not self._batch_ready():
+                break
+            if worker.idle:
+                batch = self._take_batch()
+                worker.batch_id = next(self._batch_ids)
+                worker.jobs = batch
+                for job in batch:
+                    job.worker = worker.index
+                self._batch_sizes[len(batch)] = self._batch_sizes.get(len(batch), 0) + 1
+                for position in range(len(batch)):
+                    worker.cancel_flags[position] = 0
+                worker.job_queue.put((worker.batch_id, [job.params for job in batch]))
+
+    async def submit(self, params: Dict[str, Any], timeout: Optional[float] = None,
+                     on_progress: Optional[ProgressCallback] = None) -> Any:
+        if not self._workers:
+            raise RuntimeError("Image worker pool is not running")
+        if len(self._pending) >= self.max_queue:
+            self._counters["rejected"] += 1
+            raise QueueFullError(f"Image generation queue is full ({self.max_queue} pending jobs)")
+
+        job = ImageJob(next(self._job_ids), params, self._loop.create_future(), on_progress)
+        self._pending.append(job)
+        self._dispatch()
+
+        # timeout (default queue_timeout) bounds the wait for a worker only;
+        # once the job is running, the render timer set on "started" applies
+        queue_timeout = timeout or self.queue_timeout
+        try:
+            if queue_timeout:
+                await asyncio.wait((job.future,), timeout=queue_timeout)
+                if job in self._pending:
+                    self._pending.remove(job)
+                    job.future.cancel()
+                    self._counters["timed_out"] += 1
+                    raise asyncio.TimeoutError(f"No worker took the job within {queue_timeout}s")
+            return await asyncio.shield(job.future)
+        except asyncio.CancelledError:
+            self._counters["cancelled"] += 1
+            self._abandon(job)
+            raise
+
+    def _abandon(self, job: ImageJob):
+        if job in self._pending:
+            self._pending.remove(job)
+            return
+        if job.worker is None:
+            return
+        worker = self._workers[job.worker]
+        if job not in worker.jobs:
+            return
+        job.future.cancel()
+        # The worker stops early once its whole batch is cancelled;
+        # otherwise it finishes and this job's result is dropped
+        worker.cancel_flags[worker.jobs.index(job)] = 1
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        # Per-worker load reports once every worker has loaded (and warmed up)
+        if self._all_ready is None:
+            raise RuntimeError("Image worker pool is not running")
+        await asyncio.wait_for(self._all_ready.wait(), timeout)
+        return [worker.report for worker in self._workers]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.worker_count,
+            "threads_per_worker": self.threads_per_worker,
+            "ready_workers": sum(1 for worker in self._workers if worker.ready),
+            "busy_workers": sum(1 for worker in self._workers if not worker.idle),
+            "queued": len(self._pending),
+            "max_queue": self.max_queue,
+            "max_batch_size": self.max_batch_size,
+            "batch_sizes": dict(sorted(self._batch_sizes.items())),
+            **self._counters
+        }
+
+    def shutdown(self):
+        if self._check_timer is not None:
+            self._check_timer.cancel()
+            self._check_timer = None
+        if self._dispatch_timer is not None:
+            self._dispatch_timer.cancel()
+            self._dispatch_timer = None
+        for job in self._pending:
+            if not job.future.done():
+                job.future.cancel()
+        self._pending.clear()
+        for worker in self._workers:
+            worker.job_queue.put(None)
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.retired = True
+        for worker in self._workers:
+            worker.reader.join(timeout=5)
+        self._workers = []
@@ -0,0 +1,172 @@
+import asyncio
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TERMINAL_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobStoreFullError(Exception):
+    pass
+
+
+class JobStore(ABC):
+    # Interface for job state and progress events. Events are numbered from 0
+    # so clients can resume a stream after a reconnect. Implementations backed
+    # by an external store (Redis streams, a database) replace InMemoryJobStore.
+
+    @abstractmethod
+    async def create(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_status(self, job_id: str, status: str, error: Optional[str] = None):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def add_event(self, job_id: str, event: str, data: Dict[str, Any], latest_only: bool = False):
+        # With latest_only, the event replaces the job's previous event of
+        # the same name, so frequent updates (previews) are not all retained
+        raise NotImplementedError
+
+    @abstractmethod
+    async def wait_events(self, job_id: str, after: int, timeout: float) -> Optional[List[Dict[str, Any]]]:
+        # Retained events numbered >= after, waiting up to timeout for the
+        # first one. Numbers keep increasing but can skip replaced events.
+        # Returns None for an unknown job and [] when nothing arrived in time.
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class _JobRecord:
+    __slots__ = ("id", "kind", "params", "status", "error", "results", "events",
+                 "next_event_id", "latest_events", "created_at", "updated_at", "finished_at", "changed")
+
+    def __init__(self, job_id: str, kind: str, params: Dict[str, Any]):
+        self.id = job_id
+        self.kind = kind
+        self.params = params
+        self.status = QUEUED
+        self.error: Optional[str] = None
+        self.results: Dict[str, Any] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.next_event_id = 0
+        # Retained latest_only event per event name
+        self.latest_events: Dict[str, Dict[str, Any]] = {}
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.finished_at: Optional[float] = None
+        self.changed = asyncio.Event()
+
+    def append_event(self, event: str, data: Dict[str, Any], latest_only: bool = False):
+        record = {"id": self.next_event_id, "event": event, "data": data}
+        self.next_event_id += 1
+        if latest_only:
+            previous = self.latest_events.get(event)
+            if previous is not None:
+                self.events.remove(previous)
+            self.latest_events[event] = record
+        self.events.append(record)
+        self.touch()
+
+    def touch(self):
+        self.updated_at = time.time()
+        # Wake current waiters and start a fresh generation for the next change
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "error": self.error,
+            "results": dict(self.results),
+            "event_count": self.next_event_id,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "finished_at": self.finished_at
+        }
+
+
+class InMemoryJobStore(JobStore):
+    # Process-local store. Finished jobs are kept for ttl seconds and at most
+    # max_jobs records are retained; new jobs are refused only when every
+    # retained job is still active.
+
+    def __init__(self, max_jobs: int = 200, ttl: float = 3600):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._jobs: "OrderedDict[str, _JobRecord]" = OrderedDict()
+
+    def _prune(self):
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.status in TERMINAL_STATUSES]
+        for job in finished:
+            if now - job.finished_at > self.ttl:
+                del self._jobs[job.id]
+        for job in finished:
+            if len(self._jobs) < self.max_jobs:
+                break
+            self._jobs.pop(job.id, None)
+
+    async def create(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        self._prune()
+        if len(self._jobs) >= self.max_jobs:
+            raise JobStoreFullError(f"Too many active jobs ({self.max_jobs})")
+        job = _JobRecord(uuid.uuid4().hex, kind, params)
+        self._jobs[job.id] = job
+        return job.snapshot()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return None if job is None else job.snapshot()
+
+    async def set_status(self, job_id: str, status: str, error: Optional[str] = None):
+        job = self._jobs.get(job_id)
+        if job is None or job.status in TERMINAL_STATUSES:
+            return
+        job.status = status
+        job.error = error
+        if status in TERMINAL_STATUSES:
+            job.finished_at = time.time()
+        job.append_event("status", {"status": status, "error": error})
+
+    async def add_event(self, job_id: str, event: str, data: Dict[str, Any], latest_only: bool = False):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        if event == "stage":
+            job.results[data["stage"]] = data["result"]
+        job.append_event(event, data, latest_only)
+
+    async def wait_events(self, job_id: str, after: int, timeout: float) -> Optional[List[Dict[str, Any]]]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if after >= job.next_event_id and job.status not in TERMINAL_STATUSES:
+            try:
+                await asyncio.wait_for(job.changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return [event for event in job.events if event["id"] >= after]
+
+    def stats(self) -> Dict[str, Any]:
+        by_status: Dict[str, int] = {}
+        for job in self._jobs.values():
+            by_status[job.status] = by_status.get(job.status, 0) + 1
+        return {"retained": len(self._jobs), "max_jobs": self.max_jobs, "ttl_seconds": self.ttl, "by_status": by_status}
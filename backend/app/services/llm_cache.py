@@ -0,0 +1,140 @@
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+def normalize_text(text: Optional[str]) -> str:
+    return " ".join((text or "").lower().split())
+
+
+class LLMCache:
+    # Two-tier response cache: in-memory LRU in front of an optional directory
+    # of JSON files. Entries expire after ttl seconds in both tiers. Disk
+    # reads and writes run on a worker thread, off the event loop.
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 86400,
+        disk_dir: Optional[Path] = None,
+        max_disk_entries: int = 10000
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._disk_writes = 0
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(stage: str, model: str, system_prompt: str, inputs: Dict[str, Any]) -> str:
+        # The system prompt hash acts as the prompt version: editing a prompt
+        # invalidates its entries without a manual version bump
+        prompt_version = hashlib.sha256(system_prompt.encode()).hexdigest()[:16]
+        material = json.dumps([stage, model, prompt_version, inputs], sort_keys=True, separators=(',', ':'))
+        return f"{stage}-{hashlib.sha256(material.encode()).hexdigest()}"
+
+    def _count(self, stage: str, outcome: str):
+        counters = self._counters.setdefault(stage, {"hits": 0, "disk_hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+    async def get(self, stage: str, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._count(stage, "hits")
+                    return copy.deepcopy(value)
+                del self._memory[key]
+
+        entry = await asyncio.to_thread(self._read_disk, key, now) if self.disk_dir else None
+        with self._lock:
+            if entry is None:
+                self._count(stage, "misses")
+                return None
+            self._count(stage, "disk_hits")
+            self._remember(key, *entry)
+        return copy.deepcopy(entry[1])
+
+    async def set(self, stage: str, key: str, value: Any):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, copy.deepcopy(value))
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, key, expires_at, value)
+
+    def _remember(self, key: str, expires_at: float, value: Any):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[float, Any]]:
+        if not self.disk_dir:
+            return None
+        path = self.disk_dir / f"{key}.json"
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        expires_at = entry.get("expires_at", 0)
+        if expires_at <= now:
+            path.unlink(missing_ok=True)
+            return None
+        return expires_at, entry.get("value")
+
+    def _write_disk(self, key: str, expires_at: float, value: Any):
+        if not self.disk_dir:
+            return
+        path = self.disk_dir / f"{key}.json"
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"expires_at": expires_at, "value": value}, f)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._disk_writes += 1
+                prune = self._disk_writes % 100 == 0
+            if prune:
+                self._prune_disk()
+        except (OSError, TypeError) as e:
+            print(f"[LLMCache] Could not persist {key}: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def _prune_disk(self):
+        entries = []
+        for path in self.disk_dir.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        if len(entries) <= self.max_disk_entries:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_disk_entries]:
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "disk_enabled": self.disk_dir is not None,
+                "stages": copy.deepcopy(self._counters)
+            }
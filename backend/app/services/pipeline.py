@@ -0,0 +1,57 @@
+import asyncio
+import inspect
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+StageCallback = Callable[[str, Any], Any]
+
+
+class Stage:
+
+    def __init__(self, name: str, fn: Callable[..., Awaitable[Any]], depends_on: Sequence[str] = ()):
+        self.name = name
+        self.fn = fn
+        self.depends_on = list(depends_on)
+
+
+class StageRunner:
+    # Runs async stages as soon as their dependencies resolve. Each stage is
+    # called with its dependencies' results as keyword arguments; independent
+    # stages run concurrently. If any stage fails, the others are cancelled.
+
+    def __init__(self):
+        self.stages: Dict[str, Stage] = {}
+
+    def add(self, name: str, fn: Callable[..., Awaitable[Any]], depends_on: Sequence[str] = ()) -> "StageRunner":
+        if name in self.stages:
+            raise ValueError(f"Duplicate pipeline stage: {name}")
+        for dependency in depends_on:
+            if dependency not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dependency}'")
+        self.stages[name] = Stage(name, fn, depends_on)
+        return self
+
+    async def run(self, on_stage_complete: Optional[StageCallback] = None) -> Dict[str, Any]:
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(stage: Stage) -> Any:
+            inputs: List[Any] = await asyncio.gather(*(tasks[name] for name in stage.depends_on))
+            result = await stage.fn(**dict(zip(stage.depends_on, inputs)))
+            if on_stage_complete is not None:
+                callback_result = on_stage_complete(stage.name, result)
+                if inspect.isawaitable(callback_result):
+                    await callback_result
+            return result
+
+        # Stages can only depend on earlier ones, so insertion order is topological
+        for stage in self.stages.values():
+            tasks[stage.name] = asyncio.create_task(run_stage(stage), name=f"stage:{stage.name}")
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        return {name: task.result() for name, task in tasks.items()}
@@ -0,0 +1,86 @@
+import time
+from typing import Any, Dict, Optional
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+DISABLED = "disabled"
+COLD = "cold"
+
+
+class ComponentState:
+    __slots__ = ("name", "state", "started_at", "duration", "error", "details")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = PENDING
+        self.started_at: Optional[float] = None
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+        self.details: Dict[str, Any] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "duration_seconds": round(self.duration, 3) if self.duration is not None else None,
+            "error": self.error,
+            **self.details
+        }
+
+
+class Readiness:
+    # State of the heavy components, reported by /ready. The instance is
+    # ready once every component is ready, disabled, or cold (loaded on first
+    # use). Components can go back to loading, e.g. when a worker respawns;
+    # their duration stays that of the last load.
+
+    def __init__(self, *names: str):
+        self.components: Dict[str, ComponentState] = {name: ComponentState(name) for name in names}
+
+    def loading(self, name: str, **details: Any):
+        component = self.components[name]
+        if component.state != LOADING:
+            component.state = LOADING
+            component.started_at = time.perf_counter()
+        component.details.update(details)
+
+    def ready(self, name: str, duration: Optional[float] = None, **details: Any):
+        component = self.components[name]
+        component.duration = duration if duration is not None else self._elapsed(component)
+        component.state = READY
+        component.error = None
+        component.details.update(details)
+
+    def failed(self, name: str, error: str, **details: Any):
+        component = self.components[name]
+        component.duration = self._elapsed(component)
+        component.state = FAILED
+        component.error = error
+        component.details.update(details)
+
+    def disabled(self, name: str, reason: str):
+        component = self.components[name]
+        component.state = DISABLED
+        component.error = reason
+
+    def cold(self, name: str, reason: str):
+        component = self.components[name]
+        component.state = COLD
+        component.error = reason
+
+    @staticmethod
+    def _elapsed(component: ComponentState) -> Optional[float]:
+        # Only a load that is in progress ends now
+        if component.state != LOADING:
+            return component.duration
+        return time.perf_counter() - component.started_at
+
+    def is_ready(self) -> bool:
+        return all(component.state in (READY, DISABLED, COLD) for component in self.components.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ready": self.is_ready(),
+            "components": {name: component.to_dict() for name, component in self.components.items()}
+        }
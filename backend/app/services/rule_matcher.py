@@ -0,0 +1,161 @@
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+_END = ""
+
+
+class RuleMatch(NamedTuple):
+    rule: str
+    kind: str
+    start: int
+    end: int
+
+
+def normalize_phrase(phrase: str) -> str:
+    return " ".join(phrase.lower().split())
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    # Alternation over a character trie: shared prefixes are matched once,
+    # and a phrase that is a prefix of another becomes an optional suffix,
+    # so the longest phrase wins and the shorter one is the fallback
+    branches = [
+        (r"\s+" if char == " " else re.escape(char)) + _trie_pattern(child)
+        for char, child in sorted(node.items())
+        if char != _END
+    ]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if _END in node:
+        return f"(?:{body})?"
+    return body
+
+
+def _original_length(matched: str, normalized_length: int) -> int:
+    # Length of the part of matched that normalizes to normalized_length
+    # characters, given that whitespace runs normalize to one space
+    count = 0
+    index = 0
+    while count < normalized_length:
+        if matched[index].isspace():
+            while matched[index].isspace():
+                index += 1
+        else:
+            index += 1
+        count += 1
+    return index
+
+
+# Characters that end a sentence or open a heading, quote or list item
+_SENTENCE_BREAKS = ".!?:;\"'“‘(•*-–—"
+_NEXT_WORD = re.compile(r"[^\w.!?]*(\w)")
+
+
+def _reads_as_proper_noun(text: str, start: int, end: int) -> bool:
+    # Every word is capitalized, and a match opening a sentence only counts
+    # when the next word is capitalized too: "Apple Watch" but not "Apple
+    # cinnamon", "Shop at Target" but not "Target your morning"
+    if not all(word[0].isupper() for word in text[start:end].split()):
+        return False
+    before = text[:start].rstrip()
+    if before and before[-1] not in _SENTENCE_BREAKS:
+        return True
+    following = _NEXT_WORD.match(text, end)
+    return following is not None and following.group(1).isupper()
+
+
+class _PhraseSet:
+    # Phrases compiled into a single case-insensitive regex shaped like a
+    # trie. With proper_nouns set, a match only counts where the text reads
+    # as a name (see _reads_as_proper_noun).
+
+    def __init__(self, rules: Dict[str, Iterable[str]], proper_nouns: bool = False):
+        self.proper_nouns = proper_nouns
+        self.kinds: Dict[str, Tuple[str, ...]] = {}
+        self.nested: Dict[str, List[str]] = {}
+        trie: Dict[str, dict] = {}
+        for kind, phrases in rules.items():
+            for phrase in phrases:
+                key = normalize_phrase(phrase)
+                if not key:
+                    continue
+                if kind not in self.kinds.get(key, ()):
+                    self.kinds[key] = self.kinds.get(key, ()) + (kind,)
+                node = trie
+                for char in key:
+                    node = node.setdefault(char, {})
+                node[_END] = {}
+        # The regex finds the longest phrase at each start; shorter phrases
+        # that are a whole-word prefix of it are looked up here instead
+        for key in self.kinds:
+            node = trie
+            for i, char in enumerate(key[:-1]):
+                node = node[char]
+                if _END in node and not key[i + 1].isalnum() and key[i + 1] != "_":
+                    self.nested.setdefault(key, []).append(key[:i + 1])
+        # The lookahead lets matches overlap; the lookbehind/lookahead pair
+        # is a word boundary that also works for phrases starting or ending
+        # in punctuation
+        self.pattern = re.compile(rf"(?<!\w)(?=({_trie_pattern(trie)})(?!\w))", re.IGNORECASE) if trie else None
+
+    def find_all(self, text: str) -> List[RuleMatch]:
+        if self.pattern is None:
+            return []
+        matches = []
+        for match in self.pattern.finditer(text):
+            start, end = match.span(1)
+            rule = normalize_phrase(match.group(1))
+            for prefix in self.nested.get(rule, ()):
+                prefix_end = start + _original_length(match.group(1), len(prefix))
+                if self.proper_nouns and not _reads_as_proper_noun(text, start, prefix_end):
+                    continue
+                for kind in self.kinds[prefix]:
+                    matches.append(RuleMatch(prefix, kind, start, prefix_end))
+            if self.proper_nouns and not _reads_as_proper_noun(text, start, end):
+                continue
+            for kind in self.kinds[rule]:
+                matches.append(RuleMatch(rule, kind, start, end))
+        return matches
+
+
+class RuleMatcher:
+    # Matches every phrase of every rule kind in one pass over the text.
+    # Phrases are compiled into a single case-insensitive regex shaped like a
+    # trie, anchored on word boundaries so "sale" does not match inside
+    # "wholesale"; whitespace inside a phrase matches any run of whitespace.
+    # Overlapping and nested phrases are all reported: "best price" and
+    # "price match" in "best price match", "apple" and "apple pie" in
+    # "apple pie". Phrases given in proper_nouns (names that are also
+    # ordinary words, like "apple" or "target") go in a second regex and are
+    # reported under their kind only where the text uses them as a name.
+
+    def __init__(self, rules: Dict[str, Iterable[str]], proper_nouns: Optional[Dict[str, Iterable[str]]] = None):
+        self._sets = [_PhraseSet(rules), _PhraseSet(proper_nouns or {}, proper_nouns=True)]
+
+    @property
+    def rule_count(self) -> int:
+        return sum(len(phrase_set.kinds) for phrase_set in self._sets)
+
+    def find_all(self, text: str) -> List[RuleMatch]:
+        if not text:
+            return []
+        words, names = (phrase_set.find_all(text) for phrase_set in self._sets)
+        if not names:
+            return words
+        # Stable sort: text order, plain phrases first at a shared start
+        return sorted(words + names, key=lambda match: match.start)
+
+    def first_matches(self, text: str) -> List[RuleMatch]:
+        return first_occurrences(self.find_all(text))
+
+
+def first_occurrences(matches: Iterable[RuleMatch]) -> List[RuleMatch]:
+    # One match per (rule, kind), in order of first occurrence
+    seen = set()
+    result = []
+    for match in matches:
+        if (match.rule, match.kind) not in seen:
+            seen.add((match.rule, match.kind))
+            result.append(match)
+    return result
@@ -0,0 +1,155 @@
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.rule_matcher import RuleMatcher
+
+DEFAULT_PACK = "default"
+
+FORBIDDEN_WORD = "forbidden_word"
+RESTRICTED_BRAND = "restricted_brand"
+
+LIST_FIELDS = ("forbidden_words", "restricted_brands", "ambiguous_brands", "promotional_colors", "required_flags")
+
+
+class RulePack:
+    # One channel's rules with its matcher compiled up front. Immutable once
+    # built; a reload builds new packs instead of mutating these.
+
+    def __init__(self, name: str, rules: Dict[str, List[str]], version: int):
+        self.name = name
+        self.version = version
+        self.forbidden_words = rules.get("forbidden_words", [])
+        self.restricted_brands = rules.get("restricted_brands", [])
+        # Brands that are also ordinary words ("apple", "target"): restricted
+        # only where the text uses them as a name
+        self.ambiguous_brands = rules.get("ambiguous_brands", [])
+        self.promotional_colors = frozenset(color.lower() for color in rules.get("promotional_colors", []))
+        self.required_flags = rules.get("required_flags", [])
+        self.matcher = RuleMatcher({
+            FORBIDDEN_WORD: self.forbidden_words,
+            RESTRICTED_BRAND: self.restricted_brands
+        }, proper_nouns={RESTRICTED_BRAND: self.ambiguous_brands})
+
+    def describe(self) -> Dict[str, Any]:
+        return {"channel": self.name, "version": self.version}
+
+
+class RulePackRegistry:
+    # Compliance rule packs loaded from <rules_dir>/<channel>.json. A pack
+    # "extends" default.json unless it sets "extends": null, with list
+    # fields merged on top of its parent. All packs are compiled at load
+    # time and published as one dict by a single reference swap, so lookups
+    # are a dict get and never see a half-reloaded set.
+
+    def __init__(self, rules_dir: Path):
+        self.rules_dir = rules_dir
+        self._packs: Dict[str, RulePack] = {}
+        self._fingerprint: Optional[Tuple] = None
+        self._version = 0
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        self.reload()
+
+    def get(self, channel: Optional[str]) -> RulePack:
+        return self.select(self._packs, channel)
+
+    def snapshot(self) -> Dict[str, RulePack]:
+        # The packs currently in service; a later reload publishes a new
+        # dict and leaves this one untouched
+        return self._packs
+
+    @staticmethod
+    def select(packs: Dict[str, RulePack], channel: Optional[str]) -> RulePack:
+        if channel:
+            pack = packs.get(channel.strip().lower())
+            if pack is not None:
+                return pack
+        return packs[DEFAULT_PACK]
+
+    def _fingerprint_files(self) -> Tuple:
+        files = []
+        if self.rules_dir.is_dir():
+            for path in sorted(self.rules_dir.glob("*.json")):
+                stat = path.stat()
+                files.append((path.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(files)
+
+    def reload(self, force: bool = False) -> bool:
+        # Rebuilds every pack when any rules file changed. A broken file
+        # keeps the previous packs in service until the files change again.
+        with self._reload_lock:
+            fingerprint = self._fingerprint_files()
+            if not force and fingerprint == self._fingerprint:
+                return False
+            try:
+                packs = self._build(self._version + 1)
+            except (OSError, ValueError) as e:
+                print(f"[RulePacks] Could not load rules from {self.rules_dir}: {e}")
+                self._fingerprint = fingerprint
+                if not self._packs:
+                    self._packs = {DEFAULT_PACK: RulePack(DEFAULT_PACK, {}, 0)}
+                return False
+            self._version += 1
+            self._fingerprint = fingerprint
+            self._packs = packs
+            print(f"[RulePacks] Loaded rules v{self._version}: "
+                  + ", ".join(f"{pack.name} ({pack.matcher.rule_count} phrases)" for pack in packs.values()))
+            return True
+
+    def _build(self, version: int) -> Dict[str, RulePack]:
+        raw: Dict[str, Dict[str, Any]] = {}
+        for path in sorted(self.rules_dir.glob("*.json")):
+            with open(path, encoding="utf-8") as f:
+                raw[path.stem.lower()] = json.load(f)
+        raw.setdefault(DEFAULT_PACK, {})
+
+        def resolve(name: str, seen: Tuple[str, ...] = ()) -> Dict[str, List[str]]:
+            if name in seen:
+                raise ValueError(f"Rule pack inheritance cycle: {' -> '.join(seen + (name,))}")
+            if name not in raw:
+                raise ValueError(f"Rule pack {seen[-1]!r} extends unknown pack {name!r}")
+            spec = raw[name]
+            parent = spec.get("extends", None if name == DEFAULT_PACK else DEFAULT_PACK)
+            rules = resolve(parent, seen + (name,)) if parent else {field: [] for field in LIST_FIELDS}
+            merged = {}
+            for field in LIST_FIELDS:
+                values = spec.get(field, [])
+                if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+                    raise ValueError(f"{name}.json: {field} must be a list of strings")
+                merged[field] = list(dict.fromkeys(rules[field] + values))
+            return merged
+
+        return {name: RulePack(name, resolve(name), version) for name in raw}
+
+    def start_watching(self, interval: float = 5.0):
+        if self._watcher is not None:
+            return
+        self._stop_watching.clear()
+
+        def watch():
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.reload()
+                except Exception as e:
+                    print(f"[RulePacks] Error reloading rules: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="rule-pack-watcher", daemon=True)
+        self._watcher.start()
+        print(f"[RulePacks] Watching {self.rules_dir} every {interval}s")
+
+    def stop_watching(self):
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def stats(self) -> Dict[str, Any]:
+        packs = self._packs
+        return {
+            "version": self._version,
+            "rules_dir": str(self.rules_dir),
+            "channels": {name: pack.matcher.rule_count for name, pack in packs.items()}
+        }
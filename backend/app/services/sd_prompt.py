@@ -0,0 +1,49 @@
+import hashlib
+import json
+import random
+from typing import Any, Dict, Optional
+
+MODEL_ID = "runwayml/stable-diffusion-v1-5"
+
+# Sampling parameters shared by every item of a batch (see image_worker.PER_ITEM_KEYS)
+DEFAULT_PARAMS: Dict[str, Any] = {
+    "steps": 4,
+    "guidance_scale": 3.0,
+    "width": 288,
+    "height": 512,
+}
+
+# Poster size the rendered image is upscaled to; the render above has the
+# same 9:16 aspect ratio, so upscaling never distorts
+POSTER_SIZE = (1080, 1920)
+
+# Latent previews streamed while a render is in progress
+PREVIEW_SIZE = (144, 256)
+
+
+def build_sd_prompt(prompt: str, background_desc: str, toon: Optional[Dict[str, Any]]) -> str:
+    # Convert TOON to Stable Diffusion prompt
+    toon_prompt_parts = []
+    if toon and isinstance(toon, dict):
+        if 'colors' in toon:
+            colors = toon.get('colors', {})
+            if colors.get('background'):
+                toon_prompt_parts.append(f"background color {colors['background']}")
+            if colors.get('primary'):
+                toon_prompt_parts.append(f"accent color {colors['primary']}")
+        if 'format' in toon:
+            toon_prompt_parts.append(f"{toon['format']} format")
+        if 'layout' in toon and toon['layout'].get('type'):
+            toon_prompt_parts.append(f"{toon['layout']['type']} layout")
+
+    toon_context = ", ".join(toon_prompt_parts) if toon_prompt_parts else ""
+    return f"{prompt}, {background_desc}, {toon_context}, professional retail background, clean, commercial photography".strip(", ")
+
+
+def random_seed() -> int:
+    return random.randint(0, 2**32 - 1)
+
+
+def deterministic_seed(sd_prompt: str, params: Dict[str, Any]) -> int:
+    material = json.dumps([sd_prompt, params], sort_keys=True, separators=(',', ':'))
+    return int.from_bytes(hashlib.sha256(material.encode()).digest()[:4], "big")
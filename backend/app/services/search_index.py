@@ -0,0 +1,106 @@
+import heapq
+import math
+import re
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+TOKEN_PATTERN = re.compile(r'\b\w+\b')
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SearchIndex:
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        # token -> flat array of (doc_id, term frequency) pairs
+        self.postings: Dict[str, array] = {}
+        self.doc_lengths = array('I')
+        self.deleted: Set[int] = set()
+        self.avg_doc_length = 0.0
+        # Posting arrays this index may append to; shared ones are copied first
+        self._owned_tokens: Set[str] = set()
+
+    @classmethod
+    def build(cls, documents: Iterable[str], k1: float = 1.2, b: float = 0.75) -> "SearchIndex":
+        index = cls(k1=k1, b=b)
+        for text in documents:
+            index.add_document(text)
+        index.finalize()
+        return index
+
+    def add_document(self, text: str) -> int:
+        doc_id = len(self.doc_lengths)
+        tokens = tokenize(text)
+        self.doc_lengths.append(len(tokens))
+
+        for token, tf in Counter(tokens).items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = array('I')
+                self._owned_tokens.add(token)
+            elif token not in self._owned_tokens:
+                posting = self.postings[token] = array('I', posting)
+                self._owned_tokens.add(token)
+            posting.append(doc_id)
+            posting.append(tf)
+        return doc_id
+
+    def updated(self, removed: Iterable[int], added: Iterable[str]) -> Tuple["SearchIndex", List[int]]:
+        # Copy-on-write: the returned index shares untouched posting arrays with
+        # this one, which stays valid for concurrent readers
+        index = SearchIndex(k1=self.k1, b=self.b)
+        index.postings = dict(self.postings)
+        index.doc_lengths = array('I', self.doc_lengths)
+        index.deleted = self.deleted | set(removed)
+        new_ids = [index.add_document(text) for text in added]
+        index.finalize()
+        return index, new_ids
+
+    def finalize(self):
+        live_count = self.get_document_count()
+        live_length = sum(self.doc_lengths) - sum(self.doc_lengths[doc_id] for doc_id in self.deleted)
+        self.avg_doc_length = live_length / live_count if live_count else 0.0
+
+    def get_document_count(self) -> int:
+        return len(self.doc_lengths) - len(self.deleted)
+
+    def get_deleted_ratio(self) -> float:
+        return len(self.deleted) / len(self.doc_lengths) if self.doc_lengths else 0.0
+
+    def idf(self, token: str) -> float:
+        # Document frequency still counts deleted docs until the next full rebuild
+        df = len(self.postings.get(token, ())) // 2
+        n = len(self.doc_lengths)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[float, int]]:
+        query_tokens = set(tokenize(query))
+        if not query_tokens or not self.get_document_count():
+            return []
+
+        avg_len = self.avg_doc_length or 1.0
+        deleted = self.deleted
+        scores: Dict[int, float] = {}
+
+        # Only the posting lists of the query tokens are visited, so cost
+        # scales with how common the query terms are, not catalog size
+        for token in query_tokens:
+            posting = self.postings.get(token)
+            if not posting:
+                continue
+            idf = self.idf(token)
+            pairs = iter(posting)
+            for doc_id, tf in zip(pairs, pairs):
+                if deleted and doc_id in deleted:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(score, doc_id) for doc_id, score in ranked]
@@ -0,0 +1,65 @@
+"""Measure catalog memory with tracemalloc: per-row dataclasses vs AssetCatalog.
+
+Usage: python benchmarks/bench_asset_memory.py [row count]
+
+Snapshot-backed catalogs keep their strings in a read-only mmap, which
+tracemalloc does not count; that memory is shared page cache.
+"""
+import csv
+import gc
+import sys
+import tempfile
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from synthetic_catalog import ASSET_LIBRARY_DIR, write_synthetic_csv
+
+from app.services.asset_manager import AssetManager
+
+
+@dataclass
+class LegacyAsset:
+    sample_id: str
+    catalog_content: str
+    category: str
+    price: Optional[float]
+    image_link: Optional[str]
+    local_path: str
+
+
+def load_legacy(csv_path: Path):
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        return [LegacyAsset(*AssetManager._parse_row(row)) for row in csv.DictReader(f)]
+
+
+def measure(label, fn):
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<32} retained {current / 1e6:8.1f} MB | peak {peak / 1e6:8.1f} MB")
+    return result
+
+
+def run(row_count: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write_synthetic_csv(Path(tmp) / "asset-index.csv", row_count)
+        manager = AssetManager(csv_path, ASSET_LIBRARY_DIR)
+        print(f"{row_count} rows, CSV {csv_path.stat().st_size / 1e6:.1f} MB")
+
+        measure("dataclass list (legacy)", lambda: load_legacy(csv_path))
+        measure("AssetCatalog from CSV", manager._read_csv)
+
+        manager._write_snapshot(manager._read_csv())
+        catalog = measure("AssetCatalog from snapshot", manager._read_snapshot)
+        catalog.close()
+
+        measure("AssetManager.load (with indexes)", lambda: manager.load() and manager)
+        manager.assets.close()
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,68 @@
+"""Compare the legacy full-scan asset search with the inverted index.
+
+Usage: python benchmarks/bench_asset_search.py [row counts...]
+"""
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic_catalog import ASSET_LIBRARY_DIR, write_synthetic_csv
+
+from app.services.asset_manager import AssetManager
+
+QUERIES = [
+    "organic green tea",
+    "gluten free pasta sauce",
+    "dark chocolate almonds",
+    "baby food",
+    "spicy bbq seasoning rub",
+]
+
+
+def legacy_search(assets, query, limit=10):
+    query_tokens = set(re.findall(r'\b\w+\b', query.lower()))
+    scored = []
+    for asset in assets:
+        text = f"{asset.catalog_content} {asset.category}".lower()
+        text_tokens = set(re.findall(r'\b\w+\b', text))
+        score = len(query_tokens & text_tokens)
+        if score > 0:
+            scored.append((score, asset.local_path))
+    scored.sort(reverse=True)
+    return [path for _, path in scored[:limit]]
+
+
+def time_queries(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in QUERIES:
+            fn(query)
+    return (time.perf_counter() - start) / (repeat * len(QUERIES))
+
+
+def run(row_count: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write_synthetic_csv(Path(tmp) / "asset-index.csv", row_count)
+        manager = AssetManager(csv_path, ASSET_LIBRARY_DIR)
+
+        start = time.perf_counter()
+        manager.load()
+        load_time = time.perf_counter() - start
+
+        repeat = max(1, 10000 // row_count)
+        legacy = time_queries(lambda q: legacy_search(manager.assets, q), repeat)
+        indexed = time_queries(lambda q: manager.search(q), repeat * 20)
+
+    print(
+        f"{row_count:>7} rows | load+index {load_time * 1000:8.1f} ms | "
+        f"scan {legacy * 1000:9.3f} ms/query | index {indexed * 1000:7.3f} ms/query | "
+        f"speedup {legacy / indexed:7.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    for count in counts:
+        run(count)
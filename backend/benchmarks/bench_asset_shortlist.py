@@ -0,0 +1,81 @@
+"""Recommendation prompt size and latency: full catalog vs local shortlist.
+
+Usage: python benchmarks/bench_asset_shortlist.py [row counts...]
+
+Input tokens are estimated at ~4 bytes per token. No LLM calls are made.
+Also times a reload after one row of the CSV changed, which updates the
+shortlist retriever instead of refitting it.
+"""
+import csv
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic_catalog import ASSET_LIBRARY_DIR, FIELDNAMES, write_synthetic_csv
+
+from app.services.asset_manager import AssetManager
+from app.services.asset_retriever import AssetRetriever
+
+QUERY = "healthy breakfast cereal with whole grains"
+SHORTLIST_K = 40
+
+
+def asset_context(assets):
+    return [
+        {
+            "id": asset.sample_id,
+            "category": asset.category,
+            "description": asset.catalog_content[:300],
+            "path": asset.local_path
+        }
+        for asset in assets
+    ]
+
+
+def run(row_count: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write_synthetic_csv(Path(tmp) / "asset-index.csv", row_count)
+        manager = AssetManager(csv_path, ASSET_LIBRARY_DIR)
+        manager.load()
+        catalog = manager.get_all_assets()
+
+        start = time.perf_counter()
+        full_prompt = json.dumps(asset_context(catalog), indent=2)
+        full_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        retriever = AssetRetriever().fit(catalog, manager.version)
+        fit_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        repeat = 20
+        for _ in range(repeat):
+            shortlist = retriever.shortlist(QUERY, SHORTLIST_K)
+            short_prompt = json.dumps(asset_context(shortlist), separators=(',', ':'))
+        short_time = (time.perf_counter() - start) / repeat
+
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        rows[len(rows) // 2]["catalog_content"] += " limited edition"
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(rows)
+        start = time.perf_counter()
+        manager.reload(force=True)
+        reload_time = time.perf_counter() - start
+
+    print(
+        f"{row_count:>7} rows | full prompt {len(full_prompt) / 1e3:9.1f} kB (~{len(full_prompt) // 4:>9} tok) "
+        f"build {full_time * 1000:7.1f} ms | shortlist prompt {len(short_prompt) / 1e3:5.1f} kB "
+        f"(~{len(short_prompt) // 4:>5} tok) query {short_time * 1000:6.2f} ms | fit {fit_time * 1000:8.1f} ms "
+        f"| 1-row reload {reload_time * 1000:8.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    for count in counts:
+        run(count)
@@ -0,0 +1,46 @@
+"""Compare cold-start catalog loading from CSV against the binary snapshot.
+
+Usage: python benchmarks/bench_asset_startup.py [row counts...]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic_catalog import ASSET_LIBRARY_DIR, write_synthetic_csv
+
+from app.services.asset_manager import AssetManager
+
+
+def best_of(fn, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(row_count: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write_synthetic_csv(Path(tmp) / "asset-index.csv", row_count)
+        manager = AssetManager(csv_path, ASSET_LIBRARY_DIR)
+
+        csv_time = best_of(manager._read_csv)
+        write_time = best_of(lambda: manager._write_snapshot(manager._read_csv()), repeat=1) - csv_time
+        snapshot_time = best_of(manager._read_snapshot)
+
+        csv_size = csv_path.stat().st_size
+        snapshot_size = manager.snapshot_path.stat().st_size
+
+    print(
+        f"{row_count:>7} rows | csv {csv_time * 1000:8.1f} ms ({csv_size / 1e6:6.1f} MB) | "
+        f"snapshot {snapshot_time * 1000:8.1f} ms ({snapshot_size / 1e6:6.1f} MB) | "
+        f"write {max(write_time, 0) * 1000:7.1f} ms | speedup {csv_time / snapshot_time:5.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    for count in counts:
+        run(count)
@@ -0,0 +1,96 @@
+"""Repeat canvas verification: full rescan vs the per-element result cache.
+
+Usage: python benchmarks/bench_canvas_verify.py [elements...]
+
+For each canvas size (default 20, 200 and 2000 elements, a third of them
+text), simulates an editing session: every round edits one text element
+and verifies the whole canvas again. It times the compliance summary
+with the element cache disabled (every element rescanned, as before) and
+enabled, and the canvas hash the ledger records (one json.dumps of the
+whole canvas) vs a Merkle root over per-element hashes, which was tried
+and dropped because serializing elements one by one costs more.
+"""
+import hashlib
+import json
+import random
+import sys
+import time
+
+import synthetic_catalog  # noqa: F401  (puts the backend on sys.path)
+
+from app.services.canvas_hash import canvas_state_hash
+from app.services.compliance_cache import ElementResultCache
+from app.services.compliance_engine import ComplianceEngine
+from app.services.rule_packs import RulePackRegistry
+
+ROUNDS = 50
+ENCODER = json.JSONEncoder(sort_keys=True, separators=(',', ':'))
+WORDS = ["fresh", "organic", "crunchy", "family", "size", "pack", "morning", "blend", "roast", "natural", "sale"]
+
+
+def make_canvas(count: int, rng: random.Random):
+    elements = []
+    for i in range(count):
+        element = {"id": f"el-{i}", "x": rng.randint(0, 1080), "y": rng.randint(0, 1920), "width": 200, "height": 80}
+        if i % 3 == 0:
+            element.update(type="text", text=" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12))), fontSize=32)
+        else:
+            element.update(type="image", src=f"/assets/category/{i}.jpg")
+        elements.append(element)
+    return {"width": 1080, "height": 1920, "background": "#ffffff", "elements": elements}
+
+
+def edit(canvas, rng: random.Random):
+    texts = [element for element in canvas["elements"] if element["type"] == "text"]
+    element = rng.choice(texts)
+    element["text"] = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12)))
+
+
+def merkle_root(canvas) -> str:
+    level = [hashlib.sha256(ENCODER.encode(element).encode()).digest() for element in canvas["elements"]]
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        level = [hashlib.sha256(level[i] + level[i + 1]).digest() for i in range(0, len(level), 2)]
+    return level[0].hex()
+
+
+def session(engine: ComplianceEngine, canvas, seed: int):
+    rng = random.Random(seed)
+    summary_seconds = hash_seconds = digest_seconds = 0.0
+    for _ in range(ROUNDS):
+        edit(canvas, rng)
+        started = time.perf_counter()
+        engine.summarize_canvas(canvas)
+        summary_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        canvas_state_hash(canvas)
+        hash_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        merkle_root(canvas)
+        digest_seconds += time.perf_counter() - started
+    return summary_seconds, hash_seconds, digest_seconds
+
+
+def main(sizes):
+    rules = RulePackRegistry(synthetic_catalog.BACKEND_DIR / "rules")
+    print(f"{ROUNDS} edit-and-verify rounds per canvas")
+    print(f"{'elements':>9} {'rescan ms':>10} {'cached ms':>10} {'speedup':>8} {'canvas hash ms':>15} {'merkle ms':>10}")
+    for count in sizes:
+        canvas = make_canvas(count, random.Random(count))
+        uncached = ComplianceEngine(rules, ElementResultCache(max_entries=0))
+        cached = ComplianceEngine(rules, ElementResultCache())
+        cached.summarize_canvas(canvas)
+
+        rescan_seconds, hash_seconds, digest_seconds = session(uncached, json.loads(json.dumps(canvas)), 1)
+        cached_seconds, _, _ = session(cached, json.loads(json.dumps(canvas)), 1)
+
+        per_round = 1000 / ROUNDS
+        print(f"{count:>9} {rescan_seconds * per_round:>10.3f} {cached_seconds * per_round:>10.3f} "
+              f"{rescan_seconds / cached_seconds:>7.1f}x {hash_seconds * per_round:>15.3f} {digest_seconds * per_round:>10.3f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [20, 200, 2000])
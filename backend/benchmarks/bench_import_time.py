@@ -0,0 +1,69 @@
+"""Import time of the API process, measured with `python -X importtime`.
+
+Usage: python benchmarks/bench_import_time.py [budget_ms] [top_n]
+
+Imports main in a fresh interpreter, prints the slowest top-level imports
+and exits non-zero if a heavy ML library is imported eagerly or the total
+exceeds the budget (default 1000 ms), so it can run as a regression check.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Only the image worker processes and the rembg provider may import these
+HEAVY_MODULES = ("torch", "diffusers", "transformers", "rembg", "onnxruntime", "cv2", "scipy", "skimage")
+
+
+def measure():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        sys.exit(f"import main failed:\n{result.stderr[-2000:]}")
+
+    # Lines look like: "import time:   self [us] | cumulative | imported package"
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        imports.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def main(budget_ms: float, top_n: int):
+    measure()  # first run compiles bytecode; measure the warm import
+    imports = measure()
+
+    # The name column is indented two spaces per nesting level
+    depth = lambda name: (len(name) - len(name.lstrip()) - 1) // 2
+    total_ms = sum(cumulative for name, _, cumulative in imports if depth(name) == 0) / 1000
+    direct = [(name.strip(), cumulative) for name, _, cumulative in imports if depth(name) == 1]
+    loaded = {name.strip().split(".")[0] for name, _, _ in imports}
+    heavy = sorted(loaded.intersection(HEAVY_MODULES))
+
+    print(f"import main: {total_ms:.0f} ms across {len(imports)} modules")
+    for name, cumulative in sorted(direct, key=lambda item: -item[1])[:top_n]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if heavy:
+        failures.append(f"heavy modules imported eagerly: {', '.join(heavy)}")
+    if total_ms > budget_ms:
+        failures.append(f"{total_ms:.0f} ms exceeds the {budget_ms:.0f} ms budget")
+    if failures:
+        sys.exit("FAIL: " + "; ".join(failures))
+    print("OK")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        float(args[0]) if len(args) > 0 else 1000,
+        int(args[1]) if len(args) > 1 else 15
+    )
@@ -0,0 +1,111 @@
+"""Requests/second and p95 of the /generate LLM stages against a stub API.
+
+Usage: python benchmarks/bench_pipeline_concurrency.py [latency_s] [concurrency] [requests]
+
+"blocking" replays the previous behaviour: a synchronous Anthropic client
+called inside coroutines, stages one after another. "async" uses AIEngine's
+pooled AsyncAnthropic client and the dependency-aware StageRunner. Image
+generation is left out so only LLM scheduling is measured.
+"""
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+from synthetic_catalog import ASSET_INDEX_CSV, ASSET_LIBRARY_DIR
+from llm_stub_server import start_stub_server
+
+
+async def blocking_generate(client, prompt):
+    for system in ("normalize", "You generate TOON", "asset recommendation", "background"):
+        client.messages.create(
+            model="claude-3-haiku-20240307",
+            max_tokens=100,
+            system=system,
+            messages=[{"role": "user", "content": prompt}]
+        )
+
+
+def async_generate_factory(ai_engine, asset_manager, compliance_engine):
+    from app.services.pipeline import StageRunner
+
+    async def generate(prompt):
+        runner = StageRunner()
+        runner.add("normalized_intent", lambda: ai_engine.normalize_prompt(prompt))
+        runner.add("toon", lambda normalized_intent: ai_engine.generate_toon(normalized_intent),
+                   depends_on=["normalized_intent"])
+        runner.add("assets", lambda normalized_intent: ai_engine.recommend_assets(normalized_intent, asset_manager),
+                   depends_on=["normalized_intent"])
+        runner.add("background_description",
+                   lambda normalized_intent, toon: ai_engine.generate_background_description(normalized_intent, toon),
+                   depends_on=["normalized_intent", "toon"])
+        runner.add("compliance_summary",
+                   lambda normalized_intent, toon, assets: compliance_engine.validate(normalized_intent, toon, assets),
+                   depends_on=["normalized_intent", "toon", "assets"])
+        await runner.run()
+
+    return generate
+
+
+async def drive(generate, concurrency, total):
+    latencies = []
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(f"breakfast cereal campaign {i}")
+
+    async def worker():
+        while not queue.empty():
+            prompt = queue.get_nowait()
+            start = time.perf_counter()
+            await generate(prompt)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+    return total / wall, p95
+
+
+def report(label, rps, p95):
+    print(f"{label:<10} {rps:7.2f} req/s | p95 {p95 * 1000:8.1f} ms")
+
+
+async def main(latency, concurrency, total):
+    server, base_url = start_stub_server(latency)
+    os.environ["ANTHROPIC_API_KEY"] = "stub"
+    os.environ["ANTHROPIC_BASE_URL"] = base_url
+
+    from anthropic import Anthropic
+    from app.services.ai_engine import AIEngine
+    from app.services.asset_manager import AssetManager
+    from app.services.compliance_engine import ComplianceEngine
+
+    asset_manager = AssetManager(ASSET_INDEX_CSV, ASSET_LIBRARY_DIR)
+    with contextlib.redirect_stdout(io.StringIO()):
+        asset_manager.load()
+        ai_engine = AIEngine()
+        await ai_engine.recommend_assets("warm up", asset_manager)
+
+    print(f"stub latency {latency * 1000:.0f} ms, concurrency {concurrency}, {total} requests")
+    sync_client = Anthropic(api_key="stub", base_url=base_url)
+    report("blocking", *await drive(lambda p: blocking_generate(sync_client, p), concurrency, total))
+
+    generate = async_generate_factory(ai_engine, asset_manager, ComplianceEngine())
+    report("async", *await drive(generate, concurrency, total))
+
+    await ai_engine.aclose()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(main(
+        float(args[0]) if len(args) > 0 else 0.2,
+        int(args[1]) if len(args) > 1 else 16,
+        int(args[2]) if len(args) > 2 else 64
+    ))
@@ -0,0 +1,91 @@
+"""Compliance rule scanning: substring loop vs the compiled RuleMatcher.
+
+Usage: python benchmarks/bench_rule_matching.py [rules...]
+
+For each rule count (default 13, 1000, 5000 and 20000), builds a synthetic
+rule list of one- to three-word phrases plus brand names, then times
+scanning a batch of creative texts with the old one-substring-search-per-
+phrase loop (over words and brands alike) and with RuleMatcher, whose
+one-off compile time is reported separately. The loop's match count is
+higher because it also matches inside words.
+"""
+import random
+import sys
+import time
+
+import synthetic_catalog  # noqa: F401  (puts the backend on sys.path)
+
+from app.services.compliance_engine import ComplianceEngine
+from app.services.rule_matcher import RuleMatcher
+
+SYLLABLES = ["ka", "lo", "mi", "ran", "te", "su", "vo", "pel", "dor", "ix", "na", "qu", "bre", "sal", "ton"]
+TEXTS = 500
+
+
+def word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def make_rules(count: int, rng: random.Random):
+    pack = ComplianceEngine().rule_pack()
+    words = set(pack.forbidden_words)
+    while len(words) < count:
+        words.add(" ".join(word(rng) for _ in range(rng.randint(1, 3))))
+    brands = set(pack.restricted_brands)
+    while len(brands) < max(len(brands), count // 10):
+        brands.add(word(rng))
+    return sorted(words), sorted(brands)
+
+
+def make_texts(rules, rng: random.Random):
+    vocabulary = [word(rng) for _ in range(2000)]
+    texts = []
+    for _ in range(TEXTS):
+        tokens = [rng.choice(vocabulary) for _ in range(rng.randint(10, 60))]
+        if rng.random() < 0.3:
+            tokens.insert(rng.randrange(len(tokens) + 1), rng.choice(rules))
+        texts.append(" ".join(tokens).capitalize() + ".")
+    return texts
+
+
+def legacy_scan(texts, words, brands):
+    phrases = words + brands
+    found = 0
+    for text in texts:
+        text_lower = text.lower()
+        for phrase in phrases:
+            if phrase in text_lower:
+                found += 1
+    return found
+
+
+def matcher_scan(texts, matcher):
+    return sum(len(matcher.find_all(text)) for text in texts)
+
+
+def main(rule_counts):
+    rng = random.Random(7)
+    print(f"{TEXTS} texts per run")
+    print(f"{'rules':>7} {'legacy ms':>10} {'matcher ms':>11} {'compile ms':>11} {'speedup':>8} {'legacy hits':>12} {'matcher hits':>13}")
+    for count in rule_counts:
+        words, brands = make_rules(count, rng)
+        texts = make_texts(words + brands, rng)
+
+        started = time.perf_counter()
+        legacy_hits = legacy_scan(texts, words, brands)
+        legacy_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        matcher = RuleMatcher({"forbidden_word": words, "restricted_brand": brands})
+        compile_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        matcher_hits = matcher_scan(texts, matcher)
+        matcher_ms = (time.perf_counter() - started) * 1000
+
+        print(f"{len(words) + len(brands):>7} {legacy_ms:>10.1f} {matcher_ms:>11.1f} {compile_ms:>11.1f} "
+              f"{legacy_ms / matcher_ms:>7.1f}x {legacy_hits:>12} {matcher_hits:>13}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [13, 1000, 5000, 20000])
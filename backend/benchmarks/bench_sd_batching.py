@@ -0,0 +1,67 @@
+"""Stable Diffusion throughput on CPU for batch sizes 1, 2, 4 and 8.
+
+Usage: python benchmarks/bench_sd_batching.py [images_per_size] [batch sizes...]
+
+Each batch size renders the same number of images through
+LocalGen.generate_images, i.e. the call a pool worker makes for one batch.
+Needs the model weights (downloaded on first run) and takes several minutes.
+"""
+import contextlib
+import io
+import sys
+import time
+
+import synthetic_catalog  # noqa: F401  (puts the backend on sys.path)
+
+from app.services.local_gen import LocalGen
+from app.services.sd_prompt import build_sd_prompt
+
+PROMPTS = [
+    "breakfast cereal promotion",
+    "summer fruit display",
+    "coffee and pastries offer",
+    "fresh bakery bread",
+    "weekend barbecue essentials",
+    "healthy snack range",
+    "back to school lunchbox",
+    "festive chocolate gifts",
+]
+
+
+def render(local_gen: LocalGen, batch_size: int, total: int) -> float:
+    start = time.perf_counter()
+    for offset in range(0, total, batch_size):
+        items = [
+            {"sd_prompt": build_sd_prompt(PROMPTS[(offset + i) % len(PROMPTS)], "clean shelf", {}), "seed": offset + i}
+            for i in range(min(batch_size, total - offset))
+        ]
+        with contextlib.redirect_stdout(io.StringIO()):
+            local_gen.generate_images(items)
+    return time.perf_counter() - start
+
+
+def main(total: int, batch_sizes):
+    local_gen = LocalGen()
+    with contextlib.redirect_stdout(io.StringIO()):
+        local_gen._init_sd()
+    if local_gen.sd_pipe == "failed":
+        sys.exit("Stable Diffusion could not be loaded")
+
+    render(local_gen, 1, 1)  # first call pays one-off allocation costs
+
+    print(f"{total} images per batch size")
+    baseline = None
+    for batch_size in batch_sizes:
+        elapsed = render(local_gen, batch_size, total)
+        throughput = total / elapsed
+        baseline = baseline or throughput
+        print(f"batch {batch_size:<2} {throughput * 60:7.2f} images/min | "
+              f"{elapsed / total:6.2f} s/image | {throughput / baseline:5.2f}x")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if args else 8,
+        [int(arg) for arg in args[1:]] or [1, 2, 4, 8]
+    )
@@ -0,0 +1,111 @@
+"""Per-request Python overhead around the Stable Diffusion call.
+
+Usage: python benchmarks/bench_sd_request_overhead.py [iterations]
+
+The pipeline is replaced by a stub that returns immediately, so only the
+work LocalGen does around inference is timed. "legacy" replays the safety
+checker re-patching that used to run on every request (dummy classes,
+component walk, method rebinding, warning filters); "current" is the
+request path of a pipeline configured once at load. Needs torch, but not
+the model weights.
+"""
+import sys
+import time
+import types
+import warnings
+from types import SimpleNamespace
+
+import synthetic_catalog  # noqa: F401  (puts the backend on sys.path)
+
+import torch
+from PIL import Image
+
+from app.services.local_gen import LocalGen
+from app.services.sd_prompt import DEFAULT_PARAMS
+
+
+class StubPipeline:
+
+    def __init__(self):
+        self.safety_checker = None
+        self.feature_extractor = None
+        self.requires_safety_checker = False
+        self.components = {"safety_checker": None, "feature_extractor": None, "unet": object()}
+        self._image = Image.new('RGB', (DEFAULT_PARAMS["width"], DEFAULT_PARAMS["height"]))
+
+    def _run_safety_checker(self, image, device, dtype):
+        return image, None
+
+    def __call__(self, prompt, **kwargs):
+        return SimpleNamespace(images=[self._image] * len(prompt))
+
+
+def legacy_patch(sd_pipe):
+    warnings.filterwarnings("ignore", category=UserWarning)
+    warnings.filterwarnings("ignore", message=".*NSFW.*")
+    warnings.filterwarnings("ignore", message=".*safety.*")
+
+    def dummy_safety_checker(images, clip_input):
+        return images, [False] * len(images) if isinstance(images, list) else [False]
+
+    class DummyFeatureExtractor:
+        def __call__(self, images, return_tensors="pt"):
+            batch_size = len(images) if isinstance(images, list) else 1
+            dummy_tensor = torch.zeros((batch_size, 3, 224, 224))
+            class DummyOutput:
+                def __init__(self, tensor):
+                    self.pixel_values = tensor
+                def to(self, device):
+                    self.pixel_values = self.pixel_values.to(device)
+                    return self
+            return DummyOutput(dummy_tensor)
+
+    dummy_feature_extractor = DummyFeatureExtractor()
+    sd_pipe.safety_checker = dummy_safety_checker
+    sd_pipe.requires_safety_checker = False
+    if hasattr(sd_pipe, 'feature_extractor'):
+        sd_pipe.feature_extractor = dummy_feature_extractor
+    if hasattr(sd_pipe, '_safety_checker'):
+        sd_pipe._safety_checker = dummy_safety_checker
+    if hasattr(sd_pipe, 'components'):
+        if 'safety_checker' in sd_pipe.components:
+            sd_pipe.components['safety_checker'] = dummy_safety_checker
+        if 'feature_extractor' in sd_pipe.components:
+            sd_pipe.components['feature_extractor'] = dummy_feature_extractor
+    if hasattr(sd_pipe, '_run_safety_checker'):
+        def bypass_safety(self, image, device, dtype):
+            return image, [False]
+        sd_pipe._run_safety_checker = types.MethodType(bypass_safety, sd_pipe)
+
+
+def time_per_call(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(iterations: int):
+    local_gen = LocalGen(num_threads=1)
+    local_gen.sd_pipe = StubPipeline()
+
+    def current():
+        with torch.inference_mode():
+            local_gen._run_pipe(["warm-up"], [0], DEFAULT_PARAMS)
+
+    def legacy():
+        legacy_patch(local_gen.sd_pipe)
+        current()
+
+    for fn in (current, legacy):
+        time_per_call(fn, max(1, iterations // 10))
+
+    current_us = time_per_call(current, iterations)
+    legacy_us = time_per_call(legacy, iterations)
+    print(f"{iterations} calls, inference stubbed out")
+    print(f"legacy  {legacy_us:8.1f} us/request")
+    print(f"current {current_us:8.1f} us/request  ({legacy_us - current_us:.1f} us saved)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,47 @@
+"""Cost of upscaling a rendered image to poster size, per strategy.
+
+Usage: python benchmarks/bench_upscaling.py [iterations]
+
+Times each strategy in app.services.upscaling on a 288x512 render (the
+current Stable Diffusion output) up to 1080x1920, next to the old
+256x256 -> 1080x1920 LANCZOS resize. The renders are random noise, so no
+model or torch is needed.
+"""
+import os
+import sys
+import time
+
+import synthetic_catalog  # noqa: F401  (puts the backend on sys.path)
+
+from PIL import Image
+
+from app.services.sd_prompt import DEFAULT_PARAMS, POSTER_SIZE
+from app.services.upscaling import UPSCALERS, upscale_final
+
+
+def noise(size):
+    return Image.frombytes('RGB', size, os.urandom(size[0] * size[1] * 3))
+
+
+def time_per_call(fn, image, iterations):
+    fn(image, POSTER_SIZE)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(image, POSTER_SIZE)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main(iterations: int):
+    render_size = (DEFAULT_PARAMS["width"], DEFAULT_PARAMS["height"])
+    render = noise(render_size)
+    print(f"{iterations} upscales to {POSTER_SIZE[0]}x{POSTER_SIZE[1]}, {os.cpu_count()} CPUs")
+
+    legacy_ms = time_per_call(upscale_final, noise((256, 256)), iterations)
+    print(f"{'legacy 256x256 lanczos':24} {legacy_ms:8.2f} ms")
+    for name, upscaler in UPSCALERS.items():
+        ms = time_per_call(upscaler, render, iterations)
+        print(f"{f'{render_size[0]}x{render_size[1]} {name}':24} {ms:8.2f} ms  ({legacy_ms / ms:.2f}x legacy)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,61 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+TOON_RESPONSE = {
+    "layout": {"type": "grid", "zones": [{"id": "body", "bounds": {"x": 0, "y": 0, "w": 1, "h": 1}, "type": "image"}]},
+    "typography": {"headline": {"font": "sans-serif", "size": "large", "weight": "bold"}},
+    "colors": {"primary": "#64748b", "background": "#ffffff", "text": "#1e293b"},
+    "format": "banner",
+    "channel": "generic",
+    "compliance": {"no_pricing": True, "no_promotional_claims": True, "product_focused": True}
+}
+
+
+class StubMessagesHandler(BaseHTTPRequestHandler):
+    # Minimal stand-in for POST /v1/messages with injected latency
+    protocol_version = "HTTP/1.1"
+    latency = 0.2
+    calls = 0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        type(self).calls += 1
+        time.sleep(self.latency)
+
+        system = body.get("system", "")
+        if "TOON" in system:
+            text = json.dumps(TOON_RESPONSE)
+        elif "asset recommendation" in system:
+            text = '["33127", "55858"]'
+        else:
+            text = "Clean, neutral product-focused creative"
+
+        payload = json.dumps({
+            "id": "msg_stub",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "stub"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 1, "output_tokens": 1}
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(latency: float) -> Tuple[ThreadingHTTPServer, str]:
+    handler = type("Handler", (StubMessagesHandler,), {"latency": latency, "calls": 0})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
@@ -0,0 +1,41 @@
+import csv
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+BASE_DIR = BACKEND_DIR.parent
+ASSET_INDEX_CSV = BASE_DIR / "asset-index.csv"
+ASSET_LIBRARY_DIR = BASE_DIR / "asset-library"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+FIELDNAMES = ["sample_id", "catalog_content", "category", "price", "image_link", "local_path"]
+
+
+def load_seed_rows() -> List[Dict[str, str]]:
+    with open(ASSET_INDEX_CSV, 'r', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def synthetic_rows(count: int) -> List[Dict[str, str]]:
+    seed_rows = load_seed_rows()
+    rows = []
+    for i in range(count):
+        seed = seed_rows[i % len(seed_rows)]
+        generation = i // len(seed_rows)
+        row = dict(seed)
+        if generation:
+            row["sample_id"] = f"{seed['sample_id']}-{generation}"
+            row["catalog_content"] = f"{seed['catalog_content']}\nVariant: batch{generation}"
+        rows.append(row)
+    return rows
+
+
+def write_synthetic_csv(path: Path, count: int) -> Path:
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(synthetic_rows(count))
+    return path
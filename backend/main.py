@@ -1,284 +1,48 @@
 import os
-import re
-import csv
-import hashlib
+import asyncio
 import json
 import base64
-import torch
+import time
 from pathlib import Path
-from typing import List, Dict, Optional, Any
-from io import BytesIO
+from typing import Callable, List, Dict, Literal, Optional, Any, Tuple
 from PIL import Image, ImageDraw, ImageFont
 
-from diffusers import AutoPipelineForText2Image, StableDiffusionPipeline
-from transformers import pipeline, AutoTokenizer, AutoModelForCausalLM
-
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 
 from app.services.ai_engine import AIEngine
 from app.services.asset_manager import AssetManager
-from app.services.compliance_engine import ComplianceEngine
+from app.services.compliance_engine import ComplianceEngine, DEFAULT_RULES_DIR
+from app.services.compliance_batch import ComplianceBatchRunner, summary_hash
+from app.services.compliance_cache import ElementResultCache
+from app.services.canvas_hash import canvas_state_hash
+from app.services.rule_packs import RulePackRegistry
 from app.services.toon_parser import TOONParser
 from app.services.blockchain import BlockchainLedger
-
-try:
-    from rembg import remove
-    REMBG_AVAILABLE = True
-except ImportError:
-    REMBG_AVAILABLE = False
+from app.services.pipeline import StageRunner
+from app.services.single_flight import SingleFlight
+from app.services.image_worker import ImageWorkerPool, QueueFullError
+from app.services.readiness import Readiness
+from app.services.background_removal import BackgroundRemovalPool, BackgroundRemover
+from app.services.image_cache import ImageCache
+from app.services.cutout_cache import CutoutCache
+from app.services.image_encoding import DEFAULT_QUALITY, EXTENSION_MEDIA_TYPES, EXTENSIONS, MEDIA_TYPES, encode_image
+from app.services.upscaling import DEFAULT_UPSCALER
+from app.services.sd_prompt import DEFAULT_PARAMS, MODEL_ID, POSTER_SIZE, build_sd_prompt, deterministic_seed, random_seed
+from app.services.job_store import InMemoryJobStore, JobStoreFullError, RUNNING, SUCCEEDED, FAILED, CANCELLED, TERMINAL_STATUSES
+
+# Heavy backends are only imported inside worker processes: rembg in the
+# background removal pool, torch/diffusers in the image worker pool
+REMBG_AVAILABLE = BackgroundRemover.is_available()
+if not REMBG_AVAILABLE:
     print("[Backend] rembg not available, background removal disabled")
 
-class LocalGen:
-    def __init__(self):
-        self.sd_pipe = None
-        self.transformer = None
-        self.device = "cpu"
-        self.dtype = torch.float32
-        
-        torch.set_float32_matmul_precision("medium")
-        torch.set_num_threads(4)
-
-    def _init_sd(self):
-        if self.sd_pipe is None:
-            print(f"[LocalGen] Initializing Stable Diffusion 1.5 on CPU (this may take a minute)...")
-            try:
-                import os
-                os.environ["DIFFUSERS_NO_SAFETY_CHECKER"] = "1"
-                os.environ["DIFFUSERS_SAFETY_CHECKER_DISABLED"] = "1"
-                
-                self.sd_pipe = StableDiffusionPipeline.from_pretrained(
-                    "runwayml/stable-diffusion-v1-5",
-                    torch_dtype=self.dtype
-                )
-                self.sd_pipe.to(self.device)
-                self.sd_pipe.enable_attention_slicing()
-                
-                def dummy_safety_checker(images, clip_input):
-                    return images, [False] * len(images) if isinstance(images, list) else [False]
-                
-                class DummyFeatureExtractor:
-                    def __call__(self, images, return_tensors="pt"):
-                        if isinstance(images, list):
-                            batch_size = len(images)
-                        else:
-                            batch_size = 1
-                        dummy_tensor = torch.zeros((batch_size, 3, 224, 224))
-                        class DummyOutput:
-                            def __init__(self, tensor):
-                                self.pixel_values = tensor
-                            def to(self, device):
-                                self.pixel_values = self.pixel_values.to(device)
-                                return self
-                        return DummyOutput(dummy_tensor)
-                
-                dummy_feature_extractor = DummyFeatureExtractor()
-                
-                self.sd_pipe.safety_checker = dummy_safety_checker
-                self.sd_pipe.requires_safety_checker = False
-                
-                if hasattr(self.sd_pipe, 'feature_extractor'):
-                    self.sd_pipe.feature_extractor = dummy_feature_extractor
-                if hasattr(self.sd_pipe, '_safety_checker'):
-                    self.sd_pipe._safety_checker = dummy_safety_checker
-                if hasattr(self.sd_pipe, 'components'):
-                    if 'safety_checker' in self.sd_pipe.components:
-                        self.sd_pipe.components['safety_checker'] = dummy_safety_checker
-                    if 'feature_extractor' in self.sd_pipe.components:
-                        self.sd_pipe.components['feature_extractor'] = dummy_feature_extractor
-                
-                if hasattr(self.sd_pipe, '_run_safety_checker'):
-                    def bypass_safety(self, image, device, dtype):
-                        return image, [False]
-                    import types
-                    self.sd_pipe._run_safety_checker = types.MethodType(bypass_safety, self.sd_pipe)
-                
-                print(f"[LocalGen] Stable Diffusion loaded on CPU (safety checker replaced with dummy)")
-            except Exception as e:
-                print(f"[LocalGen] Failed to load Stable Diffusion: {e}")
-                import traceback
-                traceback.print_exc()
-                self.sd_pipe = "failed"
-
-    def _init_transformer(self):
-        if self.transformer is None:
-            print(f"[LocalGen] Initializing GPT-2 Transformer on CPU...")
-            try:
-                self.transformer = pipeline(
-                    "text-generation",
-                    model="gpt2",
-                    device=-1,
-                    torch_dtype=self.dtype
-                )
-                print(f"[LocalGen] GPT-2 loaded on CPU")
-            except Exception as e:
-                print(f"[LocalGen] Failed to load Transformer: {e}")
-                self.transformer = "failed"
-
-    async def generate_image(self, prompt: str, background_desc: str, toon: Dict[str, Any]) -> Optional[str]:
-        self._init_sd()
-
-        if self.sd_pipe == "failed":
-            return None
-
-        # Convert TOON to Stable Diffusion prompt
-        toon_prompt_parts = []
-        if toon and isinstance(toon, dict):
-            if 'colors' in toon:
-                colors = toon.get('colors', {})
-                if colors.get('background'):
-                    toon_prompt_parts.append(f"background color {colors['background']}")
-                if colors.get('primary'):
-                    toon_prompt_parts.append(f"accent color {colors['primary']}")
-            if 'format' in toon:
-                toon_prompt_parts.append(f"{toon['format']} format")
-            if 'layout' in toon and toon['layout'].get('type'):
-                toon_prompt_parts.append(f"{toon['layout']['type']} layout")
-        
-        toon_context = ", ".join(toon_prompt_parts) if toon_prompt_parts else ""
-        sd_prompt = f"{prompt}, {background_desc}, {toon_context}, professional retail background, clean, commercial photography".strip(", ")
-
-        # Fast CPU generation: minimal steps, small size
-        try:
-            print(f"[LocalGen] Generating image on CPU (fast mode)...")
-            import warnings
-            warnings.filterwarnings("ignore", category=UserWarning)
-            warnings.filterwarnings("ignore", message=".*NSFW.*")
-            warnings.filterwarnings("ignore", message=".*safety.*")
-            
-            def dummy_safety_checker(images, clip_input):
-                return images, [False] * len(images) if isinstance(images, list) else [False]
-            
-            class DummyFeatureExtractor:
-                def __call__(self, images, return_tensors="pt"):
-                    if isinstance(images, list):
-                        batch_size = len(images)
-                    else:
-                        batch_size = 1
-                    dummy_tensor = torch.zeros((batch_size, 3, 224, 224))
-                    class DummyOutput:
-                        def __init__(self, tensor):
-                            self.pixel_values = tensor
-                        def to(self, device):
-                            self.pixel_values = self.pixel_values.to(device)
-                            return self
-                    return DummyOutput(dummy_tensor)
-            
-            dummy_feature_extractor = DummyFeatureExtractor()
-            
-            self.sd_pipe.safety_checker = dummy_safety_checker
-            self.sd_pipe.requires_safety_checker = False
-            if hasattr(self.sd_pipe, 'feature_extractor'):
-                self.sd_pipe.feature_extractor = dummy_feature_extractor
-            if hasattr(self.sd_pipe, '_safety_checker'):
-                self.sd_pipe._safety_checker = dummy_safety_checker
-            if hasattr(self.sd_pipe, 'components'):
-                if 'safety_checker' in self.sd_pipe.components:
-                    self.sd_pipe.components['safety_checker'] = dummy_safety_checker
-                if 'feature_extractor' in self.sd_pipe.components:
-                    self.sd_pipe.components['feature_extractor'] = dummy_feature_extractor
-            
-            import random
-            import time
-            seed = random.randint(0, 2**32 - 1) + int(time.time() * 1000) % 10000
-            
-            if hasattr(self.sd_pipe, '_run_safety_checker'):
-                def bypass_safety(self, image, device, dtype):
-                    return image, [False]
-                import types
-                self.sd_pipe._run_safety_checker = types.MethodType(bypass_safety, self.sd_pipe)
-            
-            with torch.inference_mode():
-                try:
-                    result = self.sd_pipe(
-                        prompt=sd_prompt,
-                        num_inference_steps=4,
-                        guidance_scale=3.0,
-                        height=256,
-                        width=256,
-                        output_type="pil",
-                        generator=torch.Generator(device=self.device).manual_seed(seed)
-                    )
-                except Exception as e:
-                    if "'NoneType' object is not callable" in str(e) or "not callable" in str(e):
-                        print(f"[LocalGen] Safety checker error, bypassing completely...")
-                        if hasattr(self.sd_pipe, '_run_safety_checker'):
-                            def bypass_safety(self, image, device, dtype):
-                                return image, [False]
-                            import types
-                            self.sd_pipe._run_safety_checker = types.MethodType(bypass_safety, self.sd_pipe)
-                        self.sd_pipe.safety_checker = dummy_safety_checker
-                        self.sd_pipe.requires_safety_checker = False
-                        if hasattr(self.sd_pipe, 'components'):
-                            self.sd_pipe.components['safety_checker'] = dummy_safety_checker
-                        result = self.sd_pipe(
-                            prompt=sd_prompt,
-                            num_inference_steps=4,
-                            guidance_scale=3.0,
-                            height=256,
-                            width=256,
-                            output_type="pil",
-                            generator=torch.Generator(device=self.device).manual_seed(seed)
-                        )
-                    else:
-                        raise
-                image = None
-                if hasattr(result, 'images') and result.images and len(result.images) > 0:
-                    image = result.images[0]
-                    print(f"[LocalGen] Extracted image from result.images, size: {image.size if hasattr(image, 'size') else 'unknown'}")
-                elif isinstance(result, list) and len(result) > 0:
-                    image = result[0]
-                    print(f"[LocalGen] Extracted image from result list, size: {image.size if hasattr(image, 'size') else 'unknown'}")
-                elif hasattr(result, 'image') and result.image is not None:
-                    image = result.image
-                    print(f"[LocalGen] Extracted image from result.image, size: {image.size if hasattr(image, 'size') else 'unknown'}")
-                elif isinstance(result, Image.Image):
-                    image = result
-                    print(f"[LocalGen] Result is Image.Image, size: {image.size if hasattr(image, 'size') else 'unknown'}")
-                else:
-                    print(f"[LocalGen] ERROR: Could not extract image from result. Result type: {type(result)}, hasattr images: {hasattr(result, 'images')}")
-                    raise ValueError("Failed to extract image from Stable Diffusion result")
-                
-                if image and hasattr(image, 'size'):
-                    if image.size == (1, 1) or (hasattr(image, 'mode') and image.mode == 'L' and image.size[0] == 1):
-                        print(f"[LocalGen] Warning: Got black image, regenerating with new seed...")
-                        import random
-                        import time
-                        new_seed = random.randint(0, 2**32 - 1) + int(time.time() * 1000) % 10000
-                        result = self.sd_pipe(
-                            prompt=sd_prompt,
-                            num_inference_steps=6,
-                            guidance_scale=5.0,
-                            height=256,
-                            width=256,
-                            output_type="pil",
-                            generator=torch.Generator(device=self.device).manual_seed(new_seed)
-                        )
-                        if hasattr(result, 'images') and len(result.images) > 0:
-                            image = result.images[0]
-                        elif isinstance(result, list) and len(result) > 0:
-                            image = result[0]
-            
-            # Upscale to poster format 1080x1920
-            image = image.resize((1080, 1920), Image.Resampling.LANCZOS)
-            
-            buffer = BytesIO()
-            image.save(buffer, format='PNG')
-            print(f"[LocalGen] Image generated successfully")
-            return base64.b64encode(buffer.getvalue()).decode('utf-8')
-        except Exception as e:
-            print(f"[LocalGen] SD generation failed: {e}")
-            import traceback
-            print(f"[LocalGen] Full traceback:")
-            traceback.print_exc()
-            return None
-
 app = FastAPI(
     title="Retail Media Creative Builder API",
     description="Compliance-first AI orchestration engine for retail media creative assembly",
@@ -299,19 +63,170 @@ ASSET_INDEX_CSV = BASE_DIR / "asset-index.csv"
 
 asset_manager = AssetManager(ASSET_INDEX_CSV, ASSET_LIBRARY_DIR)
 ai_engine = AIEngine()
-compliance_engine = ComplianceEngine()
+compliance_engine = ComplianceEngine(
+    RulePackRegistry(Path(os.getenv("RULES_DIR") or DEFAULT_RULES_DIR)),
+    ElementResultCache(max_entries=int(os.getenv("COMPLIANCE_CACHE_MAX_ENTRIES", "4096")))
+)
+compliance_batch = ComplianceBatchRunner(compliance_engine, workers=int(os.getenv("VERIFY_BATCH_WORKERS", "0")))
 toon_parser = TOONParser()
 blockchain = BlockchainLedger()
-local_gen = LocalGen()
+generate_flight = SingleFlight()
+job_store = InMemoryJobStore(
+    max_jobs=int(os.getenv("JOB_MAX_RETAINED", "200")),
+    ttl=float(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+)
+job_tasks: Dict[str, asyncio.Task] = {}
+
+ASSET_RELOAD_INTERVAL = float(os.getenv("ASSET_RELOAD_INTERVAL", "0"))
+RULES_RELOAD_INTERVAL = float(os.getenv("RULES_RELOAD_INTERVAL", "5"))
+SD_WORKERS = int(os.getenv("SD_WORKERS", "1"))
+SD_PREVIEW_EVERY = int(os.getenv("SD_PREVIEW_EVERY", "1"))
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "1").lower() not in ("0", "false", "no")
+
+background_removal_pool = BackgroundRemovalPool(
+    workers=int(os.getenv("REMBG_WORKERS", "1")),
+    max_side=int(os.getenv("REMBG_MAX_SIDE", "1024")),
+    warmup=STARTUP_WARMUP
+)
+
+readiness = Readiness("asset_index", "stable_diffusion", "rembg")
+# Fire-and-forget startup tasks; the event loop only keeps weak references
+startup_tasks = set()
+
+
+def record_image_workers(reports: List[Optional[Dict[str, Any]]]):
+    # Called by the pool at start, as each worker loads, and when one is
+    # respawned: the instance is not ready until every worker has a pipeline
+    loaded = [report for report in reports if report is not None]
+    if len(loaded) < len(reports):
+        readiness.loading("stable_diffusion", ready_workers=len(loaded))
+    elif all(report["loaded"] for report in reports):
+        readiness.ready("stable_diffusion", ready_workers=len(loaded), workers=reports)
+    else:
+        readiness.failed("stable_diffusion", "Pipeline failed to load, serving PIL fallback posters",
+                         ready_workers=len(loaded), workers=reports)
+
+
+image_pool = ImageWorkerPool(
+    workers=SD_WORKERS,
+    max_queue=int(os.getenv("SD_MAX_QUEUE", "8")),
+    job_timeout=float(os.getenv("SD_JOB_TIMEOUT", "300")),
+    queue_timeout=float(os.getenv("SD_QUEUE_TIMEOUT", "300")) or None,
+    threads_per_worker=int(os.getenv("SD_THREADS_PER_WORKER", "0")) or None,
+    max_batch_size=int(os.getenv("SD_MAX_BATCH", "4")),
+    batch_window=float(os.getenv("SD_BATCH_WINDOW_MS", "50")) / 1000,
+    warmup=STARTUP_WARMUP,
+    on_workers_changed=record_image_workers
+)
+
+# Generated and processed images are stored here and served from /images
+image_cache = ImageCache(
+    Path(os.getenv("IMAGE_CACHE_DIR") or Path(__file__).parent / ".image-cache"),
+    max_bytes=int(float(os.getenv("IMAGE_CACHE_MAX_MB", "512")) * 1024 * 1024)
+)
+# Background removal results, keyed by a hash of the source image; also served from /images
+cutout_cache = CutoutCache(
+    background_removal_pool,
+    ImageCache(
+        Path(os.getenv("CUTOUT_CACHE_DIR") or Path(__file__).parent / ".cutout-cache"),
+        max_bytes=int(float(os.getenv("CUTOUT_CACHE_MAX_MB", "1024")) * 1024 * 1024)
+    )
+)
+IMAGE_STORES = (image_cache, cutout_cache.store)
+IMAGE_MAX_AGE = 365 * 24 * 3600
+
+
+def record_asset_index(reload_error: Optional[Exception] = None):
+    # After the startup load and every reload; a failed reload keeps serving
+    # the previous index, so it is only reported alongside it
+    if asset_manager.loaded:
+        readiness.ready("asset_index", asset_count=asset_manager.get_asset_count(), version=asset_manager.version,
+                        reload_error=str(reload_error) if reload_error else None)
+    else:
+        readiness.failed("asset_index", str(reload_error) if reload_error else f"Could not load {ASSET_INDEX_CSV}")
+
+
+async def load_asset_index():
+    readiness.loading("asset_index")
+    await asyncio.to_thread(asset_manager.is_loaded)
+    record_asset_index()
+
+
+def start_background(coroutine) -> asyncio.Task:
+    task = asyncio.create_task(coroutine)
+    startup_tasks.add(task)
+    task.add_done_callback(startup_tasks.discard)
+    return task
+
+
+async def warm_rembg():
+    readiness.loading("rembg")
+    try:
+        reports = await background_removal_pool.wait_ready()
+        readiness.ready("rembg", workers=reports)
+    except Exception as e:
+        readiness.failed("rembg", str(e))
+
+
+@app.on_event("startup")
+async def create_llm_client():
+    # The Anthropic SDK import is slow; pay it off the event loop at startup
+    start_background(asyncio.to_thread(lambda: ai_engine.client))
+
+
+@app.on_event("startup")
+async def start_asset_watcher():
+    start_background(load_asset_index())
+    if ASSET_RELOAD_INTERVAL > 0:
+        asset_manager.start_watching(ASSET_RELOAD_INTERVAL, on_reload=record_asset_index)
+
+
+@app.on_event("startup")
+async def start_rule_watcher():
+    # Edited rule packs are recompiled and swapped in without a restart
+    if RULES_RELOAD_INTERVAL > 0:
+        compliance_engine.rules.start_watching(RULES_RELOAD_INTERVAL)
+
+
+@app.on_event("startup")
+async def start_image_workers():
+    # Workers load in the background; /ready reports when they are done
+    if SD_WORKERS > 0:
+        image_pool.start()
+    else:
+        readiness.disabled("stable_diffusion", "SD_WORKERS=0")
+    
+    if not REMBG_AVAILABLE:
+        readiness.disabled("rembg", "rembg not installed")
+    elif STARTUP_WARMUP:
+        start_background(warm_rembg())
+    else:
+        readiness.cold("rembg", "Loaded on first use (STARTUP_WARMUP=0)")
 
-if ASSET_LIBRARY_DIR.exists():
-    app.mount("/assets", StaticFiles(directory=str(ASSET_LIBRARY_DIR)), name="assets")
+
+@app.on_event("shutdown")
+async def shutdown_services():
+    asset_manager.stop_watching()
+    compliance_engine.rules.stop_watching()
+    for task in list(job_tasks.values()) + list(startup_tasks):
+        task.cancel()
+    image_pool.shutdown()
+    background_removal_pool.shutdown()
+    compliance_batch.shutdown()
+    await ai_engine.aclose()
 
 
 class GenerateRequest(BaseModel):
     prompt: str = Field(..., description="User's creative request prompt")
     format: Optional[str] = Field(None, description="Creative format (e.g., 'banner', 'social', 'display')")
     channel: Optional[str] = Field(None, description="Channel (e.g., 'amazon', 'walmart', 'target')")
+    seed: Optional[int] = Field(None, ge=0, lt=2**32, description="Image seed; a seeded render is reproducible and served from the image cache")
+    deterministic: bool = Field(False, description="Derive the seed from the image prompt so repeat requests reuse the cached image")
+    image_format: Literal["png", "webp", "jpeg"] = Field("webp", description="Encoding of the generated poster")
+    image_quality: int = Field(DEFAULT_QUALITY, ge=1, le=100, description="WebP/JPEG quality (ignored for PNG)")
+    upscale: Literal["preview", "final", "tiled"] = Field(DEFAULT_UPSCALER, description="Upscaling to poster size: bilinear preview, LANCZOS final, or LANCZOS in parallel tiles")
+    preview_every: Optional[int] = Field(None, ge=0, description="Generate jobs: stream a low-res latent preview every N denoising steps (0 disables; defaults to SD_PREVIEW_EVERY)")
+    include_image_base64: bool = Field(False, description="Also inline the poster as base64 (legacy clients)")
 
 
 class GenerateResponse(BaseModel):
@@ -320,23 +235,41 @@ class GenerateResponse(BaseModel):
     normalized_intent: str = Field(..., description="Normalized, guideline-safe intent")
     compliance_summary: Dict[str, Any] = Field(..., description="Compliance validation summary")
     background_description: Optional[str] = Field(None, description="Neutral background/layout description")
-    image_base64: Optional[str] = Field(None, description="Generated poster image as base64")
+    image_url: Optional[str] = Field(None, description="URL of the generated poster image")
+    image_base64: Optional[str] = Field(None, description="Generated poster image as base64, only when include_image_base64 is set")
 
 
 class VerifyRequest(BaseModel):
     canvas_state: Dict[str, Any] = Field(..., description="Current canvas state with all elements")
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
     toon: Optional[Dict[str, Any]] = Field(None, description="TOON representation if available")
+    channel: Optional[str] = Field(None, description="Channel whose rule pack applies (defaults to the TOON's channel)")
 
 
 class VerifyResponse(BaseModel):
     hash: str = Field(..., description="SHA-256 hash of the compliance summary")
+    canvas_hash: Optional[str] = Field(None, description="SHA-256 hash of the canvas state, as recorded in the ledger")
     block_id: Optional[str] = Field(None, description="Hyperledger Fabric block ID")
     compliance_summary: Dict[str, Any] = Field(..., description="Final compliance summary")
     verified: bool = Field(..., description="Whether compliance verification passed")
     message: str = Field(..., description="Verification status message")
 
 
+class VerifyBatchItem(BaseModel):
+    id: Optional[str] = Field(None, description="Caller's reference, echoed back in the result")
+    canvas_state: Optional[Dict[str, Any]] = Field(None, description="Canvas state to check")
+    text: Optional[str] = Field(None, description="Text to check when there is no canvas")
+    metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
+    toon: Optional[Dict[str, Any]] = Field(None, description="TOON representation if available")
+    channel: Optional[str] = Field(None, description="Channel whose rule pack applies (overrides the batch channel)")
+
+
+class VerifyBatchRequest(BaseModel):
+    items: List[VerifyBatchItem] = Field(..., min_length=1, max_length=5000, description="Canvases or text blobs to check")
+    channel: Optional[str] = Field(None, description="Channel for items that do not set their own")
+    dry_run: bool = Field(False, description="Check only; do not commit canvas results to the ledger")
+
+
 class RemoveBackgroundRequest(BaseModel):
     image_base64: str = Field(..., description="Base64 encoded image to remove background from")
 
@@ -344,6 +277,37 @@ class RemoveBackgroundRequest(BaseModel):
 class RemoveBackgroundResponse(BaseModel):
     image_base64: str = Field(..., description="Base64 encoded image with transparent background")
     success: bool = Field(..., description="Whether background removal was successful")
+    image_url: Optional[str] = Field(None, description="URL of the stored cutout")
+    cached: bool = Field(False, description="Whether the cutout came from the cutout cache")
+    timings_ms: Dict[str, float] = Field(default_factory=dict, description="Time spent per processing stage")
+
+
+class RemoveBackgroundUploadResponse(BaseModel):
+    image_url: str = Field(..., description="URL of the stored cutout")
+    content_type: str = Field(..., description="Media type of the cutout")
+    success: bool = Field(..., description="Whether background removal was successful")
+    cached: bool = Field(False, description="Whether the cutout came from the cutout cache")
+    timings_ms: Dict[str, float] = Field(default_factory=dict, description="Time spent per processing stage")
+
+
+class RemoveBackgroundBatchRequest(BaseModel):
+    assets: List[str] = Field(..., min_length=1, max_length=200, description="Asset sample ids or asset-library paths")
+    image_format: Literal["png", "webp"] = Field("png", description="Encoding of the cutouts")
+    image_quality: int = Field(DEFAULT_QUALITY, ge=1, le=100, description="WebP quality (ignored for PNG)")
+
+
+class RemoveBackgroundBatchItem(BaseModel):
+    asset: str = Field(..., description="Asset reference as given in the request")
+    image_url: Optional[str] = Field(None, description="URL of the stored cutout")
+    cached: bool = Field(False, description="Whether the cutout came from the cutout cache")
+    timings_ms: Dict[str, float] = Field(default_factory=dict, description="Time spent per processing stage")
+    error: Optional[str] = Field(None, description="Why this asset failed")
+
+
+class RemoveBackgroundBatchResponse(BaseModel):
+    results: List[RemoveBackgroundBatchItem] = Field(..., description="One result per requested asset, in request order")
+    succeeded: int = Field(..., description="Number of assets cut out")
+    failed: int = Field(..., description="Number of assets that failed")
 
 
 class AssetPositionRequest(BaseModel):
@@ -362,113 +326,260 @@ class AssetPositionResponse(BaseModel):
     height: int = Field(..., description="Height for the asset")
 
 
+@app.get("/ready")
+async def readiness_check():
+    # Readiness (can this instance take traffic yet?) is kept apart from
+    # liveness: /health answers as soon as the process is up
+    return JSONResponse(status_code=200 if readiness.is_ready() else 503, content=readiness.to_dict())
+
+
 @app.get("/")
 @app.get("/health")
 async def health_check():
     return {
         "status": "healthy",
         "service": "retail-media-creative-builder",
-        "assets_loaded": asset_manager.is_loaded(),
-        "asset_count": asset_manager.get_asset_count() if asset_manager.is_loaded() else 0
+        "assets_loaded": asset_manager.loaded,
+        "asset_count": asset_manager.get_asset_count() if asset_manager.loaded else 0,
+        "asset_index_version": asset_manager.version,
+        "llm_cache": ai_engine.cache.stats(),
+        "generate_coalescing": generate_flight.stats(),
+        "image_workers": image_pool.stats(),
+        "background_removal": background_removal_pool.stats(),
+        "cutout_cache": cutout_cache.stats(),
+        "rules": compliance_engine.rules.stats(),
+        "compliance_cache": compliance_engine.element_cache.stats(),
+        "verify_batch": compliance_batch.stats(),
+        "jobs": job_store.stats(),
+        "image_cache": image_cache.stats()
     }
 
 
-@app.post("/generate", response_model=GenerateResponse)
-async def generate_creative(request: GenerateRequest):
+async def render_poster(
+    normalized_intent: str,
+    background_description: Optional[str],
+    toon: Dict[str, Any],
+    seed: Optional[int] = None,
+    deterministic: bool = False,
+    image_format: str = "webp",
+    image_quality: int = DEFAULT_QUALITY,
+    upscale: str = DEFAULT_UPSCALER,
+    preview_every: int = 0,
+    on_progress: Optional[Callable[[Dict[str, Any]], Any]] = None
+) -> str:
+    # Renders (or reuses) the poster and returns its image store key.
+    # on_progress receives a latent preview every preview_every steps.
+    sd_prompt = build_sd_prompt(normalized_intent, background_description or "", toon)
+    params = dict(DEFAULT_PARAMS)
+    if seed is None and deterministic:
+        seed = deterministic_seed(sd_prompt, params)
+    output = {"image_format": image_format, "image_quality": image_quality, "upscale": upscale}
+    extension = EXTENSIONS[image_format]
+    
+    # Only seeded renders are reproducible, so only those are cached
+    cache_key = None
+    if seed is not None:
+        cache_key = ImageCache.make_key(
+            sd_prompt,
+            {**params, **output, "model": MODEL_ID, "poster_size": list(POSTER_SIZE)},
+            seed,
+            extension
+        )
+        if image_cache.contains(cache_key):
+            print(f"[Backend] Poster served from image cache")
+            return cache_key
+    
+    image_data = None
     try:
-        normalized_intent = await ai_engine.normalize_prompt(
+        image_data = await image_pool.submit({
+            "sd_prompt": sd_prompt,
+            "seed": seed if seed is not None else random_seed(),
+            **params,
+            **output,
+            **({"preview_every": preview_every} if on_progress and preview_every else {})
+        }, on_progress=on_progress)
+    except QueueFullError as e:
+        print(f"[Backend] {e}")
+    except asyncio.TimeoutError as e:
+        print(f"[Backend] Image generation timed out: {e}")
+    except Exception as e:
+        print(f"[Backend] Image generation error: {e}")
+    
+    # Fast fallback to PIL if local generation fails or takes too long
+    if not image_data:
+        print(f"[Backend] Local generation failed or not initialized, falling back to PIL")
+        print(f"[Backend] Debug: normalized_intent={normalized_intent[:50]}")
+        print(f"[Backend] Debug: background_description={background_description[:50] if background_description else 'None'}")
+        import traceback
+        traceback.print_exc()
+        img = Image.new('RGB', (1080, 1920), color='#f8fafc')
+        draw = ImageDraw.Draw(img)
+        
+        try:
+            font = ImageFont.load_default()
+        except:
+            font = None
+        
+        text = normalized_intent[:50] + "..." if len(normalized_intent) > 50 else normalized_intent
+        
+        x = 50
+        y = 200
+        
+        draw.rectangle([x - 20, y - 20, 1030, y + 150], fill='white', outline='#64748b', width=3)
+        draw.text((x, y), text, fill='#64748b', font=font)
+        
+        if background_description:
+            desc_text = background_description[:100] + "..." if len(background_description) > 100 else background_description
+            try:
+                desc_font = ImageFont.load_default()
+            except:
+                desc_font = None
+            
+            desc_x = 50
+            desc_y = y + 200
+            
+            draw.text((desc_x, desc_y), desc_text, fill='#94a3b8', font=desc_font)
+        
+        image_data = await asyncio.to_thread(encode_image, img, image_format, image_quality)
+        cache_key = None
+    
+    key = cache_key or ImageCache.content_key(image_data, extension)
+    await asyncio.to_thread(image_cache.set, key, image_data)
+    print(f"[Backend] Final poster image ready, size: {len(image_data)} bytes")
+    return key
+
+
+def image_url(key: str) -> str:
+    return f"/images/{key}"
+
+
+def to_asset_urls(recommended_assets: List[str]) -> List[str]:
+    asset_paths = []
+    for asset in recommended_assets:
+        clean_path = asset.replace("assets/", "").replace("asset-library/", "").lstrip("/").lstrip("\\")
+        asset_paths.append(f"/assets/{clean_path}")
+    return asset_paths
+
+
+def build_generate_pipeline(
+    request: GenerateRequest,
+    on_image_progress: Optional[Callable[[Dict[str, Any]], Any]] = None
+) -> StageRunner:
+    # normalize -> (toon | assets) -> background -> (compliance | image)
+    runner = StageRunner()
+    runner.add(
+        "normalized_intent",
+        lambda: ai_engine.normalize_prompt(
             prompt=request.prompt,
             format=request.format,
             channel=request.channel
         )
-        
-        toon = await ai_engine.generate_toon(
+    )
+    runner.add(
+        "toon",
+        lambda normalized_intent: ai_engine.generate_toon(
             normalized_intent=normalized_intent,
             format=request.format,
             channel=request.channel
-        )
-        
-        recommended_assets = await ai_engine.recommend_assets(
+        ),
+        depends_on=["normalized_intent"]
+    )
+    runner.add(
+        "assets",
+        lambda normalized_intent: ai_engine.recommend_assets(
             prompt=normalized_intent,
             asset_manager=asset_manager,
             max_assets=8
-        )
-        
-        background_description = await ai_engine.generate_background_description(
+        ),
+        depends_on=["normalized_intent"]
+    )
+    runner.add(
+        "background_description",
+        lambda normalized_intent, toon: ai_engine.generate_background_description(
             normalized_intent=normalized_intent,
             toon=toon
-        )
-        
-        compliance_summary = await compliance_engine.validate(
+        ),
+        depends_on=["normalized_intent", "toon"]
+    )
+    runner.add(
+        "compliance_summary",
+        lambda normalized_intent, toon, assets: compliance_engine.validate(
             prompt=normalized_intent,
             toon=toon,
-            assets=recommended_assets
-        )
-        
-        asset_paths = []
-        for asset in recommended_assets:
-            clean_path = asset.replace("assets/", "").replace("asset-library/", "").lstrip("/").lstrip("\\")
-            asset_paths.append(f"/assets/{clean_path}")
-        
-        print(f"[Backend] Returning {len(asset_paths)} assets immediately")
-        
-        # Generate image in background (non-blocking) - return assets immediately
-        img_base64 = None
-        try:
-            img_base64 = await local_gen.generate_image(normalized_intent, background_description or "", toon)
-        except Exception as e:
-            print(f"[Backend] Image generation error: {e}")
-        
-        # Fast fallback to PIL if local generation fails or takes too long
-        if not img_base64:
-            print(f"[Backend] Local generation failed or not initialized, falling back to PIL")
-            print(f"[Backend] Debug: normalized_intent={normalized_intent[:50]}")
-            print(f"[Backend] Debug: background_description={background_description[:50] if background_description else 'None'}")
-            import traceback
-            traceback.print_exc()
-            img = Image.new('RGB', (1080, 1920), color='#f8fafc')
-            draw = ImageDraw.Draw(img)
-            
-            try:
-                font = ImageFont.load_default()
-            except:
-                font = None
-            
-            text = normalized_intent[:50] + "..." if len(normalized_intent) > 50 else normalized_intent
-            
-            x = 50
-            y = 200
-            
-            draw.rectangle([x - 20, y - 20, 1030, y + 150], fill='white', outline='#64748b', width=3)
-            draw.text((x, y), text, fill='#64748b', font=font)
-            
-            if background_description:
-                desc_text = background_description[:100] + "..." if len(background_description) > 100 else background_description
-                try:
-                    desc_font = ImageFont.load_default()
-                except:
-                    desc_font = None
-                
-                desc_x = 50
-                desc_y = y + 200
-                
-                draw.text((desc_x, desc_y), desc_text, fill='#94a3b8', font=desc_font)
-            
-            buffer = BytesIO()
-            img.save(buffer, format='PNG')
-            img_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        
-        print(f"[Backend] Final poster image ready, size: {len(img_base64)} chars")
-        
-        return GenerateResponse(
-            assets=asset_paths,
-            toon=toon,
-            normalized_intent=normalized_intent,
-            compliance_summary=compliance_summary,
-            background_description=background_description,
-            image_base64=img_base64
-        )
+            assets=assets,
+            channel=request.channel
+        ),
+        depends_on=["normalized_intent", "toon", "assets"]
+    )
+    runner.add(
+        "image_key",
+        lambda normalized_intent, background_description, toon: render_poster(
+            normalized_intent,
+            background_description,
+            toon,
+            seed=request.seed,
+            deterministic=request.deterministic,
+            image_format=request.image_format,
+            image_quality=request.image_quality,
+            upscale=request.upscale,
+            preview_every=SD_PREVIEW_EVERY if request.preview_every is None else request.preview_every,
+            on_progress=on_image_progress
+        ),
+        depends_on=["normalized_intent", "background_description", "toon"]
+    )
+    return runner
+
+
+async def cancel_on_disconnect(http_request: Request, work, poll_interval: float = 0.5):
+    # Abandon the work (and free its image worker slot) once the client goes away
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                raise HTTPException(status_code=499, detail="Client disconnected")
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+async def to_generate_response(results: Dict[str, Any], include_image_base64: bool = False) -> GenerateResponse:
+    asset_paths = to_asset_urls(results["assets"])
+    print(f"[Backend] Returning {len(asset_paths)} assets")
+    
+    image_base64 = None
+    if include_image_base64:
+        image_data = await asyncio.to_thread(image_cache.get, results["image_key"])
+        image_base64 = base64.b64encode(image_data).decode('utf-8') if image_data else None
+    
+    return GenerateResponse(
+        assets=asset_paths,
+        toon=results["toon"],
+        normalized_intent=results["normalized_intent"],
+        compliance_summary=results["compliance_summary"],
+        background_description=results["background_description"],
+        image_url=image_url(results["image_key"]),
+        image_base64=image_base64
+    )
+
+
+@app.post("/generate", response_model=GenerateResponse)
+async def generate_creative(request: GenerateRequest, http_request: Request):
+    try:
+        # Identical concurrent requests (double clicks, shared prompts) share one run
+        results = await cancel_on_disconnect(http_request, generate_flight.do(
+            (request.prompt, request.format, request.channel, request.seed, request.deterministic,
+             request.image_format, request.image_quality, request.upscale),
+            lambda: build_generate_pipeline(request).run()
+        ))
+        return await to_generate_response(results, request.include_image_base64)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -476,6 +587,108 @@ async def generate_creative(request: GenerateRequest):
         )
 
 
+async def run_generate_job(job_id: str, request: GenerateRequest):
+    async def record_stage(name: str, result: Any):
+        if name == "assets":
+            result = to_asset_urls(result)
+        elif name == "image_key":
+            name, result = "image_url", image_url(result)
+        await job_store.add_event(job_id, "stage", {"stage": name, "result": result})
+    
+    async def record_image_progress(progress: Dict[str, Any]):
+        preview = base64.b64encode(progress["preview"]).decode('utf-8')
+        await job_store.add_event(job_id, "progress", {
+            "stage": "image_url",
+            "step": progress["step"],
+            "steps": progress["steps"],
+            "preview": f"data:image/webp;base64,{preview}"
+        }, latest_only=True)
+    
+    try:
+        await job_store.set_status(job_id, RUNNING)
+        await build_generate_pipeline(request, record_image_progress).run(on_stage_complete=record_stage)
+        await job_store.set_status(job_id, SUCCEEDED)
+    except asyncio.CancelledError:
+        await job_store.set_status(job_id, CANCELLED)
+    except Exception as e:
+        print(f"[Backend] Generate job {job_id} failed: {e}")
+        await job_store.set_status(job_id, FAILED, error=str(e))
+    finally:
+        job_tasks.pop(job_id, None)
+
+
+@app.post("/generate/jobs", status_code=202)
+async def submit_generate_job(request: GenerateRequest):
+    try:
+        job = await job_store.create("generate", request.model_dump())
+    except JobStoreFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    job_id = job["job_id"]
+    job_tasks[job_id] = asyncio.create_task(run_generate_job(job_id, request), name=f"job:{job_id}")
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "status_url": f"/generate/jobs/{job_id}",
+        "events_url": f"/generate/jobs/{job_id}/events"
+    }
+
+
+@app.get("/generate/jobs/{job_id}")
+async def get_generate_job(job_id: str):
+    job = await job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.delete("/generate/jobs/{job_id}")
+async def cancel_generate_job(job_id: str):
+    job = await job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    task = job_tasks.get(job_id)
+    if task is not None:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    return await job_store.get(job_id)
+
+
+@app.get("/generate/jobs/{job_id}/events")
+async def stream_generate_job(job_id: str, http_request: Request):
+    if await job_store.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    # EventSource resends the last id it saw when it reconnects
+    last_event_id = http_request.headers.get("last-event-id")
+    after = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+    
+    async def event_stream():
+        nonlocal after
+        while not await http_request.is_disconnected():
+            events = await job_store.wait_events(job_id, after, timeout=15)
+            if events is None:
+                return
+            if not events:
+                # Resumed past the last event of a job that already finished
+                job = await job_store.get(job_id)
+                if job is None or job["status"] in TERMINAL_STATUSES:
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            for event in events:
+                after = event["id"] + 1
+                yield f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+                if event["event"] == "status" and event["data"]["status"] in TERMINAL_STATUSES:
+                    return
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.post("/verify", response_model=VerifyResponse)
 async def verify_and_commit(request: VerifyRequest):
     try:
@@ -485,22 +698,25 @@ async def verify_and_commit(request: VerifyRequest):
         compliance_summary = await compliance_engine.generate_final_summary(
             canvas_state=request.canvas_state,
             toon=request.toon,
-            metadata=request.metadata
+            metadata=request.metadata,
+            channel=request.channel
         )
         
-        summary_json = json.dumps(compliance_summary, sort_keys=True)
-        hash_value = hashlib.sha256(summary_json.encode()).hexdigest()
+        hash_value = summary_hash(compliance_summary)
+        canvas_hash = canvas_state_hash(request.canvas_state)
         
         block_id = await blockchain.commit(
             hash_value=hash_value,
             compliance_summary=compliance_summary,
-            canvas_state=request.canvas_state
+            canvas_state=request.canvas_state,
+            canvas_hash=canvas_hash
         )
         
         verified = compliance_summary.get("compliant", False)
         
         return VerifyResponse(
             hash=hash_value,
+            canvas_hash=canvas_hash,
             block_id=block_id,
             compliance_summary=compliance_summary,
             verified=verified,
@@ -516,60 +732,160 @@ async def verify_and_commit(request: VerifyRequest):
         )
 
 
+@app.post("/verify/batch")
+async def verify_batch(request: VerifyBatchRequest, http_request: Request):
+    # Streams one NDJSON line per item as its check finishes (each carries
+    # the item's index and id), then a final line with the totals. Canvas
+    # results are committed to the ledger unless dry_run is set.
+    items = [item.model_dump() for item in request.items]
+    
+    async def result_stream():
+        started = time.perf_counter()
+        totals = {"total": len(items), "compliant": 0, "non_compliant": 0, "failed": 0, "committed": 0}
+        results = compliance_batch.run(items, request.channel)
+        try:
+            async for result in results:
+                if "error" in result:
+                    totals["failed"] += 1
+                else:
+                    totals["compliant" if result["compliant"] else "non_compliant"] += 1
+                    if result["kind"] == "canvas" and not request.dry_run:
+                        result["block_id"] = await blockchain.commit(
+                            hash_value=result["hash"],
+                            compliance_summary=result["compliance_summary"],
+                            canvas_state=items[result["index"]]["canvas_state"],
+                            canvas_hash=result["canvas_hash"]
+                        )
+                        totals["committed"] += 1
+                yield json.dumps(result) + "\n"
+                if await http_request.is_disconnected():
+                    return
+        finally:
+            await results.aclose()
+        elapsed = time.perf_counter() - started
+        print(f"[Backend] Batch verify: {totals} in {elapsed:.2f}s{' (dry run)' if request.dry_run else ''}")
+        yield json.dumps({"done": True, "dry_run": request.dry_run, "elapsed_ms": round(elapsed * 1000, 1), **totals}) + "\n"
+    
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+
+def require_asset_index():
+    # Never loads the index itself: the startup task and the reload watcher do
+    # that off the event loop, so requests during startup get a quick 503
+    if not asset_manager.loaded:
+        raise HTTPException(status_code=503, detail=readiness.components["asset_index"].error or "Asset index loading")
+
+
 @app.get("/assets/search")
 async def search_assets(q: str, limit: int = 10):
-    if not asset_manager.is_loaded():
-        raise HTTPException(status_code=503, detail="Asset index not loaded")
+    require_asset_index()
     
     results = asset_manager.search(q, limit=limit)
     return {"assets": results, "count": len(results)}
 
 
+@app.post("/assets/reload")
+async def reload_assets(force: bool = False):
+    try:
+        changes = await asyncio.to_thread(asset_manager.reload, force)
+    except Exception as e:
+        record_asset_index(e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Asset reload failed: {str(e)}"
+        )
+    record_asset_index()
+    
+    return {
+        "version": asset_manager.version,
+        "asset_count": asset_manager.get_asset_count(),
+        **changes
+    }
+
+
 @app.get("/asset-info")
 async def get_asset_info(path: str):
-    if not asset_manager.is_loaded():
-        raise HTTPException(status_code=503, detail="Asset index not loaded")
+    require_asset_index()
     
-    clean_path = path.replace("/assets/", "").replace("assets/", "").lstrip("/")
-    
-    for asset in asset_manager.get_all_assets():
-        asset_path = asset.local_path.replace("\\", "/").lstrip("/")
-        if asset_path == clean_path or asset_path.endswith(clean_path) or clean_path.endswith(asset_path):
-            return {
-                "description": asset.catalog_content,
-                "category": asset.category,
-                "sample_id": asset.sample_id
-            }
+    asset = asset_manager.get_asset_by_path(path)
+    if asset is not None:
+        return {
+            "description": asset.catalog_content,
+            "category": asset.category,
+            "sample_id": asset.sample_id
+        }
     
     return {"description": None, "category": None, "sample_id": None}
 
 
-@app.post("/remove-background", response_model=RemoveBackgroundResponse)
-async def remove_background(request: RemoveBackgroundRequest):
+@app.get("/images/{key}")
+async def get_image(key: str, http_request: Request):
+    if not ImageCache.is_valid_key(key):
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    # Keys are content hashes, so a stored image never changes
+    headers = {"Cache-Control": f"public, max-age={IMAGE_MAX_AGE}, immutable", "ETag": f'"{key}"'}
+    store = next((store for store in IMAGE_STORES if store.contains(key)), None)
+    if store is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    if http_request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    
+    path = store.path(key)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(path, media_type=EXTENSION_MEDIA_TYPES[path.suffix.lstrip(".")], headers=headers)
+
+
+async def store_cutout(image_data: bytes, image_format: str = "png", image_quality: int = DEFAULT_QUALITY) -> Tuple[str, bool, Dict[str, float]]:
+    # Returns the image store key of the cutout, whether it was cached, and the per-stage timings
+    key, cached, timings = await cutout_cache.cutout(image_data, image_format, image_quality)
+    if cached:
+        print(f"[Backend] Cutout served from cutout cache")
+    else:
+        print(f"[Backend] Background removal stages (ms): {timings}")
+    return key, cached, timings
+
+
+def resolve_asset_file(reference: str) -> Optional[Path]:
+    # Asset-library file for a sample id or an asset path/URL
+    asset = asset_manager.get_asset_by_id(reference) or asset_manager.get_asset_by_path(reference)
+    if asset is None:
+        return None
+    path = (ASSET_LIBRARY_DIR / asset_manager.normalize_path(asset.local_path)).resolve()
+    if not path.is_relative_to(ASSET_LIBRARY_DIR.resolve()) or not path.is_file():
+        return None
+    return path
+
+
+def require_background_removal():
     if not REMBG_AVAILABLE:
         raise HTTPException(
             status_code=503,
             detail="Background removal service not available. Please install rembg: pip install rembg"
         )
+
+
+@app.post("/remove-background", response_model=RemoveBackgroundResponse)
+async def remove_background(request: RemoveBackgroundRequest):
+    require_background_removal()
     
     try:
         image_data = base64.b64decode(request.image_base64)
-        input_image = Image.open(BytesIO(image_data))
-        
-        print(f"[Backend] Removing background from image: {input_image.size}")
-        
-        output_bytes = remove(image_data)
-        output_image = Image.open(BytesIO(output_bytes))
+        print(f"[Backend] Removing background from image: {len(image_data)} bytes")
         
-        buffer = BytesIO()
-        output_image.save(buffer, format='PNG')
-        output_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+        key, cached, timings = await store_cutout(image_data)
+        output_data = await asyncio.to_thread(cutout_cache.store.get, key)
+        output_base64 = base64.b64encode(output_data).decode('utf-8')
         
         print(f"[Backend] Background removed successfully")
         
         return RemoveBackgroundResponse(
             image_base64=output_base64,
-            success=True
+            success=True,
+            image_url=image_url(key),
+            cached=cached,
+            timings_ms=timings
         )
         
     except Exception as e:
@@ -580,6 +896,63 @@ async def remove_background(request: RemoveBackgroundRequest):
         )
 
 
+@app.post("/remove-background/upload", response_model=RemoveBackgroundUploadResponse)
+async def remove_background_upload(
+    file: UploadFile = File(..., description="Image to remove the background from"),
+    image_format: Literal["png", "webp"] = Form("png"),
+    image_quality: int = Form(DEFAULT_QUALITY, ge=1, le=100)
+):
+    # Binary counterpart of /remove-background: multipart in, URL out
+    require_background_removal()
+    
+    try:
+        image_data = await file.read()
+        print(f"[Backend] Removing background from upload {file.filename}: {len(image_data)} bytes")
+        
+        key, cached, timings = await store_cutout(image_data, image_format, image_quality)
+        
+        print(f"[Backend] Background removed successfully")
+        
+        return RemoveBackgroundUploadResponse(
+            image_url=image_url(key),
+            content_type=MEDIA_TYPES[image_format],
+            success=True,
+            cached=cached,
+            timings_ms=timings
+        )
+        
+    except Exception as e:
+        print(f"[Backend] Background removal error: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Background removal failed: {str(e)}"
+        )
+
+
+@app.post("/remove-background/batch", response_model=RemoveBackgroundBatchResponse)
+async def remove_background_batch(request: RemoveBackgroundBatchRequest):
+    # Cuts out asset-library images in parallel across the removal workers
+    require_background_removal()
+    require_asset_index()
+    
+    async def process(reference: str) -> RemoveBackgroundBatchItem:
+        path = resolve_asset_file(reference)
+        if path is None:
+            return RemoveBackgroundBatchItem(asset=reference, error="Asset not found")
+        try:
+            image_data = await asyncio.to_thread(path.read_bytes)
+            key, cached, timings = await store_cutout(image_data, request.image_format, request.image_quality)
+        except Exception as e:
+            print(f"[Backend] Background removal error for {reference}: {e}")
+            return RemoveBackgroundBatchItem(asset=reference, error=str(e))
+        return RemoveBackgroundBatchItem(asset=reference, image_url=image_url(key), cached=cached, timings_ms=timings)
+    
+    results = await asyncio.gather(*(process(reference) for reference in request.assets))
+    failed = sum(1 for result in results if result.error)
+    print(f"[Backend] Batch background removal: {len(results) - failed}/{len(results)} succeeded")
+    return RemoveBackgroundBatchResponse(results=results, succeeded=len(results) - failed, failed=failed)
+
+
 @app.post("/asset-position", response_model=AssetPositionResponse)
 async def get_asset_position(request: AssetPositionRequest):
     try:
@@ -607,6 +980,12 @@ async def get_asset_position(request: AssetPositionRequest):
         )
 
 
+# Mounted after every route: Starlette matches in registration order, and the
+# mount would otherwise swallow /assets/search and /assets/reload
+if ASSET_LIBRARY_DIR.exists():
+    app.mount("/assets", StaticFiles(directory=str(ASSET_LIBRARY_DIR)), name="assets")
+
+
 if __name__ == "__main__":
     import uvicorn
     print("Starting backend on http://localhost:8000")
@@ -0,0 +1,73 @@
+"""Precompute background-removal cutouts for the whole asset library.
+
+Usage: python precompute_cutouts.py [--format png|webp] [--quality N] [--category NAME] [--limit N]
+
+Fills the cutout cache (CUTOUT_CACHE_DIR) with the same keys the API
+uses, so /remove-background requests for catalog photos are served
+from disk instead of running segmentation. Uses REMBG_WORKERS worker
+processes; assets already cached are skipped, so the run can be
+interrupted and resumed.
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from app.services.image_encoding import DEFAULT_QUALITY
+
+from main import ASSET_LIBRARY_DIR, asset_manager, background_removal_pool, cutout_cache, REMBG_AVAILABLE
+
+
+async def precompute(image_format: str, quality: int, category: str, limit: int) -> int:
+    if not asset_manager.is_loaded():
+        print("[Precompute] Asset index could not be loaded")
+        return 1
+    assets = asset_manager.get_assets_by_category(category) if category else asset_manager.get_all_assets()
+    paths = [ASSET_LIBRARY_DIR / asset_manager.normalize_path(asset.local_path) for asset in assets]
+    paths = [path for path in paths if path.is_file()][:limit or None]
+    print(f"[Precompute] {len(paths)} asset images, {background_removal_pool.worker_count} worker(s)")
+
+    counts = {"computed": 0, "cached": 0, "failed": 0}
+    started = time.perf_counter()
+    # Keep every worker busy without reading the whole library into memory
+    semaphore = asyncio.Semaphore(background_removal_pool.worker_count * 2)
+
+    async def process(path):
+        async with semaphore:
+            try:
+                image_data = await asyncio.to_thread(path.read_bytes)
+                _, cached, _ = await cutout_cache.cutout(image_data, image_format, quality)
+            except Exception as e:
+                counts["failed"] += 1
+                print(f"[Precompute] {path.relative_to(ASSET_LIBRARY_DIR)} failed: {e}")
+                return
+            counts["cached" if cached else "computed"] += 1
+            done = sum(counts.values())
+            if done % 50 == 0 or done == len(paths):
+                print(f"[Precompute] {done}/{len(paths)} ({time.perf_counter() - started:.0f}s)")
+
+    try:
+        await asyncio.gather(*(process(path) for path in paths))
+    finally:
+        background_removal_pool.shutdown()
+    print(f"[Precompute] Done in {time.perf_counter() - started:.1f}s: {counts}")
+    print(f"[Precompute] Cutout cache: {cutout_cache.store.stats()}")
+    return 1 if counts["failed"] else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Precompute background-removal cutouts for the asset library")
+    parser.add_argument("--format", choices=("png", "webp"), default="png", help="Cutout encoding (the API default is png)")
+    parser.add_argument("--quality", type=int, default=DEFAULT_QUALITY, help="WebP quality")
+    parser.add_argument("--category", help="Only assets of this category")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after this many assets")
+    args = parser.parse_args()
+
+    if not REMBG_AVAILABLE:
+        print("[Precompute] rembg is not installed: pip install rembg")
+        return 1
+    return asyncio.run(precompute(args.format, args.quality, args.category, args.limit))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import csv
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.services.asset_manager import AssetManager
+
+FIELDNAMES = ["sample_id", "catalog_content", "category", "price", "image_link", "local_path"]
+
+
+def write_index(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        for sample_id, content in rows:
+            writer.writerow({
+                "sample_id": sample_id,
+                "catalog_content": content,
+                "category": "snacks",
+                "price": "1.0",
+                "image_link": "",
+                "local_path": f"snacks/{sample_id}.jpg"
+            })
+
+
+@pytest.fixture
+def index_manager(tmp_path, monkeypatch):
+    csv_path = tmp_path / "asset-index.csv"
+    write_index(csv_path, [("a", "salted crackers"), ("b", "cheddar puffs"), ("c", "rice cakes")])
+    manager = AssetManager(csv_path, tmp_path / "asset-library")
+    monkeypatch.setattr(main, "asset_manager", manager)
+    return csv_path, manager
+
+
+def test_reload_route_is_not_shadowed_by_static_mount(index_manager):
+    csv_path, manager = index_manager
+    client = TestClient(main.app)
+
+    response = client.post("/assets/reload")
+    assert response.status_code == 200
+    assert response.json()["added"] == 3
+
+    write_index(csv_path, [("a", "salted crackers"), ("b", "cheddar puffs, family size"), ("d", "pretzel twists")])
+    response = client.post("/assets/reload", params={"force": True})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["added"], body["updated"], body["removed"]) == (1, 1, 1)
+    assert body["asset_count"] == 3
+    assert body["version"] == manager.version
+
+
+def test_search_route_is_not_shadowed_by_static_mount(index_manager):
+    _, manager = index_manager
+    manager.load()
+    response = TestClient(main.app).get("/assets/search", params={"q": "cheddar"})
+    assert response.status_code == 200
+    assert response.json()["assets"][0] == "snacks/b.jpg"
+
+
+def test_status_routes_do_not_load_the_index(index_manager):
+    _, manager = index_manager
+    client = TestClient(main.app)
+
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert (response.json()["assets_loaded"], response.json()["asset_count"]) == (False, 0)
+    for path, params in (("/assets/search", {"q": "cheddar"}), ("/asset-info", {"path": "snacks/b.jpg"})):
+        response = client.get(path, params=params)
+        assert response.status_code == 503
+        assert response.json()["detail"] == "Asset index loading"
+    assert not manager.loaded
+    assert manager.version == 0
+
+
+def test_concurrent_loads_build_the_index_once(index_manager):
+    _, manager = index_manager
+    threads = [threading.Thread(target=manager.load) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert manager.loaded
+    assert manager.version == 1
+
+
+@pytest.mark.parametrize("before, after", [
+    ([("a", "salted crackers"), ("b", "cheddar puffs"), ("c", "rice cakes")],
+     [("a", "salted crackers"), ("b", "cheddar puffs"), ("b", "pretzel twists"), ("c", "rice cakes")]),
+    ([("a", "salted crackers"), ("b", "cheddar puffs"), ("b", "pretzel twists")],
+     [("a", "salted crackers"), ("b", "cheddar puffs, family size"), ("c", "rice cakes")]),
+])
+def test_reload_with_repeated_sample_ids_keeps_search_consistent(tmp_path, before, after):
+    csv_path = tmp_path / "asset-index.csv"
+    write_index(csv_path, before)
+    manager = AssetManager(csv_path, tmp_path / "asset-library")
+    manager.load()
+
+    write_index(csv_path, after)
+    manager.reload(force=True)
+    for _, content in after:
+        for word in content.replace(",", "").split():
+            results = manager.search(word, limit=10)
+            assert "" not in results
+    assert manager.search("cheddar", limit=1) == ["snacks/b.jpg"]
+    assert manager.search("crackers", limit=1) == ["snacks/a.jpg"]
@@ -0,0 +1,74 @@
+import numpy as np
+
+from app.services import asset_retriever
+from app.services.asset_catalog import AssetCatalog
+from app.services.asset_retriever import AssetRetriever
+
+ROWS = [
+    ("1", "Cold pressed organic apple juice", "applejuice", 3.0, "", "applejuice/1.jpg"),
+    ("2", "Whole grain breakfast cereal with oats", "cereal", 4.0, "", "cereal/2.jpg"),
+    ("3", "Sparkling mineral water", "water", 1.0, "", "water/3.jpg"),
+    ("4", "Crunchy peanut butter", "spreads", 5.0, "", "spreads/4.jpg"),
+    ("5", "Honey oat granola clusters", "cereal", 4.5, "", "cereal/5.jpg"),
+]
+
+
+def dense_scores(retriever, query):
+    # Reference: rebuild the dense TF-IDF matrix from the sparse postings
+    (segment,) = retriever.segments
+    matrix = np.zeros((retriever.row_count, retriever.n_features), dtype=np.float32)
+    for feature in range(retriever.n_features):
+        start, end = segment.indptr[feature], segment.indptr[feature + 1]
+        matrix[segment.doc_slots[start:end], feature] = segment.weights[start:end]
+    rows, cols, counts = retriever._counts([query])
+    vector = np.zeros(retriever.n_features, dtype=np.float32)
+    vector[cols] = retriever._weight(rows, cols, counts, 1)
+    return matrix @ vector
+
+
+def test_shortlist_ranks_matching_assets_first():
+    retriever = AssetRetriever().fit(AssetCatalog.from_rows(ROWS), version=1)
+    assert [asset.sample_id for asset in retriever.shortlist("oat breakfast cereal", 2)] == ["2", "5"]
+    assert retriever.shortlist("apple juice", 1)[0].sample_id == "1"
+
+
+def test_chunked_fit_matches_single_chunk(monkeypatch):
+    catalog = AssetCatalog.from_rows(ROWS)
+    whole = AssetRetriever().fit(catalog)
+    monkeypatch.setattr(asset_retriever, "FIT_CHUNK_ROWS", 2)
+    chunked = AssetRetriever().fit(catalog)
+    assert np.array_equal(whole.segments[0].indptr, chunked.segments[0].indptr)
+    assert np.array_equal(whole.segments[0].doc_slots, chunked.segments[0].doc_slots)
+    assert np.allclose(whole.segments[0].weights, chunked.segments[0].weights)
+    for query in ("granola", "peanut butter", "water"):
+        assert np.allclose(dense_scores(chunked, query), dense_scores(whole, query))
+        assert chunked.top_k(query, 3) == whole.top_k(query, 3)
+
+
+def test_empty_catalog():
+    retriever = AssetRetriever().fit(AssetCatalog.from_rows([]))
+    assert retriever.top_k("anything", 5) == []
+
+
+def test_update_keeps_the_fit_and_indexes_changed_rows(monkeypatch):
+    old = AssetRetriever().fit(AssetCatalog.from_rows(ROWS), version=1)
+    # Row 2 (water) changes product and a row is added; the rest are unchanged
+    rows = ROWS[:2] + [("3", "Smooth almond butter", "spreads", 6.0, "", "spreads/3.jpg")] + ROWS[3:]
+    rows = rows + [("6", "Sparkling lemon water", "water", 1.5, "", "water/6.jpg")]
+    catalog = AssetCatalog.from_rows(rows)
+    monkeypatch.setattr(asset_retriever, "REFIT_STALE_RATIO", 1.0)
+    updated = old.updated(catalog, 2, [0, 1, -1, 3, 4], [2, 5])
+
+    assert len(updated.segments) == 2
+    assert updated.segments[0].indptr is old.segments[0].indptr
+    assert updated.stale_rows == 3
+    assert [asset.sample_id for asset in updated.shortlist("sparkling water", 1)] == ["6"]
+    assert {asset.sample_id for asset in updated.shortlist("butter", 2)} == {"3", "4"}
+    assert [asset.sample_id for asset in updated.shortlist("oat breakfast cereal", 2)] == ["2", "5"]
+    assert old.shortlist("sparkling water", 1)[0].sample_id == "3"
+
+    monkeypatch.setattr(asset_retriever, "REFIT_STALE_RATIO", 0.1)
+    refit = old.updated(catalog, 2, [0, 1, -1, 3, 4], [2, 5])
+    assert len(refit.segments) == 1
+    assert refit.stale_rows == 0
+    assert refit.top_k("sparkling water", 1) == updated.top_k("sparkling water", 1)
@@ -0,0 +1,56 @@
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.services.background_removal import BackgroundRemovalPool
+
+
+def crash_once(marker: str) -> int:
+    # Kills its worker the first time, like an OOM kill mid-cutout
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return os.getpid()
+
+
+def run(scenario, **options):
+    async def main():
+        pool = BackgroundRemovalPool(**options)
+        try:
+            return await scenario(pool)
+        finally:
+            pool.shutdown()
+
+    return asyncio.run(main())
+
+
+def test_wait_ready_starts_every_worker():
+    async def scenario(pool):
+        return await pool.wait_ready()
+
+    reports = run(scenario, workers=2)
+    assert len({report["pid"] for report in reports}) == 2
+
+
+def test_broken_pool_is_replaced_and_the_call_retried(tmp_path):
+    async def scenario(pool):
+        pid = await pool._run(crash_once, str(tmp_path / "crashed"))
+        later = await pool._run(os.getpid)
+        return pid, later, pool.stats()
+
+    pid, later, stats = run(scenario)
+    assert pid == later
+    assert stats["restarted"] == 1
+
+
+def test_a_call_that_breaks_the_pool_twice_fails():
+    async def scenario(pool):
+        with pytest.raises(BrokenProcessPool):
+            await pool._run(os._exit, 1)
+        return await pool._run(os.getpid), pool.stats()
+
+    pid, stats = run(scenario)
+    assert pid != os.getpid()
+    assert stats["restarted"] == 2
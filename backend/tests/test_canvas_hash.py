@@ -0,0 +1,23 @@
+import asyncio
+
+from app.services.blockchain import BlockchainLedger
+from app.services.canvas_hash import canvas_state_hash
+
+
+def test_ledger_records_the_same_canvas_hash_verify_returns():
+    canvas = {"width": 1080, "elements": [{"id": "text-1", "type": "text", "text": "Fresh granola", "x": 40}]}
+    reordered = {"elements": [{"x": 40, "text": "Fresh granola", "type": "text", "id": "text-1"}], "width": 1080}
+    assert canvas_state_hash(canvas) == canvas_state_hash(reordered)
+
+    ledger = BlockchainLedger()
+    summary = {"compliant": True}
+    asyncio.run(ledger.commit("a" * 64, summary, canvas))
+    asyncio.run(ledger.commit("b" * 64, summary, canvas, canvas_hash=canvas_state_hash(canvas)))
+    assert [block["canvas_state_hash"] for block in ledger.ledger] == [canvas_state_hash(canvas)] * 2
+
+
+def test_editing_an_element_changes_the_canvas_hash():
+    canvas = {"elements": [{"id": "text-1", "type": "text", "text": "Fresh granola"}]}
+    before = canvas_state_hash(canvas)
+    canvas["elements"][0]["text"] = "Fresh granola clusters"
+    assert canvas_state_hash(canvas) != before
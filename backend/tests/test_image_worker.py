@@ -0,0 +1,111 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.services import image_worker
+from app.services.image_worker import ImageWorkerPool
+
+
+def fake_worker_main(index, job_queue, result_queue, cancel_flags, num_threads, warmup):
+    # Stands in for the diffusers worker. A job renders for its "seconds"; one
+    # whose "crash_marker" file does not exist yet creates it and kills the
+    # process mid-render.
+    result_queue.put(("ready", index, None, {"loaded": True, "load_seconds": 0.0}))
+    while True:
+        message = job_queue.get()
+        if message is None:
+            break
+        batch_id, items = message
+        result_queue.put(("started", index, batch_id, None))
+        for item in items:
+            time.sleep(item.get("seconds", 0))
+            marker = item.get("crash_marker")
+            if marker and not os.path.exists(marker):
+                open(marker, "w").close()
+                os._exit(1)
+        result_queue.put(("done", index, batch_id, [f"{item['prompt']}@{os.getpid()}" for item in items]))
+
+
+def run(scenario, monkeypatch, **options):
+    monkeypatch.setattr(image_worker, "_worker_main", fake_worker_main)
+
+    async def main():
+        options.setdefault("job_timeout", 20)
+        pool = ImageWorkerPool(workers=1, **options)
+        pool.start()
+        try:
+            await pool.wait_ready(timeout=20)
+            return await scenario(pool)
+        finally:
+            pool.shutdown()
+
+    return asyncio.run(main())
+
+
+def test_worker_that_died_while_idle_is_replaced_on_dispatch(monkeypatch):
+    worker_states = []
+
+    async def scenario(pool):
+        dead = pool._workers[0].process
+        dead.kill()
+        dead.join()
+        result = await pool.submit({"prompt": "juice"}, timeout=20)
+        return dead.pid, result, pool.stats()
+
+    dead_pid, result, stats = run(scenario, monkeypatch, check_interval=0,
+                                  on_workers_changed=lambda reports: worker_states.append([bool(report) for report in reports]))
+    prompt, pid = result.split("@")
+    assert prompt == "juice"
+    assert int(pid) != dead_pid
+    assert stats["restarted"] == 1
+    # Started, loaded, respawned (loading again), loaded
+    assert worker_states == [[False], [True], [False], [True]]
+
+
+def test_jobs_of_a_worker_that_died_mid_render_are_requeued(monkeypatch, tmp_path):
+    async def scenario(pool):
+        result = await pool.submit({"prompt": "cereal", "crash_marker": str(tmp_path / "crashed")}, timeout=20)
+        return result, pool.stats()
+
+    result, stats = run(scenario, monkeypatch, check_interval=0.2)
+    assert result.startswith("cereal@")
+    assert (tmp_path / "crashed").exists()
+    assert stats["restarted"] == 1
+    assert stats["timed_out"] == 0
+
+
+def test_render_timeout_does_not_count_time_spent_queued(monkeypatch):
+    async def scenario(pool):
+        results = await asyncio.gather(*(pool.submit({"prompt": f"bar-{i}", "seconds": 0.6}) for i in range(3)))
+        return results, pool.stats()
+
+    results, stats = run(scenario, monkeypatch, check_interval=0, job_timeout=1.0)
+    assert [result.split("@")[0] for result in results] == ["bar-0", "bar-1", "bar-2"]
+    assert (stats["timed_out"], stats["restarted"], stats["ready_workers"]) == (0, 0, 1)
+
+
+def test_render_past_the_timeout_restarts_its_worker(monkeypatch):
+    async def scenario(pool):
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.submit({"prompt": "stuck", "seconds": 30})
+        result = await pool.submit({"prompt": "next"}, timeout=20)
+        return result, pool.stats()
+
+    result, stats = run(scenario, monkeypatch, check_interval=0, job_timeout=0.5)
+    assert result.startswith("next@")
+    assert (stats["timed_out"], stats["restarted"]) == (1, 1)
+
+
+def test_queue_timeout_only_drops_the_pending_job(monkeypatch):
+    async def scenario(pool):
+        running = asyncio.ensure_future(pool.submit({"prompt": "slow", "seconds": 1.0}))
+        await asyncio.sleep(0.1)
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.submit({"prompt": "queued"}, timeout=0.3)
+        return await running, pool.stats()
+
+    result, stats = run(scenario, monkeypatch, check_interval=0)
+    assert result.startswith("slow@")
+    assert (stats["timed_out"], stats["restarted"], stats["queued"]) == (1, 0, 0)
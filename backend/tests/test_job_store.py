@@ -0,0 +1,27 @@
+import asyncio
+
+from app.services.job_store import InMemoryJobStore, RUNNING, SUCCEEDED
+
+
+def test_latest_only_events_keep_one_preview_per_job():
+    async def scenario():
+        store = InMemoryJobStore()
+        job = await store.create("generate", {})
+        job_id = job["job_id"]
+        await store.set_status(job_id, RUNNING)
+        for step in range(1, 21):
+            await store.add_event(job_id, "progress", {"step": step}, latest_only=True)
+            if step == 10:
+                await store.add_event(job_id, "stage", {"stage": "copy", "result": "text"})
+        await store.set_status(job_id, SUCCEEDED)
+        return store, job_id
+
+    store, job_id = asyncio.run(scenario())
+    replay = asyncio.run(store.wait_events(job_id, 0, timeout=0))
+    assert [(event["event"], event["data"].get("step")) for event in replay] == [
+        ("status", None), ("stage", None), ("progress", 20), ("status", None)
+    ]
+    # Ids keep counting replaced events, so a resumed stream skips ahead
+    assert [event["id"] for event in replay] == [0, 11, 21, 22]
+    assert [event["id"] for event in asyncio.run(store.wait_events(job_id, 12, timeout=0))] == [21, 22]
+    assert asyncio.run(store.get(job_id))["event_count"] == 23
@@ -0,0 +1,20 @@
+import asyncio
+
+from app.services.llm_cache import LLMCache
+
+
+def test_disk_tier_round_trip(tmp_path):
+    async def scenario():
+        writer = LLMCache(disk_dir=tmp_path)
+        key = LLMCache.make_key("normalize_prompt", "model", "system", {"prompt": "fresh juice"})
+        assert await writer.get("normalize_prompt", key) is None
+        await writer.set("normalize_prompt", key, {"intent": "fresh juice"})
+
+        # A fresh instance has an empty memory tier and reads the file
+        reader = LLMCache(disk_dir=tmp_path)
+        assert await reader.get("normalize_prompt", key) == {"intent": "fresh juice"}
+        assert reader.stats()["stages"]["normalize_prompt"]["disk_hits"] == 1
+        assert await reader.get("normalize_prompt", key) == {"intent": "fresh juice"}
+        assert reader.stats()["stages"]["normalize_prompt"]["hits"] == 1
+
+    asyncio.run(scenario())
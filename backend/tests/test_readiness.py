@@ -0,0 +1,32 @@
+from app.services.readiness import COLD, LOADING, READY, Readiness
+
+
+def test_cold_components_count_as_ready():
+    readiness = Readiness("stable_diffusion", "rembg")
+    readiness.ready("stable_diffusion", duration=2.0)
+    readiness.cold("rembg", "Loaded on first use")
+    assert readiness.is_ready()
+    assert readiness.to_dict()["components"]["rembg"]["state"] == COLD
+
+
+def test_component_can_go_back_to_loading():
+    readiness = Readiness("stable_diffusion")
+    readiness.ready("stable_diffusion", duration=2.0, ready_workers=1)
+    readiness.loading("stable_diffusion", ready_workers=0)
+    component = readiness.components["stable_diffusion"]
+    assert not readiness.is_ready()
+    assert (component.state, component.duration, component.details) == (LOADING, 2.0, {"ready_workers": 0})
+
+    readiness.ready("stable_diffusion", ready_workers=1)
+    assert component.state == READY
+    assert component.duration < 2.0
+
+
+def test_ready_without_a_load_keeps_the_last_duration():
+    # A reload updates the details of a component that never left ready
+    readiness = Readiness("asset_index")
+    readiness.ready("asset_index", duration=1.5, version=1)
+    readiness.ready("asset_index", version=2)
+    assert readiness.to_dict()["components"]["asset_index"] == {
+        "state": READY, "duration_seconds": 1.5, "error": None, "version": 2
+    }
@@ -0,0 +1,62 @@
+import pytest
+
+from app.services.compliance_engine import ComplianceEngine
+from app.services.rule_matcher import RuleMatcher
+from app.services.rule_packs import FORBIDDEN_WORD, RESTRICTED_BRAND
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return ComplianceEngine()
+
+
+@pytest.mark.parametrize("text, channel", [
+    ("organic apple juice", None),
+    ("Fresh pressed apple juice, no added sugar", None),
+    ("Apple cinnamon granola, baked in small batches", None),
+    ("Crunchy oat clusters. Apple slices on top", None),
+    ("target your morning routine with oat clusters", "walmart"),
+    ("Target your morning routine with oat clusters", "walmart"),
+    ("amazon rainforest blend coffee", "walmart"),
+    ("flavor: apple cinnamon, target audience: families", "amazon"),
+])
+def test_ambiguous_brands_used_as_ordinary_words_pass(engine, text, channel):
+    result = engine.check_text_compliance(text, channel)
+    assert result["compliant"], result["violations"]
+
+
+@pytest.mark.parametrize("text, channel, brand", [
+    ("nike running shoes", None, "nike"),
+    ("samsung galaxy case", None, "samsung"),
+    ("Runs in ADIDAS trainers", None, "adidas"),
+    ("big savings for your walmart weekly shop", "target", "walmart"),
+    ("Now pairs with your Apple Watch", None, "apple"),
+    ("Apple Watch bands in every color", None, "apple"),
+    ("Also at Target stores", "walmart", "target"),
+    ("Ships with Amazon Prime", "target", "amazon"),
+])
+def test_brand_names_are_restricted(engine, text, channel, brand):
+    result = engine.check_text_compliance(text, channel)
+    assert result["violations"] == [f"Restricted brand: '{brand}'"]
+
+
+def test_proper_noun_phrases_are_reported_in_text_order():
+    matcher = RuleMatcher({FORBIDDEN_WORD: ["buy now"]}, proper_nouns={RESTRICTED_BRAND: ["apple"]})
+    matches = matcher.find_all("BUY NOW: fresh Apple slices, apple pie")
+    assert [(match.rule, match.kind, match.start) for match in matches] == [
+        ("buy now", FORBIDDEN_WORD, 0),
+        ("apple", RESTRICTED_BRAND, 15),
+    ]
+    assert matcher.rule_count == 2
+
+
+@pytest.mark.parametrize("channel, toon, metadata, expected", [
+    ("amazon", {"channel": "walmart"}, {"channel": "target"}, "amazon"),
+    (None, {"channel": "walmart"}, {"channel": "target"}, "walmart"),
+    (None, {}, {"channel": "target"}, "target"),
+    (None, None, None, "default"),
+])
+def test_canvas_channel_prefers_explicit_then_toon_then_metadata(engine, channel, toon, metadata, expected):
+    canvas = {"elements": [{"type": "text", "text": "Fresh granola"}]}
+    summary = engine.summarize_canvas(canvas, toon, metadata, channel)
+    assert summary["ruleset"]["channel"] == expected
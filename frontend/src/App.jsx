@@ -1,72 +1,103 @@
-import { useState } from 'react'
+import { useRef, useState } from 'react'
 import { motion } from 'framer-motion'
 import CommandCenter from './components/CommandCenter/CommandCenter'
 import Canvas from './components/Canvas/Canvas'
 import AssetLibrary from './components/AssetLibrary/AssetLibrary'
-import { generateCreative, verifyAndCommit, getAssetUrl } from './utils/api'
+import { generateCreativeStreaming, cancelGenerateJob, verifyAndCommit, getAssetUrl, getImageUrl } from './utils/api'
 
 function Studio() {
   const [isGenerating, setIsGenerating] = useState(false)
   const [generationStage, setGenerationStage] = useState(null)
-  const [imageBase64, setImageBase64] = useState(null)
+  const [imageUrl, setImageUrl] = useState(null)
   const [metadata, setMetadata] = useState(null)
   const [canvasState, setCanvasState] = useState(null)
   const [selectedAsset, setSelectedAsset] = useState(null)
   const [assets, setAssets] = useState([])
   const [verificationResult, setVerificationResult] = useState(null)
+  const activeJobRef = useRef(null)
 
   const handleGenerate = async (prompt) => {
     setIsGenerating(true)
     setGenerationStage('generating')
-    setImageBase64(null)
+    setImageUrl(null)
     setMetadata(null)
     setCanvasState(null)
     setAssets([])
 
     try {
       setGenerationStage('generating')
-      const generateResponse = await generateCreative(prompt)
+      // Stages arrive as they finish, so assets land on the canvas before the poster image
+      const generateResponse = await generateCreativeStreaming(prompt, {
+        onJob: (job) => {
+          activeJobRef.current = job.job_id
+        },
+        // Latent previews stand in for the poster until the final image lands
+        onProgress: ({ step, steps, preview }) => {
+          console.log(`[App] Preview at step ${step}/${steps}`)
+          setImageUrl(preview)
+        },
+        onStage: (stage, result) => {
+          console.log('[App] Stage complete:', stage)
+
+          if (stage === 'assets' && Array.isArray(result)) {
+            console.log('[App] Backend returned assets:', result)
+            const assetUrls = result.map(assetPath => {
+              const fullUrl = getAssetUrl(assetPath)
+              console.log('[App] Mapped asset:', assetPath, '→', fullUrl)
+              return { url: fullUrl }
+            })
+            setAssets(assetUrls)
+          }
+
+          if (stage === 'image_url' && result) {
+            console.log('[App] Setting poster image:', result)
+            setImageUrl(getImageUrl(result))
+          }
+
+          if (['toon', 'normalized_intent', 'background_description', 'compliance_summary'].includes(stage)) {
+            setMetadata(prev => ({ ...(prev || {}), [stage]: result }))
+          }
+        }
+      })
       
       console.log('[App] Generate response:', generateResponse)
       
-      if (generateResponse.image_base64) {
-        console.log('[App] Setting poster image, base64 length:', generateResponse.image_base64.length)
-        const imageDataUrl = `data:image/png;base64,${generateResponse.image_base64}`
-        console.log('[App] Image data URL:', imageDataUrl.substring(0, 50) + '...')
-        setImageBase64(imageDataUrl)
-      } else {
-        console.warn('[App] No image_base64 in response')
+      if (!generateResponse.image_url) {
+        console.warn('[App] No image_url in response')
       }
-      
-      if (generateResponse.assets && Array.isArray(generateResponse.assets)) {
-        console.log('[App] Backend returned assets:', generateResponse.assets)
-        const assetUrls = generateResponse.assets.map(assetPath => {
-          const fullUrl = getAssetUrl(assetPath)
-          console.log('[App] Mapped asset:', assetPath, '→', fullUrl)
-          return { url: fullUrl }
-        })
-        console.log('[App] Final asset URLs:', assetUrls)
-        setAssets(assetUrls)
-        setGenerationStage('complete')
-      } else {
+      if (!Array.isArray(generateResponse.assets)) {
         console.warn('[App] No assets returned from backend:', generateResponse)
-        setAssets([])
-      }
-      
-      if (generateResponse.toon) {
-        setMetadata(generateResponse)
       }
+      setGenerationStage('complete')
       
       setGenerationStage(null)
     } catch (error) {
-      console.error('Generation error:', error)
-      alert(`Generation failed: ${error.message}`)
+      if (error.message === 'Generation cancelled') {
+        setImageUrl(null)
+      } else {
+        console.error('Generation error:', error)
+        alert(`Generation failed: ${error.message}`)
+      }
       setGenerationStage(null)
     } finally {
+      activeJobRef.current = null
       setIsGenerating(false)
     }
   }
 
+  const handleCancelGenerate = async () => {
+    const jobId = activeJobRef.current
+    if (!jobId) {
+      return
+    }
+    try {
+      // The backend stops the render mid-denoise, freeing the worker for the next request
+      await cancelGenerateJob(jobId)
+    } catch (error) {
+      console.error('Cancel error:', error)
+    }
+  }
+
   const handleVerify = async () => {
     if (!canvasState) {
       alert('No canvas state to verify. Please create a creative first.')
@@ -109,6 +140,7 @@ function Studio() {
         >
           <CommandCenter
             onGenerate={handleGenerate}
+            onCancel={handleCancelGenerate}
             isGenerating={isGenerating}
             generationStage={generationStage}
             onVerify={handleVerify}
@@ -124,7 +156,7 @@ function Studio() {
           className="flex-1 bg-white/80 backdrop-blur-xl border border-slate-200/60 rounded-xl overflow-hidden shadow-lg"
         >
           <Canvas
-            imageBase64={imageBase64}
+            imageUrl={imageUrl}
             onCanvasStateChange={setCanvasState}
             selectedAsset={selectedAsset}
             onAssetAdded={() => setSelectedAsset(null)}
@@ -3,20 +3,20 @@ import useImage from 'use-image'
 import { useState, useEffect, useRef, useCallback } from 'react'
 import EditToolbar from './EditToolbar'
 import PropertiesPanel from './PropertiesPanel'
-import { removeBackground, getAssetPosition, getAssetInfo } from '../../utils/api'
+import { removeBackgroundUpload, getAssetPosition, getAssetInfo } from '../../utils/api'
 import { getRandomPosition, adjustPositionForAspectRatio } from '../../utils/assetPositioning'
 
-export default function Canvas({ imageBase64, onCanvasStateChange, selectedAsset, onAssetAdded }) {
+export default function Canvas({ imageUrl, onCanvasStateChange, selectedAsset, onAssetAdded }) {
   const [scale, setScale] = useState(1)
   const [stageSize, setStageSize] = useState({ width: 1080, height: 1920 })
   const containerRef = useRef(null)
   const stageRef = useRef(null)
 
-  const [backgroundImage, imageStatus] = useImage(imageBase64 || null)
+  const [backgroundImage, imageStatus] = useImage(imageUrl || null, 'anonymous')
   
   useEffect(() => {
-    if (imageBase64) {
-      console.log('[Canvas] ImageBase64 received:', imageBase64.substring(0, 50) + '...')
+    if (imageUrl) {
+      console.log('[Canvas] Image URL received:', imageUrl)
     }
     if (backgroundImage) {
       console.log('[Canvas] Background image loaded:', backgroundImage.width, 'x', backgroundImage.height)
@@ -24,7 +24,7 @@ export default function Canvas({ imageBase64, onCanvasStateChange, selectedAsset
     if (imageStatus === 'failed') {
       console.error('[Canvas] Failed to load background image')
     }
-  }, [imageBase64, backgroundImage, imageStatus])
+  }, [imageUrl, backgroundImage, imageStatus])
   
   const [elements, setElements] = useState([])
   const [selectedElementId, setSelectedElementId] = useState(null)
@@ -255,11 +255,11 @@ export default function Canvas({ imageBase64, onCanvasStateChange, selectedAsset
   useEffect(() => {
     if (onCanvasStateChange) {
       onCanvasStateChange({
-        image_base64: imageBase64,
+        image_url: imageUrl,
         elements: elements
       })
     }
-  }, [elements, imageBase64, onCanvasStateChange])
+  }, [elements, imageUrl, onCanvasStateChange])
 
   const finishDrawing = useCallback(() => {
     if (isDrawing && activeTool === 'draw' && drawingPoints.length >= 4) {
@@ -579,35 +579,11 @@ export default function Canvas({ imageBase64, onCanvasStateChange, selectedAsset
         try {
           console.log('[Canvas] Removing background from image:', element.id)
           
-          let imageBase64 = null
+          let imageBlob = null
           
           if (element.url) {
             const response = await fetch(element.url)
-            const blob = await response.blob()
-            const reader = new FileReader()
-            reader.onloadend = async () => {
-              const base64 = reader.result.split(',')[1]
-              try {
-                const bgResponse = await removeBackground(base64)
-                if (bgResponse.success && bgResponse.image_base64) {
-                  const img = new window.Image()
-                  img.crossOrigin = 'anonymous'
-                  img.onload = () => {
-                    updateElement(element.id, {
-                      image: img,
-                      url: element.url
-                    })
-                    console.log('[Canvas] Background removed successfully')
-                  }
-                  img.src = `data:image/png;base64,${bgResponse.image_base64}`
-                }
-              } catch (error) {
-                console.error('[Canvas] Background removal failed:', error)
-                alert('Failed to remove background: ' + error.message)
-              }
-            }
-            reader.readAsDataURL(blob)
-            return
+            imageBlob = await response.blob()
           } else if (element.image) {
             const img = element.image
             const canvas = document.createElement('canvas')
@@ -615,17 +591,17 @@ export default function Canvas({ imageBase64, onCanvasStateChange, selectedAsset
             canvas.height = img.height || img.naturalHeight || 500
             const ctx = canvas.getContext('2d')
             ctx.drawImage(img, 0, 0)
-            imageBase64 = canvas.toDataURL('image/png').split(',')[1]
+            imageBlob = await new Promise(resolve => canvas.toBlob(resolve, 'image/png'))
           }
           
-          if (!imageBase64) {
+          if (!imageBlob) {
             alert('Could not extract image data for background removal')
             return
           }
           
-          const response = await removeBackground(imageBase64)
+          const response = await removeBackgroundUpload(imageBlob)
           
-          if (response.success && response.image_base64) {
+          if (response.success && response.image_url) {
             const img = new window.Image()
             img.crossOrigin = 'anonymous'
             img.onload = () => {
@@ -634,7 +610,7 @@ export default function Canvas({ imageBase64, onCanvasStateChange, selectedAsset
               })
               console.log('[Canvas] Background removed successfully')
             }
-            img.src = `data:image/png;base64,${response.image_base64}`
+            img.src = response.image_url
           }
         } catch (error) {
           console.error('[Canvas] Background removal failed:', error)
@@ -1,7 +1,7 @@
 import { useState } from 'react'
 import { motion } from 'framer-motion'
 
-export default function CommandCenter({ onGenerate, isGenerating, generationStage, onVerify, canvasState, verificationResult }) {
+export default function CommandCenter({ onGenerate, onCancel, isGenerating, generationStage, onVerify, canvasState, verificationResult }) {
   const [input, setInput] = useState('')
 
   const handleSubmit = async (e) => {
@@ -70,6 +70,17 @@ export default function CommandCenter({ onGenerate, isGenerating, generationStag
               </>
             )}
           </motion.button>
+
+          {isGenerating && onCancel && (
+            <button
+              type="button"
+              onClick={onCancel}
+              className="w-full border border-slate-300 hover:bg-slate-50 text-slate-600 font-medium py-2 rounded-lg transition-all text-sm"
+              style={{ fontFamily: 'Inter, sans-serif' }}
+            >
+              Cancel
+            </button>
+          )}
         </form>
 
         {canvasState && (
@@ -58,6 +58,85 @@ export const generateCreative = async (prompt) => {
   return response
 }
 
+export const submitGenerateJob = async (prompt) => {
+  if (!prompt || !prompt.trim()) {
+    throw new Error('Prompt is required')
+  }
+
+  return apiRequest('/generate/jobs', {
+    method: 'POST',
+    body: { prompt: prompt.trim() },
+  })
+}
+
+export const getGenerateJob = async (jobId) => {
+  return apiRequest(`/generate/jobs/${jobId}`, { method: 'GET' })
+}
+
+export const cancelGenerateJob = async (jobId) => {
+  return apiRequest(`/generate/jobs/${jobId}`, { method: 'DELETE' })
+}
+
+// Streams stage results as they finish. onStage(name, result) is called for
+// normalized_intent, toon, assets, background_description, compliance_summary
+// and image_url; onProgress({ step, steps, preview }) receives low-res
+// previews while the image renders, and onJob(job) the submitted job so it
+// can be cancelled. Resolves with all results once the job succeeds.
+export const generateCreativeStreaming = async (prompt, { onStage, onProgress, onJob } = {}) => {
+  const job = await submitGenerateJob(prompt)
+  const results = {}
+  if (onJob) {
+    onJob(job)
+  }
+
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`${getApiUrl()}${job.events_url}`)
+
+    source.addEventListener('stage', (event) => {
+      const { stage, result } = JSON.parse(event.data)
+      results[stage] = result
+      if (onStage) {
+        onStage(stage, result)
+      }
+    })
+
+    source.addEventListener('progress', (event) => {
+      if (onProgress) {
+        onProgress(JSON.parse(event.data))
+      }
+    })
+
+    source.addEventListener('status', (event) => {
+      const { status, error } = JSON.parse(event.data)
+      if (status === 'succeeded') {
+        source.close()
+        resolve(results)
+      } else if (status === 'failed' || status === 'cancelled') {
+        source.close()
+        reject(new Error(error || `Generation ${status}`))
+      }
+    })
+
+    source.onerror = async () => {
+      // EventSource reconnects on its own while the job is still retained;
+      // only give up once the job itself is gone
+      try {
+        await getGenerateJob(job.job_id)
+      } catch (error) {
+        source.close()
+        reject(error)
+      }
+    }
+  })
+}
+
+export const getImageUrl = (imagePath) => {
+  if (!imagePath || imagePath.startsWith('http://') || imagePath.startsWith('https://')) {
+    return imagePath
+  }
+  return `${getApiUrl()}${imagePath}`
+}
+
 export const getAssetUrl = (assetPath) => {
   const baseUrl = getApiUrl()
   if (!baseUrl) {
@@ -106,6 +185,26 @@ export const removeBackground = async (imageBase64) => {
   }
 }
 
+// Multipart upload of the raw image; the cutout comes back as a URL instead
+// of a base64 payload
+export const removeBackgroundUpload = async (imageBlob, imageFormat = 'png') => {
+  const url = `${getApiUrl()}/remove-background/upload`
+  const formData = new FormData()
+  formData.append('file', imageBlob, 'image')
+  formData.append('image_format', imageFormat)
+
+  console.log(`[API] POST ${url}`, imageBlob.size, 'bytes')
+
+  const response = await fetch(url, { method: 'POST', body: formData })
+  if (!response.ok) {
+    const errorText = await response.text()
+    throw new Error(`API Error (${response.status}): ${errorText}`)
+  }
+
+  const result = await response.json()
+  return { ...result, image_url: getImageUrl(result.image_url) }
+}
+
 export const getAssetInfo = async (assetUrl) => {
   try {
     const path = assetUrl.replace('http://localhost:8000', '').replace('http://127.0.0.1:8000', '')